@@ -0,0 +1,140 @@
+"""
+Admin routes for request profiles, memory reports and catalog reloads.
+
+The routes are only served when ``ADMIN_ENDPOINTS_ENABLED`` is set and, if
+``ADMIN_TOKEN`` is configured, only to callers sending it in ``X-Admin-Token``.
+"""
+
+import asyncio
+import hmac
+import tracemalloc
+from typing import Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.executor import get_cpu_executor
+from mcpsquared_discovery.core.profiling import get_profile_store
+from mcpsquared_discovery.services.discovery import answer_version
+from mcpsquared_discovery.services.index_bundle import reload_catalog
+from mcpsquared_discovery.services.memory import data_sizes, top_allocations
+from mcpsquared_discovery.services.result_cache import get_result_cache
+from mcpsquared_discovery.services.stack_table import load_stack_table
+from mcpsquared_discovery.services.warmup import schedule_warmup
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Allow admin routes only when enabled and authorized.
+
+    Args:
+        x_admin_token: Token sent by the caller
+
+    Raises:
+        HTTPException: 404 when admin routes are disabled, 403 on a wrong token
+    """
+    if not settings.ADMIN_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.ADMIN_TOKEN and not hmac.compare_digest(
+        x_admin_token or "", settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles() -> List[Dict]:
+    """
+    List stored request profiles, newest first.
+
+    Returns:
+        Profile summaries with sample counts per pipeline stage
+    """
+    return get_profile_store().summaries()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: Literal["collapsed", "summary"] = Query("collapsed"),
+):
+    """
+    Fetch a stored request profile.
+
+    Args:
+        profile_id: Id from the X-Profile-Id response header
+        format: "collapsed" for flame graph input, "summary" for stage totals
+
+    Returns:
+        Collapsed stacks as plain text, or the profile summary
+    """
+    profiler = get_profile_store().get(profile_id)
+    if profiler is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile {profile_id}")
+    if format == "summary":
+        return profiler.summary()
+    return PlainTextResponse(profiler.collapsed())
+
+
+@router.get("/memory")
+async def memory_report(top: int = Query(20, ge=1, le=200)) -> Dict:
+    """
+    Report top allocation sites and the sizes of in-memory data.
+
+    Allocation sites require tracing, see ``POST /admin/memory/tracemalloc``.
+
+    Args:
+        top: Number of allocation sites to report
+
+    Returns:
+        tracemalloc statistics and data structure sizes
+    """
+    allocations = await asyncio.to_thread(top_allocations, top)
+    sizes = await asyncio.to_thread(data_sizes)
+    return {"tracemalloc": allocations, "sizes": sizes}
+
+
+@router.post("/memory/tracemalloc")
+async def set_tracemalloc(
+    enabled: bool = Query(...), frames: int = Query(1, ge=1, le=64)
+) -> Dict:
+    """
+    Start or stop tracemalloc, which slows allocations while it runs.
+
+    Args:
+        enabled: Whether tracing should run
+        frames: Stack frames stored per allocation
+
+    Returns:
+        Tracing state
+    """
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return {"tracing": tracemalloc.is_tracing()}
+
+
+@router.post("/catalog/reload")
+async def reload_catalog_data() -> Dict:
+    """
+    Reload the catalog and its indexes, then warm the result cache again.
+
+    Returns:
+        New catalog version and whether a cache warmup was started
+    """
+    executor = get_cpu_executor()
+    version = await executor.run("index build", reload_catalog, stateful=True)
+    executor.recycle_workers()
+    get_result_cache().clear()
+    # A table built for the previous catalog is ignored on the next load
+    load_stack_table.cache_clear()
+    answer_version.cache_clear()
+    # Rebuild off the event loop, so discovery ETags stay cheap to compute
+    await executor.run("index build", answer_version, stateful=True)
+    return {"version": version, "warmup_started": schedule_warmup()}
@@ -0,0 +1,210 @@
+"""
+Content negotiation and encoding of API responses.
+
+Responses are serialized as JSON, with orjson when it is installed, or as
+msgpack when the client asks for it in ``Accept`` and msgpack is installed.
+Bodies are compressed with brotli or gzip according to ``Accept-Encoding``;
+brotli is only offered when the ``brotli`` package is installed.
+"""
+
+import gzip
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Header
+from pydantic import BaseModel
+
+from mcpsquared_discovery.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+_JSON_RANGES = (JSON_MEDIA_TYPE, "application/*", "*/*")
+
+VARY_HEADER = "Accept, Accept-Encoding"
+
+
+def parse_qvalues(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse an Accept style header into quality values.
+
+    Args:
+        header: Header value, e.g. ``"gzip;q=0.8, br"``
+
+    Returns:
+        Lowercased tokens mapped to their quality, 1.0 when not given
+    """
+    qvalues: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, *params = (piece.strip() for piece in part.split(";"))
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qvalues[token.lower()] = quality
+    return qvalues
+
+
+@dataclass(frozen=True)
+class Representation:
+    """Media type and content coding negotiated for a response."""
+
+    media_type: str = JSON_MEDIA_TYPE
+    encoding: Optional[str] = None
+
+    @property
+    def tag(self) -> str:
+        """Short name of the representation, used to tell ETags apart."""
+        name = "msgpack" if self.media_type == MSGPACK_MEDIA_TYPE else "json"
+        return f"{name}+{self.encoding}" if self.encoding else name
+
+    def headers(self) -> Dict[str, str]:
+        """
+        Headers describing the representation.
+
+        Returns:
+            Vary and, for compressed bodies, Content-Encoding
+        """
+        headers = {"Vary": VARY_HEADER}
+        if self.encoding:
+            headers["Content-Encoding"] = self.encoding
+        return headers
+
+    def render(self, model: BaseModel) -> bytes:
+        """
+        Serialize and compress a response model.
+
+        Args:
+            model: Response model
+
+        Returns:
+            Response body
+        """
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            body = msgpack.packb(model.model_dump(mode="json"))
+        elif orjson is not None:
+            body = orjson.dumps(model.model_dump(mode="json"))
+        else:
+            body = model.model_dump_json().encode("utf-8")
+        return compress(body, self.encoding)
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Pick msgpack if the client prefers it and it is installed, else JSON.
+
+    Args:
+        accept: Accept header
+
+    Returns:
+        Media type of the response
+    """
+    if msgpack is None or not accept:
+        return JSON_MEDIA_TYPE
+    qvalues = parse_qvalues(accept)
+    msgpack_q = max(qvalues.get(alias, 0.0) for alias in _MSGPACK_ALIASES)
+    json_q = max(qvalues.get(media_range, 0.0) for media_range in _JSON_RANGES)
+    if msgpack_q > 0 and msgpack_q >= json_q:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding with the highest quality the client accepts.
+
+    Args:
+        accept_encoding: Accept-Encoding header
+
+    Returns:
+        "br", "gzip", or None to send the body uncompressed
+    """
+    if not settings.RESPONSE_COMPRESSION or not accept_encoding:
+        return None
+    qvalues = parse_qvalues(accept_encoding)
+    wildcard = qvalues.get("*", 0.0)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in supported:
+        quality = qvalues.get(coding, wildcard)
+        if quality > best_q:
+            best, best_q = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    """
+    Compress a body with a negotiated content coding.
+
+    Args:
+        body: Uncompressed body
+        encoding: "br", "gzip" or None
+
+    Returns:
+        Compressed body, or the body itself without an encoding
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    if encoding == "gzip":
+        # A fixed mtime keeps the bytes, and so the ETag, stable
+        return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+    return body
+
+
+async def negotiate_representation(
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+) -> Representation:
+    """
+    Negotiate the response representation from the request headers.
+
+    Args:
+        accept: Accept header
+        accept_encoding: Accept-Encoding header
+
+    Returns:
+        Negotiated representation
+    """
+    return Representation(
+        media_type=negotiate_media_type(accept),
+        encoding=negotiate_encoding(accept_encoding),
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, with weak comparison.
+
+    Args:
+        if_none_match: If-None-Match header
+        etag: Quoted ETag of the current representation
+
+    Returns:
+        True if the client already holds the representation
+    """
+    if not if_none_match:
+        return False
+    client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in client_tags or etag in client_tags
+
@@ -2,25 +2,154 @@
 API routes for the MCP Squared Discovery Service.
 """
 
-from typing import Dict, List, Optional
+import logging
+import math
+from typing import Dict, List, Literal, Optional
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
 from fastapi.responses import JSONResponse
 
+from mcpsquared_discovery.api.encoding import (
+    VARY_HEADER,
+    Representation,
+    etag_matches,
+    negotiate_representation,
+)
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.deadline import (
+    DEADLINE_HEADER,
+    Deadline,
+    DeadlineExceeded,
+)
+from mcpsquared_discovery.core.executor import ExecutorSaturated, get_cpu_executor
+from mcpsquared_discovery.core.profiling import mark_stage
 from mcpsquared_discovery.models.schemas import (
     DiscoveryRequest,
     DiscoveryResponse,
     ProjectContext,
+    SearchFilters,
 )
 from mcpsquared_discovery.services.analyzer import (
     analyze_project_files,
     extract_project_context,
 )
-from mcpsquared_discovery.services.llm import generate_server_recommendations
-from mcpsquared_discovery.services.search import search_mcp_servers
+from mcpsquared_discovery.services.discovery import (
+    DiscoveryResult,
+    answer_is_complete,
+    answer_version,
+    discovery_fingerprint,
+    run_discovery,
+    speculation_stats,
+)
+from mcpsquared_discovery.services.facets import load_facet_index
+from mcpsquared_discovery.services.file_cache import UnknownFileReferenceError
+from mcpsquared_discovery.services.index_bundle import (
+    get_bundle_delta,
+    get_current_bundle,
+)
+from mcpsquared_discovery.services.llm import (
+    get_llm_breaker,
+    get_selection_batcher,
+    llm_in_flight,
+)
+from mcpsquared_discovery.services.llm_routing import route_recorder
+from mcpsquared_discovery.services.llm_usage import usage_recorder
+from mcpsquared_discovery.services.preranker import preranker_stats
+from mcpsquared_discovery.services.rate_limiter import (
+    AdmissionRejected,
+    get_llm_limiter,
+)
+from mcpsquared_discovery.services.result_cache import get_result_cache
+from mcpsquared_discovery.services.stack_table import stack_table_stats
+from mcpsquared_discovery.services.traffic import get_traffic_recorder
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+DISCOVERY_SOURCE_HEADER = "X-Discovery-Source"
+INDEX_VERSION_HEADER = "X-Index-Version"
+INDEX_BUNDLE_HEADER = "X-Index-Bundle"
+
+
+async def discovery_etag(
+    context: Dict, mode: str, representation: Representation
+) -> Optional[str]:
+    """
+    Build the strong ETag of a discovery answer before running the pipeline.
+
+    Args:
+        context: Project context dictionary
+        mode: Discovery mode
+        representation: Negotiated response representation
+
+    Returns:
+        Quoted ETag from the answer version, request hash and representation,
+        or None when discovery ETags are disabled
+    """
+    if not settings.DISCOVERY_ETAGS:
+        return None
+    version = answer_version()
+    fingerprint = discovery_fingerprint(context, mode)[:24]
+    return f'"{version}-{fingerprint}-{representation.tag}"'
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Answer a conditional request whose representation the client holds.
+
+    Args:
+        etag: ETag the client sent
+
+    Returns:
+        Empty 304 response
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Vary": VARY_HEADER})
+
+
+def render_discovery(
+    result: DiscoveryResult,
+    representation: Representation,
+    etag: Optional[str] = None,
+    mode: str = "auto",
+) -> Response:
+    """
+    Serialize recommendations built from pre-validated models.
+
+    Returning a Response directly stops FastAPI from dumping and re-validating
+    every server against the response model on each request. The ETag is only
+    sent with complete answers, so clients do not keep revalidating a degraded
+    one.
+
+    Args:
+        result: Discovery result
+        representation: Negotiated response representation
+        etag: ETag of the request, if any
+        mode: Discovery mode of the request
+
+    Returns:
+        Encoded response with the source of the answer in a header
+    """
+    body = DiscoveryResponse.model_construct(mcp_servers=result.servers)
+    headers = {DISCOVERY_SOURCE_HEADER: result.source, **representation.headers()}
+    if etag and answer_is_complete(result, mode):
+        headers["ETag"] = etag
+    return Response(
+        content=representation.render(body),
+        media_type=representation.media_type,
+        headers=headers,
+    )
+
 
 @router.post("/discover", response_model=DiscoveryResponse)
 async def discover_mcp_servers(
@@ -28,6 +157,13 @@ async def discover_mcp_servers(
     project_spec_mdc: Optional[str] = Form(None, alias="project_spec.mdc"),
     package_json: Optional[str] = Form(None, alias="package.json"),
     files: Optional[List[UploadFile]] = File(None),
+    mode: Literal["auto", "local"] = Form("auto"),
+    category: Optional[List[str]] = Form(None),
+    install_method: Optional[List[str]] = Form(None),
+    language: Optional[List[str]] = Form(None),
+    request_timeout: Optional[str] = Header(None, alias=DEADLINE_HEADER),
+    if_none_match: Optional[str] = Header(None),
+    representation: Representation = Depends(negotiate_representation),
 ):
     """
     Discover MCP servers based on project context.
@@ -37,11 +173,25 @@ async def discover_mcp_servers(
         project_spec_mdc: Optional project MDC specification
         package_json: Optional package.json contents
         files: Optional additional project files for context
+        mode: "auto" to use the LLM when healthy, "local" for local results only
+        category: Optional catalog categories to restrict results to
+        install_method: Optional install methods to restrict results to
+        language: Optional implementation languages to restrict results to
+        request_timeout: Optional request budget in seconds
+        if_none_match: ETags of answers the client holds
+        representation: Negotiated response representation
 
     Returns:
-        JSON response with recommended MCP servers
+        Response with recommended MCP servers, or 304 if the client holds it
     """
+    deadline = Deadline.from_header(request_timeout)
     try:
+        filters = SearchFilters(
+            category=category or [],
+            install_method=install_method or [],
+            language=language or [],
+        )
+
         # Create initial project context from form data
         project_context = ProjectContext(
             user_prompt=prompt,
@@ -50,37 +200,50 @@ async def discover_mcp_servers(
         )
 
         # Analyze any additional project files to enhance context
+        mark_stage("file analysis")
         if files:
-            project_context = await analyze_project_files(
-                prompt=prompt,
-                files=files,
-                existing_context=project_context
-            )
+            try:
+                project_context = await analyze_project_files(
+                    prompt=prompt,
+                    files=files,
+                    existing_context=project_context,
+                    deadline=deadline,
+                )
+            except DeadlineExceeded as e:
+                logger.warning("%s, continuing with the files read so far", e)
 
         # Convert ProjectContext to dict for search
-        context_dict = {
-            "prompt": project_context.user_prompt,
-            "files": {},
-            "search_queries": [],
-        }
-        
-        if project_context.project_mdc_file_contents:
-            context_dict["files"]["project.mdc"] = project_context.project_mdc_file_contents
-        if project_context.project_package_manager_contents:
-            context_dict["files"]["package.json"] = project_context.project_package_manager_contents
-        if project_context.additional_files:
-            context_dict["files"].update(project_context.additional_files)
-
-        # Search for relevant MCP servers
-        search_results = await search_mcp_servers(context_dict)
-
-        # Generate recommendations using LLM
-        recommendations = await generate_server_recommendations(
-            context_dict, search_results
+        mark_stage("context extraction")
+        context_dict = await get_cpu_executor().run(
+            "file analysis",
+            extract_project_context,
+            project_context.user_prompt,
+            project_context,
+            "package.json",
+            stateful=True,
         )
+        context_dict["filters"] = filters.active()
+
+        etag = await discovery_etag(context_dict, mode, representation)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-        return DiscoveryResponse(mcp_servers=recommendations)
+        # Search and select recommendations within the request deadline
+        result = await run_discovery(context_dict, deadline, mode)
+        return render_discovery(result, representation, etag, mode)
 
+    except UnknownFileReferenceError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error processing request: {str(e)}"
@@ -118,32 +281,156 @@ async def read_project_context(
 
 
 @router.post("/discover-json", response_model=DiscoveryResponse)
-async def discover_mcp_servers_json(request: DiscoveryRequest):
+async def discover_mcp_servers_json(
+    request: DiscoveryRequest,
+    request_timeout: Optional[str] = Header(None, alias=DEADLINE_HEADER),
+    if_none_match: Optional[str] = Header(None),
+    representation: Representation = Depends(negotiate_representation),
+):
     """
     Discover MCP servers based on project context provided as JSON.
     This endpoint accepts JSON data instead of form data.
 
     Args:
         request: Discovery request with prompt and optional context
+        request_timeout: Optional request budget in seconds
+        if_none_match: ETags of answers the client holds
+        representation: Negotiated response representation
 
     Returns:
-        JSON response with recommended MCP servers
+        Response with recommended MCP servers, or 304 if the client holds it
     """
+    deadline = Deadline.from_header(request_timeout)
     try:
         # Extract project context
-        context_dict = extract_project_context(request.prompt, request.context)
+        context_dict = await get_cpu_executor().run(
+            "file analysis",
+            extract_project_context,
+            request.prompt,
+            request.context,
+            stateful=True,
+        )
+        if request.filters:
+            context_dict["filters"] = request.filters.active()
+
+        etag = await discovery_etag(context_dict, request.mode, representation)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-        # Search for relevant MCP servers
-        search_results = await search_mcp_servers(context_dict)
+        # Search and select recommendations within the request deadline
+        result = await run_discovery(context_dict, deadline, request.mode)
+        return render_discovery(result, representation, etag, request.mode)
 
-        # Generate recommendations using LLM
-        recommendations = await generate_server_recommendations(
-            context_dict, search_results
+    except UnknownFileReferenceError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error processing request: {str(e)}"
         )
 
-        return DiscoveryResponse(mcp_servers=recommendations)
 
+@router.get("/metrics/llm")
+async def llm_metrics() -> Dict:
+    """
+    Report LLM admission control and circuit breaker state for monitoring.
+
+    Returns:
+        Queue depth, wait times, admission counters, breaker state, token
+        usage and per-model latency, hedging and cost
+    """
+    try:
+        return {
+            "in_flight": llm_in_flight(),
+            "limiter": get_llm_limiter().stats(),
+            "circuit_breaker": get_llm_breaker().stats(),
+            "token_usage": usage_recorder.stats(),
+            "routes": route_recorder.stats(),
+            "selection_batching": get_selection_batcher().stats(),
+            "speculation": speculation_stats(),
+            "result_cache": get_result_cache().stats(),
+            "traffic_capture": get_traffic_recorder().stats(),
+            "preranker": preranker_stats(),
+            "stack_table": stack_table_stats(),
+        }
     except Exception as e:
         raise HTTPException(
-            status_code=500, detail=f"Error processing request: {str(e)}"
+            status_code=500, detail=f"Error collecting metrics: {str(e)}"
+        )
+
+
+@router.get("/metrics/executor")
+async def executor_metrics() -> Dict:
+    """
+    Report the CPU worker pool for monitoring.
+
+    Returns:
+        Pending tasks and per-task counts, queue wait and run time
+    """
+    return get_cpu_executor().stats()
+
+
+@router.get("/catalog/facets")
+async def catalog_facets() -> Dict:
+    """
+    Report the facet values clients can filter on and their record counts.
+
+    Returns:
+        Facet name to value counts
+    """
+    return load_facet_index().counts()
+
+
+@router.get("/index/bundle")
+async def index_bundle(
+    since: Optional[str] = Query(
+        None, description="Bundle version the client holds, to receive a delta"
+    ),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    Serve the catalog and search index for offline use by clients.
+
+    The body is gzip-compressed JSON for ``offline.local_index``. With
+    ``since`` set to a version the service still keeps, only the changes are
+    sent; otherwise the full bundle is. A matching ``If-None-Match`` gets 304.
+
+    Args:
+        since: Bundle version the client holds
+        if_none_match: ETag of the bundle the client holds
+
+    Returns:
+        Bundle or delta with its version in the ETag
+    """
+    try:
+        current = await get_cpu_executor().run(
+            "index build", get_current_bundle, stateful=True
+        )
+        etag = f'"{current["version"]}"'
+        headers = {"ETag": etag, INDEX_VERSION_HEADER: current["version"]}
+        if etag_matches(if_none_match, etag) or since == current["version"]:
+            return Response(status_code=304, headers=headers)
+
+        body, kind = current["encoded"], "full"
+        if since:
+            delta = await get_cpu_executor().run(
+                "index build", get_bundle_delta, since, stateful=True
+            )
+            if delta is not None:
+                body, kind = delta, "delta"
+
+        headers[INDEX_BUNDLE_HEADER] = kind
+        return Response(content=body, media_type="application/gzip", headers=headers)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error building index bundle: {str(e)}"
         )
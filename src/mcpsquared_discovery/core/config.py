@@ -2,11 +2,12 @@
 Configuration settings for the MCP Squared Discovery Service.
 """
 
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Tuple, cast
 import os
 from pathlib import Path
 
-from pydantic import Field
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 import logging
@@ -33,7 +34,38 @@ class Settings(BaseSettings):
 
     # LLM Settings
     LLM_MODEL: str = Field(
-        "anthropic/claude-3.5-sonnet", description="LLM model to use"
+        "anthropic/claude-3.5-sonnet",
+        description="Large LLM model, used for selection and content generation",
+    )
+    LLM_SMALL_MODEL: str = Field(
+        "anthropic/claude-3.5-haiku",
+        description="Small, fast LLM model for stages routed to the small tier",
+    )
+    LLM_TEMPERATURE: float = Field(0.7, description="Sampling temperature")
+    LLM_STAGE_MODELS: Dict[str, str] = Field(
+        {"query generation": "small", "output repair": "small"},
+        description="Stage to 'small', 'large' or a model name, default large",
+    )
+    LLM_MODEL_PRICES: Dict[str, Tuple[float, float]] = Field(
+        {
+            "anthropic/claude-3.5-sonnet": (3.0, 15.0),
+            "anthropic/claude-3.5-haiku": (0.8, 4.0),
+        },
+        description="USD per million prompt and completion tokens, for cost tracking",
+    )
+
+    # Hedged LLM requests
+    LLM_HEDGING: bool = Field(
+        False, description="Send a duplicate request once a call passes its p95 latency"
+    )
+    LLM_HEDGE_MODEL: str = Field(
+        "", description="Model for hedged duplicates, empty to reuse the primary model"
+    )
+    LLM_HEDGE_MIN_SAMPLES: int = Field(
+        20, description="Successful calls on a route before it is hedged"
+    )
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = Field(
+        1.0, description="Minimum seconds before a duplicate request is sent"
     )
 
     # Langsmith Settings
@@ -50,6 +82,18 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = Field("development", description="Application environment")
 
+    # Logging
+    LOG_LEVEL: str = Field(
+        "", description="Log level, empty for DEBUG in development and INFO otherwise"
+    )
+    LOG_FORMAT: str = Field("json", description="Log record format: json or text")
+    LOG_DEBUG_SAMPLE_RATE: float = Field(
+        1.0, description="Fraction of requests whose debug records are kept"
+    )
+    LOG_QUEUE_MAX_SIZE: int = Field(
+        10000, description="Log records buffered for the writer thread before dropping"
+    )
+
     # Content retrieval
     CONTENT_RETRIEVAL_URL: str = Field(
         "https://api.andisearch.com/parser/parser",
@@ -62,28 +106,301 @@ class Settings(BaseSettings):
         description="Smithery API URL for server search",
     )
 
+    # Local search
+    SEARCH_MAX_CANDIDATES: int = Field(
+        8, description="Maximum search results handed to the LLM for selection"
+    )
+    SEARCH_MIN_SCORE: float = Field(
+        0.1, description="Minimum match score for a search result"
+    )
+    SEARCH_MMR_LAMBDA: float = Field(
+        0.7,
+        description="Relevance versus diversity trade-off, 1.0 ranks by relevance only",
+    )
+    SEARCH_MMR_POOL_SIZE: int = Field(
+        32, description="Top scoring results considered when diversifying"
+    )
+    SEARCH_TRIGRAM_THRESHOLD: float = Field(
+        0.4, description="Minimum trigram similarity for typo-tolerant title matches"
+    )
+
+    # Profiling and admin endpoints
+    PROFILING_ENABLED: bool = Field(
+        False, description="Allow clients to profile single discovery requests"
+    )
+    PROFILE_SAMPLE_INTERVAL_MS: float = Field(
+        5.0, description="Milliseconds between stack samples of a profiled request"
+    )
+    PROFILE_HISTORY: int = Field(
+        20, description="Finished request profiles kept in memory"
+    )
+    ADMIN_ENDPOINTS_ENABLED: bool = Field(
+        False, description="Expose the /admin profiling and memory endpoints"
+    )
+    ADMIN_TOKEN: str = Field(
+        "", description="Token required in X-Admin-Token for admin access, if set"
+    )
+
+    # CPU-bound work
+    EXECUTOR_KIND: str = Field(
+        "thread", description="Pool for CPU-bound tasks: thread or process"
+    )
+    EXECUTOR_MAX_WORKERS: int = Field(4, description="Workers in the CPU task pool")
+    EXECUTOR_MAX_QUEUE: int = Field(
+        64, description="CPU tasks allowed to wait for a worker before rejecting"
+    )
+
+    # Traffic capture and result cache
+    TRAFFIC_CAPTURE_ENABLED: bool = Field(
+        False, description="Record scrubbed discovery inputs, timings and outcomes"
+    )
+    TRAFFIC_CAPTURE_PATH: Path = Field(
+        PROJECT_ROOT / ".traffic" / "discovery.jsonl",
+        description="JSON-lines file captured traffic is written to",
+    )
+    TRAFFIC_CAPTURE_MAX_BYTES: int = Field(
+        10_000_000, description="Size at which the capture file is rotated"
+    )
+    TRAFFIC_CAPTURE_BACKUPS: int = Field(
+        5, description="Rotated capture files kept next to the current one"
+    )
+    TRAFFIC_CAPTURE_MAX_QUEUE: int = Field(
+        10000, description="Captured records waiting to be written before dropping"
+    )
+    RESULT_CACHE_ENABLED: bool = Field(
+        False, description="Cache LLM answers by normalized request inputs"
+    )
+    RESULT_CACHE_MAX_ENTRIES: int = Field(
+        512, description="Maximum number of cached discovery answers"
+    )
+    RESULT_CACHE_TTL_SECONDS: float = Field(
+        3600.0, description="Seconds a cached discovery answer is served"
+    )
+    WARMUP_ON_STARTUP: bool = Field(
+        False, description="Replay frequent captured inputs into the result cache"
+    )
+    WARMUP_TOP_CONTEXTS: int = Field(
+        20, description="Number of most frequent captured inputs replayed"
+    )
+    WARMUP_TIMEOUT_SECONDS: float = Field(
+        60.0, description="Deadline for each replayed request"
+    )
+
+    # Learned pre-ranking
+    SELECTION_LOG_ENABLED: bool = Field(
+        False, description="Log candidates and LLM selections for pre-ranker training"
+    )
+    SELECTION_LOG_PATH: Path = Field(
+        PROJECT_ROOT / ".traffic" / "selections.jsonl",
+        description="JSON-lines file selections are logged to",
+    )
+    PRERANKER_MODEL_PATH: str = Field(
+        "", description="Trained pre-ranker model, empty to rank by search score only"
+    )
+    PRERANK_MAX_CANDIDATES: int = Field(
+        8, description="Candidates sent to the LLM after pre-ranking"
+    )
+    PRERANK_DROP_PROBABILITY: float = Field(
+        0.05, description="Selection probability below which candidates are dropped"
+    )
+    PRERANK_SKIP_LLM: bool = Field(
+        False, description="Answer without the LLM when the pre-ranker is confident"
+    )
+    PRERANK_ACCEPT_PROBABILITY: float = Field(
+        0.9, description="Probability at which a candidate is confidently selected"
+    )
+    PRERANK_REJECT_PROBABILITY: float = Field(
+        0.1, description="Probability at which a candidate is confidently rejected"
+    )
+
+    # Precomputed stack recommendations
+    STACK_TABLE_ENABLED: bool = Field(
+        False, description="Answer canonical stacks from the precomputed table"
+    )
+    STACK_TABLE_PATH: Path = Field(
+        PROJECT_ROOT / ".stack_table.json",
+        description="Precomputed recommendations written by tools.build_stack_table",
+    )
+
+    # Response encoding
+    RESPONSE_COMPRESSION: bool = Field(
+        True, description="Compress discovery responses per Accept-Encoding"
+    )
+    RESPONSE_GZIP_LEVEL: int = Field(5, description="gzip level for responses")
+    RESPONSE_BROTLI_QUALITY: int = Field(
+        5, description="Brotli quality for responses, when brotli is installed"
+    )
+    DISCOVERY_ETAGS: bool = Field(
+        True, description="Send ETags on discovery responses and honor If-None-Match"
+    )
+
+    # Offline index bundles
+    INDEX_BUNDLE_DIR: Path = Field(
+        PROJECT_ROOT / ".index_bundles",
+        description="Directory keeping past index bundles for computing deltas",
+    )
+    INDEX_BUNDLE_HISTORY: int = Field(
+        10, description="Number of past index bundle versions kept for deltas"
+    )
+
+    # Project file analysis
+    FILE_CACHE_MAX_BYTES: int = Field(
+        50_000_000, description="UTF-8 bytes of file contents kept in the file cache"
+    )
+    PROMPT_FILE_MAX_CHARS: int = Field(
+        20000, description="Maximum characters of a single file included in LLM prompts"
+    )
+
+    # LLM tooling
+    LLM_PRELOAD_ON_STARTUP: bool = Field(
+        True, description="Import LLM libraries in the background after startup"
+    )
+    LLM_PROMPT_CACHING: bool = Field(
+        True, description="Mark the static prompt prefix for provider-side caching"
+    )
+
+    # Query generation
+    LLM_QUERY_GENERATION: bool = Field(
+        False, description="Generate search queries with the LLM before selection"
+    )
+    LLM_SPECULATIVE_SELECTION: bool = Field(
+        True,
+        description="Select from local candidates while search queries are generated",
+    )
+    SPECULATION_MIN_OVERLAP: float = Field(
+        0.6,
+        description="Candidate set overlap at which the speculative selection is kept",
+    )
+
+    # LLM output handling
+    LLM_OUTPUT_REPAIR_ATTEMPTS: int = Field(
+        1, description="Follow-up LLM calls allowed to repair malformed structured output"
+    )
+
+    # Request deadlines
+    REQUEST_TIMEOUT_SECONDS: float = Field(
+        60.0, description="Default overall budget for a discovery request in seconds"
+    )
+    REQUEST_TIMEOUT_MAX_SECONDS: float = Field(
+        120.0, description="Upper bound for client supplied request budgets"
+    )
+    LLM_TIMEOUT_SECONDS: float = Field(
+        45.0, description="Maximum seconds for a single LLM call including retries"
+    )
+    CONTENT_RETRIEVAL_TIMEOUT_SECONDS: float = Field(
+        30.0, description="Maximum seconds for a content retrieval call"
+    )
+    FALLBACK_MAX_RESULTS: int = Field(
+        4, description="Number of local search hits returned when the LLM is skipped"
+    )
+
+    # Degraded mode
+    LLM_BREAKER_FAILURE_THRESHOLD: int = Field(
+        5, description="Consecutive LLM failures or slow calls that open the breaker"
+    )
+    LLM_BREAKER_RESET_SECONDS: float = Field(
+        30.0, description="Seconds the breaker stays open before probing the LLM again"
+    )
+    LLM_SLOW_CALL_SECONDS: float = Field(
+        20.0, description="LLM call latency counted as a failure by the breaker"
+    )
+    LLM_MAX_IN_FLIGHT: int = Field(
+        32,
+        description="LLM calls running or queued at which requests use local "
+        "results, at most LLM_MAX_CONCURRENT + LLM_QUEUE_MAX_SIZE",
+    )
+
+    # LLM admission control
+    LLM_MAX_CONCURRENT: int = Field(
+        16, description="Maximum concurrent LLM calls across the process"
+    )
+    LLM_REQUESTS_PER_SECOND: float = Field(
+        5.0, description="Maximum LLM calls started per second"
+    )
+    LLM_TOKENS_PER_MINUTE: int = Field(
+        400000, description="Estimated prompt tokens allowed per minute"
+    )
+    LLM_QUEUE_MAX_SIZE: int = Field(
+        64, description="LLM calls allowed to wait for capacity before rejecting"
+    )
+    LLM_QUEUE_MAX_WAIT_SECONDS: float = Field(
+        20.0, description="Maximum seconds an LLM call waits in the queue"
+    )
+
+    # Selection batching
+    LLM_SELECTION_BATCHING: bool = Field(
+        False, description="Combine concurrent result selections into one LLM call"
+    )
+    LLM_SELECTION_BATCH_WINDOW_MS: float = Field(
+        50.0, description="Milliseconds a selection waits for others to batch with"
+    )
+    LLM_SELECTION_BATCH_MAX_SIZE: int = Field(
+        8, description="Maximum selections combined into one LLM call"
+    )
+
     model_config = SettingsConfigDict(
         env_file=str(PROJECT_ROOT / ".env"),
         case_sensitive=True
     )
 
+    @field_validator("LOG_LEVEL")
+    @classmethod
+    def validate_log_level(cls, v: str) -> str:
+        """Accept empty or a standard logging level name, in any case."""
+        level = v.strip().upper()
+        if level and level not in logging.getLevelNamesMapping():
+            raise ValueError(f"Unknown log level {v!r}")
+        return level
+
+    @model_validator(mode="after")
+    def validate_in_flight_limit(self) -> "Settings":
+        """Keep the local fallback reachable before the queue starts rejecting."""
+        capacity = self.LLM_MAX_CONCURRENT + self.LLM_QUEUE_MAX_SIZE
+        if self.LLM_MAX_IN_FLIGHT > capacity:
+            raise ValueError(
+                f"LLM_MAX_IN_FLIGHT ({self.LLM_MAX_IN_FLIGHT}) exceeds the calls "
+                f"the limiter can hold ({capacity})"
+            )
+        return self
+
     def setup_langchain_env(self):
-        """Set up Langchain environment variables."""
+        """
+        Set up Langchain environment variables.
+
+        Called from the application lifespan rather than at import so that
+        importing the package has no side effects on the process environment.
+        """
         os.environ["LANGCHAIN_API_KEY"] = self.LANGCHAIN_API_KEY
         os.environ["LANGCHAIN_ENDPOINT"] = self.LANGCHAIN_ENDPOINT
         os.environ["LANGCHAIN_PROJECT"] = self.LANGCHAIN_PROJECT
         os.environ["LANGCHAIN_TRACING_V2"] = str(self.LANGCHAIN_TRACING_V2).lower()
-        
-        logger.info("\n\n===\n\nLangchain environment variables set up\n\n===\n\n")
-        logger.info(f"LANGCHAIN_API_KEY: {self.LANGCHAIN_API_KEY}")
-        logger.info(f"LANGCHAIN_ENDPOINT: {self.LANGCHAIN_ENDPOINT}")
-        logger.info(f"LANGCHAIN_PROJECT: {self.LANGCHAIN_PROJECT}")
-        logger.info(f"LANGCHAIN_TRACING_V2: {self.LANGCHAIN_TRACING_V2}")
-        logger.info("\n\n===\n\n")
 
+        logger.info(
+            "Langchain environment configured (project=%s, endpoint=%s, tracing=%s)",
+            self.LANGCHAIN_PROJECT,
+            self.LANGCHAIN_ENDPOINT,
+            self.LANGCHAIN_TRACING_V2,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Load and validate settings once, on first use.
+
+    Returns:
+        Application settings
+    """
+    loaded = Settings()
+    logger.info("Settings loaded")
+    return loaded
+
+
+class _LazySettings:
+    """Proxy that defers loading settings until an attribute is first read."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
 
-settings = Settings()
-settings.setup_langchain_env()  # Set up Langchain environment variables
 
-# Log the settings loaded
-logger.info("Settings loaded and environment configured")
+settings = cast(Settings, _LazySettings())
@@ -0,0 +1,126 @@
+"""
+Request-scoped deadlines for the discovery pipeline.
+
+A Deadline is created once per request and passed down through each stage.
+Stages ask it for their remaining budget instead of using fixed timeouts, so
+one slow upstream call cannot hold a request open past its overall budget.
+"""
+
+import asyncio
+import math
+import time
+from typing import Awaitable, Optional, TypeVar
+
+from mcpsquared_discovery.core.config import settings
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a pipeline stage runs out of its request budget."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Request deadline exceeded during {stage}")
+
+
+class Deadline:
+    """Absolute point in time by which a request must complete."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    @classmethod
+    def from_header(cls, value: Optional[str]) -> "Deadline":
+        """
+        Build a deadline from a client supplied timeout header.
+
+        Args:
+            value: Header value in seconds, or None to use the configured default
+
+        Returns:
+            Deadline clamped to the configured maximum; values that are not
+            finite numbers are ignored
+        """
+        timeout = settings.REQUEST_TIMEOUT_SECONDS
+        if value:
+            try:
+                parsed = float(value)
+            except ValueError:
+                parsed = math.nan
+            if math.isfinite(parsed):
+                timeout = parsed
+        timeout = min(max(timeout, 0.0), settings.REQUEST_TIMEOUT_MAX_SECONDS)
+        return cls(timeout)
+
+    def remaining(self) -> float:
+        """
+        Seconds left before the deadline.
+
+        Returns:
+            Remaining budget, never negative
+        """
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is exhausted."""
+        return self.remaining() <= 0.0
+
+    def timeout_for(self, stage_cap: Optional[float] = None) -> float:
+        """
+        Budget for the next stage, optionally capped by a per-stage limit.
+
+        Args:
+            stage_cap: Maximum seconds the stage may take on its own
+
+        Returns:
+            Seconds the stage may run
+        """
+        remaining = self.remaining()
+        if stage_cap is not None:
+            return min(remaining, stage_cap)
+        return remaining
+
+    def check(self, stage: str) -> None:
+        """
+        Fail fast if the budget is already exhausted.
+
+        Args:
+            stage: Name of the stage about to run
+
+        Raises:
+            DeadlineExceeded: If no budget is left
+        """
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+    async def run(
+        self, awaitable: Awaitable[T], stage: str, stage_cap: Optional[float] = None
+    ) -> T:
+        """
+        Await a stage within the remaining budget.
+
+        Args:
+            awaitable: Coroutine or future for the stage
+            stage: Name of the stage for error reporting
+            stage_cap: Maximum seconds the stage may take on its own
+
+        Returns:
+            Result of the awaitable
+
+        Raises:
+            DeadlineExceeded: If the stage does not finish in time
+        """
+        timeout = self.timeout_for(stage_cap)
+        if timeout <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded(stage)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(stage)
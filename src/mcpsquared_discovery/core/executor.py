@@ -0,0 +1,223 @@
+"""
+Worker pool for CPU-bound pipeline work.
+
+Catalog scoring, index builds and file parsing are synchronous. Running them
+inside ``async def`` handlers stalls every other in-flight request, so they
+are handed to a pool and the event loop only coordinates I/O.
+
+``EXECUTOR_KIND`` selects threads or processes for tasks that only depend on
+their arguments and on data each worker can load itself, such as the catalog.
+Tasks that fill in-process caches (``stateful=True``) always run on threads,
+since a worker process would fill its own copy. At most
+``EXECUTOR_MAX_WORKERS + EXECUTOR_MAX_QUEUE`` tasks may be pending; beyond
+that new tasks are rejected, so a burst turns into fast 503s rather than an
+ever-growing backlog. Queue wait and run time are recorded per task name.
+"""
+
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from mcpsquared_discovery.core.config import settings
+
+KIND_THREAD = "thread"
+KIND_PROCESS = "process"
+
+
+class ExecutorSaturated(Exception):
+    """Raised when too many CPU-bound tasks are already pending."""
+
+    def __init__(self, task: str, pending: int):
+        self.task = task
+        self.pending = pending
+        super().__init__(f"Worker pool saturated ({pending} tasks pending) for {task}")
+
+
+def _timed_call(
+    fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]
+) -> Tuple[Any, float, float]:
+    """Run a task in a worker, reporting when it started and how long it ran."""
+    started = time.monotonic()
+    result = fn(*args, **kwargs)
+    return result, started, time.monotonic() - started
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    """Percentile of a sorted sequence, 0.0 when empty."""
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class CPUExecutor:
+    """Bounded thread or process pool with per-task timing."""
+
+    def __init__(
+        self, kind: str, max_workers: int, max_queue: int, window: int = 500
+    ):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self._window = window
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._timings: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, stateful: bool) -> Executor:
+        """Pool for a task, created on first use. Caller holds the lock."""
+        if self.kind == KIND_PROCESS and not stateful:
+            if self._processes is None:
+                # Spawned workers do not inherit the threads of this process
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="cpu"
+            )
+        return self._threads
+
+    def _task(self, task: str) -> Dict[str, int]:
+        """Counters of a task name, created on first use. Caller holds the lock."""
+        if task not in self._counters:
+            self._counters[task] = {"completed": 0, "failed": 0, "rejected": 0}
+            self._timings[task] = deque(maxlen=self._window)
+        return self._counters[task]
+
+    def _release(self, future: Future) -> None:
+        """Free a pending slot once the worker is done with a task."""
+        with self._lock:
+            self._pending -= 1
+
+    async def run(
+        self,
+        task: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        stateful: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a synchronous function in the pool and await its result.
+
+        With a process pool, ``fn``, its arguments and its result must be
+        picklable and ``fn`` must be importable at module level.
+
+        Args:
+            task: Task name for timing, e.g. "search"
+            fn: Function to run
+            *args: Positional arguments for ``fn``
+            stateful: Whether ``fn`` fills in-process caches and needs a thread
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Result of ``fn``
+
+        Raises:
+            ExecutorSaturated: If too many tasks are already pending
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._task(task)["rejected"] += 1
+                raise ExecutorSaturated(task, self._pending)
+            pool = self._pool(stateful)
+            self._pending += 1
+
+        submitted = time.monotonic()
+        if isinstance(pool, ThreadPoolExecutor):
+            # Keep request ids and profiler stages visible inside the task
+            context = contextvars.copy_context()
+            future = pool.submit(context.run, _timed_call, fn, args, kwargs)
+        else:
+            future = pool.submit(_timed_call, fn, args, kwargs)
+        future.add_done_callback(self._release)
+
+        try:
+            result, started, run_seconds = await asyncio.wrap_future(future)
+        except Exception:
+            with self._lock:
+                self._task(task)["failed"] += 1
+            raise
+
+        with self._lock:
+            self._task(task)["completed"] += 1
+            self._timings[task].append((started - submitted, run_seconds))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report pool state and timing percentiles per task.
+
+        Returns:
+            Pool kind and limits, pending tasks and per-task counters with
+            queue wait and run time percentiles in seconds
+        """
+        with self._lock:
+            snapshot = {
+                task: (dict(counters), list(self._timings[task]))
+                for task, counters in self._counters.items()
+            }
+            pending = self._pending
+        tasks = {}
+        for task, (counters, timings) in snapshot.items():
+            waits = sorted(max(wait, 0.0) for wait, _ in timings)
+            runs = sorted(run for _, run in timings)
+            counters["wait_p50"] = _percentile(waits, 0.5)
+            counters["wait_p95"] = _percentile(waits, 0.95)
+            counters["run_p50"] = _percentile(runs, 0.5)
+            counters["run_p95"] = _percentile(runs, 0.95)
+            tasks[task] = counters
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "tasks": tasks,
+        }
+
+    def recycle_workers(self) -> None:
+        """Replace process workers so they load shared data afresh on next use."""
+        with self._lock:
+            processes, self._processes = self._processes, None
+        if processes is not None:
+            processes.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Stop the pools, dropping queued tasks. Pools restart on next use."""
+        with self._lock:
+            pools = [self._threads, self._processes]
+            self._threads = self._processes = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=1)
+def get_cpu_executor() -> CPUExecutor:
+    """
+    Get the process-wide CPU executor, created on first use.
+
+    Returns:
+        Shared CPU executor
+    """
+    return CPUExecutor(
+        settings.EXECUTOR_KIND,
+        settings.EXECUTOR_MAX_WORKERS,
+        settings.EXECUTOR_MAX_QUEUE,
+    )
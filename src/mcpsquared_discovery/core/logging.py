@@ -1,36 +1,158 @@
 """
 Logging configuration for the MCP Squared Discovery Service.
+
+Records are handed to a bounded in-memory queue and written by a background
+listener thread, so request handlers never block on stdout. Records are not
+formatted before they are queued: message arguments such as raw LLM responses
+are only rendered by the writer thread. Records with a mutable argument, such
+as a list the caller may still change, are formatted before they are queued.
+Values passed with ``extra`` are always written as they are when the writer
+gets to them, so they should not be mutated after logging.
+Debug records are sampled per request with ``LOG_DEBUG_SAMPLE_RATE``, so a
+sampled request keeps its whole debug trail.
 """
 
+import atexit
+import json
 import logging
+import queue
 import sys
-from typing import Any, Dict
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
 from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.request_context import client_id_var, request_id_var
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Attributes every LogRecord has; anything else was passed with ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Message arguments that cannot change while a record waits in the queue
+_IMMUTABLE_ARGS = (str, bytes, int, float, bool, type(None))
+
+_listener: Optional[QueueListener] = None
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the request and client ids of the current request to records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.client_id = client_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep debug records of a fixed fraction of requests."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(max(0.0, min(rate, 1.0)) * 10000)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.threshold >= 10000:
+            return True
+        request_id = getattr(record, "request_id", "-")
+        return zlib.crc32(request_id.encode("utf-8")) % 10000 < self.threshold
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue records without formatting them, dropping records when full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatted by the listener thread; records never leave the process.
+        # Mutable arguments could change before then, so render those now.
+        args = record.args
+        values = args.values() if isinstance(args, dict) else args or ()
+        if not all(isinstance(value, _IMMUTABLE_ARGS) for value in values):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        created = datetime.fromtimestamp(record.created, timezone.utc)
+        payload: Dict[str, Any] = {
+            "timestamp": created.isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
 
 def setup_logging() -> None:
     """
     Configure logging for the application.
-    
-    Sets up logging with appropriate level and format based on environment.
+
+    Sets up logging with appropriate level and format based on environment,
+    writing through a queue drained by a background thread.
     """
+    global _listener
+
     log_level = logging.DEBUG if settings.ENVIRONMENT == "development" else logging.INFO
-    
+    if settings.LOG_LEVEL:
+        log_level = logging.getLevelName(settings.LOG_LEVEL.upper())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_MAX_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
     # Configure root logger
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[logging.StreamHandler(sys.stdout)]
-    )
-    
+    logging.basicConfig(level=log_level, handlers=[queue_handler], force=True)
+
     # Set level for external libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("fastapi").setLevel(logging.INFO)
 
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def log_api_call(logger: logging.Logger, endpoint: str, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
     """
     Log API call details.
-    
+
     Args:
         logger: Logger instance
         endpoint: API endpoint called
@@ -46,13 +168,22 @@ def log_api_call(logger: logging.Logger, endpoint: str, payload: Dict[str, Any],
         }
     )
 
-def log_llm_call(logger: logging.Logger, prompt: str, response: str) -> None:
+
+def log_llm_call(
+    logger: logging.Logger, prompt: str, response: Any, **fields: Any
+) -> None:
     """
     Log LLM call details.
-    
+
+    The response is passed through unformatted and only rendered by the log
+    writer, so callers should hand over raw values rather than build strings.
+
     Args:
         logger: Logger instance
-        prompt: Input prompt
-        response: LLM response
+        prompt: Short description of the call
+        response: Raw LLM response or parsed result
+        **fields: Structured fields added to the record
     """
-    logger.debug("LLM Call - Prompt: %s, Response: %s", str(prompt), str(response)) 
\ No newline at end of file
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("LLM Call - Prompt: %s, Response: %s", prompt, response, extra=fields)
@@ -0,0 +1,197 @@
+"""
+Opt-in sampling profiler for single requests.
+
+A profiled request starts a thread that periodically reads the stacks of all
+other threads with ``sys._current_frames()`` and counts them in the collapsed
+format read by flame graph tools (``stage;thread;frame;frame count``). Each
+sample is prefixed with the pipeline stage the request was in, set through
+``mark_stage``. The event loop thread also runs other requests concurrently,
+so their frames can show up in a profile; profile under low traffic for clean
+results.
+
+Requests that are not profiled only pay for one context variable lookup per
+``mark_stage`` call.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
+from types import FrameType
+from typing import Dict, List, Optional
+
+from mcpsquared_discovery.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+STAGE_UNKNOWN = "request"
+
+
+class RequestProfiler:
+    """Sample thread stacks while one request runs."""
+
+    def __init__(
+        self, profile_id: str, interval_seconds: float, max_depth: int = 64
+    ):
+        self.profile_id = profile_id
+        self.interval_seconds = interval_seconds
+        self.max_depth = max_depth
+        self.stage = STAGE_UNKNOWN
+        self.samples: Counter = Counter()
+        self.stage_samples: Counter = Counter()
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _frame_stack(self, frame: Optional[FrameType]) -> List[str]:
+        """Frames from outermost to innermost as ``function (file:line)``."""
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            filename = code.co_filename.rsplit("/site-packages/", 1)[-1]
+            stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _sample(self) -> None:
+        """Count the current stack of every thread except the sampler."""
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stage = self.stage
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = self._frame_stack(frame)
+            if not stack:
+                continue
+            thread_name = names.get(thread_id, str(thread_id)).replace(";", ":")
+            frames = (entry.replace(";", ":") for entry in stack)
+            key = ";".join([stage, thread_name, *frames])
+            self.samples[key] += 1
+            self.stage_samples[stage] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self.started_at = time.time()
+        self._thread = threading.Thread(
+            target=self._run, name=f"profiler-{self.profile_id}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.time() - self.started_at
+
+    def collapsed(self) -> str:
+        """
+        Render the samples in collapsed stack format.
+
+        Returns:
+            One ``frames count`` line per distinct stack
+        """
+        return "\n".join(
+            f"{stack} {count}" for stack, count in sorted(self.samples.items())
+        )
+
+    def summary(self) -> Dict:
+        """
+        Summarize the profile.
+
+        Returns:
+            Profile id, start time, duration and sample counts per stage
+        """
+        return {
+            "profile_id": self.profile_id,
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration, 4),
+            "interval_seconds": self.interval_seconds,
+            "samples": sum(self.stage_samples.values()),
+            "samples_by_stage": dict(self.stage_samples),
+        }
+
+
+# Profiler of the current request, None when the request is not profiled
+profiler_var: ContextVar[Optional[RequestProfiler]] = ContextVar(
+    "profiler", default=None
+)
+
+
+def mark_stage(stage: str) -> None:
+    """
+    Attribute subsequent samples of the current request to a pipeline stage.
+
+    Args:
+        stage: Pipeline stage name
+    """
+    profiler = profiler_var.get()
+    if profiler is not None:
+        profiler.stage = stage
+
+
+class ProfileStore:
+    """Most recent finished profiles, kept in memory."""
+
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, RequestProfiler]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profiler: RequestProfiler) -> None:
+        """
+        Keep a finished profile, evicting the oldest beyond the limit.
+
+        Args:
+            profiler: Stopped profiler
+        """
+        with self._lock:
+            self._profiles[profiler.profile_id] = profiler
+            self._profiles.move_to_end(profiler.profile_id)
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfiler]:
+        """
+        Look up a stored profile.
+
+        Args:
+            profile_id: Profile id returned in the X-Profile-Id header
+
+        Returns:
+            Profiler, or None if unknown or evicted
+        """
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def summaries(self) -> List[Dict]:
+        """
+        Summaries of the stored profiles, newest first.
+
+        Returns:
+            List of profile summaries
+        """
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [profiler.summary() for profiler in reversed(profiles)]
+
+
+@lru_cache(maxsize=1)
+def get_profile_store() -> ProfileStore:
+    """
+    Get the process-wide store of recent profiles, created on first use.
+
+    Returns:
+        Shared profile store
+    """
+    return ProfileStore(settings.PROFILE_HISTORY)
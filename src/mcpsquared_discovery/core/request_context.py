@@ -0,0 +1,14 @@
+"""
+Request-scoped values shared with services through context variables.
+"""
+
+from contextvars import ContextVar
+
+CLIENT_ID_HEADER = "X-Client-Id"
+REQUEST_ID_HEADER = "X-Request-Id"
+
+# Identifies the caller for fair queuing of LLM calls
+client_id_var: ContextVar[str] = ContextVar("client_id", default="anonymous")
+
+# Correlates log records of one request
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
@@ -2,41 +2,146 @@
 Main application module for MCP Squared Discovery Service.
 """
 
-from fastapi import FastAPI, Form
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-import os
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
 
+from mcpsquared_discovery.api import admin
 from mcpsquared_discovery.api.routes import router
 from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.executor import get_cpu_executor
 from mcpsquared_discovery.core.logging import setup_logging
+from mcpsquared_discovery.core.profiling import (
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    RequestProfiler,
+    get_profile_store,
+    profiler_var,
+)
+from mcpsquared_discovery.core.request_context import (
+    CLIENT_ID_HEADER,
+    REQUEST_ID_HEADER,
+    client_id_var,
+    request_id_var,
+)
 from mcpsquared_discovery.models.schemas import ProjectContext
+from mcpsquared_discovery.services.llm import preload_llm_tooling
+from mcpsquared_discovery.services.preranker import get_selection_recorder
+from mcpsquared_discovery.services.stack_table import load_stack_table
+from mcpsquared_discovery.services.traffic import get_traffic_recorder
+from mcpsquared_discovery.services.warmup import cancel_warmup, schedule_warmup
 
-# Initialize logging
-setup_logging()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Configure tracing and warm up LLM tooling and caches without blocking startup."""
+    # Initialize logging
+    setup_logging()
+    # Initialize Langsmith tracing
+    settings.setup_langchain_env()
+    preload = None
+    if settings.LLM_PRELOAD_ON_STARTUP:
+        preload = asyncio.create_task(asyncio.to_thread(preload_llm_tooling))
+    if settings.TRAFFIC_CAPTURE_ENABLED:
+        get_traffic_recorder().start()
+    if settings.SELECTION_LOG_ENABLED:
+        get_selection_recorder().start()
+    stack_table = None
+    if settings.STACK_TABLE_ENABLED:
+        stack_table = asyncio.create_task(
+            get_cpu_executor().run("index build", load_stack_table, stateful=True)
+        )
+    if settings.WARMUP_ON_STARTUP:
+        schedule_warmup()
+    yield
+    for task in (preload, stack_table):
+        if task is not None and not task.done():
+            task.cancel()
+    cancel_warmup()
+    get_traffic_recorder().stop()
+    get_selection_recorder().stop()
+    get_cpu_executor().shutdown()
 
-# Initialize Langsmith tracing
-os.environ["LANGCHAIN_TRACING_V2"] = str(settings.LANGCHAIN_TRACING_V2).lower()
-os.environ["LANGCHAIN_ENDPOINT"] = settings.LANGCHAIN_ENDPOINT
-os.environ["LANGCHAIN_API_KEY"] = settings.LANGCHAIN_API_KEY
-os.environ["LANGCHAIN_PROJECT"] = settings.LANGCHAIN_PROJECT
 
 app = FastAPI(
     title="MCP Squared Discovery Service",
     description="A service to recommend MCP Servers based on project context",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+
+def cors_middleware(app: ASGIApp) -> CORSMiddleware:
+    """Build the CORS middleware when the app starts, once settings can be read."""
+    return CORSMiddleware(
+        app,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+
 # Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(cors_middleware)
 
 # Include API routes
 app.include_router(router)
+app.include_router(admin.router)
+
+# Requests that may be run under the sampling profiler
+PROFILED_PATHS = {"/discover", "/discover-json"}
+
+
+async def profile_request(request: Request, call_next):
+    """Run a discovery request under the sampling profiler when asked to."""
+    if request.url.path not in PROFILED_PATHS:
+        return await call_next(request)
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get("profile")
+    if flag not in ("1", "true"):
+        return await call_next(request)
+
+    # Generated here so a client cannot pick, and overwrite, another profile
+    profiler = RequestProfiler(
+        uuid.uuid4().hex, settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+    )
+    profiler_var.set(profiler)
+    profiler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.stop()
+        get_profile_store().add(profiler)
+    response.headers[PROFILE_ID_HEADER] = profiler.profile_id
+    return response
+
+
+def profiling_middleware(app: ASGIApp) -> ASGIApp:
+    """Add the profiling middleware when the app starts, only if it is enabled."""
+    if not settings.PROFILING_ENABLED:
+        return app
+    return BaseHTTPMiddleware(app, dispatch=profile_request)
+
+
+app.add_middleware(profiling_middleware)
+
+
+@app.middleware("http")
+async def bind_client_id(request: Request, call_next):
+    """Identify the caller for fair queuing of LLM calls and the request for logs."""
+    client_id = request.headers.get(CLIENT_ID_HEADER)
+    if not client_id and request.client:
+        client_id = request.client.host
+    client_id_var.set(client_id or "anonymous")
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex[:16]
+    request_id_var.set(request_id[:64])
+    response = await call_next(request)
+    response.headers[REQUEST_ID_HEADER] = request_id_var.get()
+    return response
 
 
 @app.get("/health")
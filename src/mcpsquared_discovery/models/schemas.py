@@ -2,7 +2,7 @@
 Pydantic models for request and response schemas.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 from urllib.parse import urlparse
 
 from pydantic import BaseModel, Field, AnyHttpUrl, field_validator
@@ -88,6 +88,38 @@ class DiscoveryResponse(BaseModel):
     )
 
 
+class SearchFilters(BaseModel):
+    """Facet filters applied to the catalog before scoring."""
+
+    category: List[str] = Field(
+        default_factory=list,
+        description="Catalog categories: reference, official, community or curated",
+    )
+    install_method: List[str] = Field(
+        default_factory=list,
+        description="Install methods: npx, uvx, docker, npm, pip or other",
+    )
+    language: List[str] = Field(
+        default_factory=list,
+        description="Implementation languages, e.g. typescript, python, go, rust",
+    )
+
+    @field_validator("category", "install_method", "language")
+    @classmethod
+    def normalize_values(cls, v: List[str]) -> List[str]:
+        """Lowercase values and drop empty ones."""
+        return [value.strip().lower() for value in v if value and value.strip()]
+
+    def active(self) -> Dict[str, List[str]]:
+        """
+        Filters that restrict the catalog.
+
+        Returns:
+            Facet name to accepted values, without empty facets
+        """
+        return {facet: values for facet, values in self.model_dump().items() if values}
+
+
 class DiscoveryRequest(BaseModel):
     """Request model for the discovery endpoint."""
 
@@ -95,3 +127,10 @@ class DiscoveryRequest(BaseModel):
     context: Optional[ProjectContext] = Field(
         None, description="Additional project context"
     )
+    mode: Literal["auto", "local"] = Field(
+        "auto",
+        description="auto uses the LLM when healthy, local never calls it",
+    )
+    filters: Optional[SearchFilters] = Field(
+        None, description="Restrict recommendations to catalog facets"
+    )
@@ -0,0 +1,5 @@
+"""
+Offline discovery for clients that embed the exported index bundle.
+"""
+
+from mcpsquared_discovery.offline.local_index import LocalIndex
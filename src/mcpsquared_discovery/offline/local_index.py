@@ -0,0 +1,767 @@
+"""
+Standalone search over an exported MCP server index bundle.
+
+This module only uses the standard library and imports nothing else from the
+package. The MCP Squared client can embed it, or copy this single file, to
+answer simple discovery requests offline and call the service only when LLM
+reasoning is needed. The service ranks with the same functions
+(``services/search.py``), so local and server-side results agree.
+
+Typical client use::
+
+    index = LocalIndex.from_bytes(bundle_bytes)      # GET /index/bundle
+    index = index.apply_delta(delta_bytes)           # GET /index/bundle?since=...
+    answer = index.answer("I use postgres", dependencies=["pg"])
+    if answer["needs_server"]:
+        ...  # POST /discover-json
+"""
+
+import gzip
+import heapq
+import json
+import re
+from array import array
+from collections import Counter
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+BUNDLE_FORMAT = 1
+
+# Words too common to tell servers apart when measuring similarity
+TERM_STOPWORDS = frozenset(
+    "mcp server servers and the for with your from using that this into via model "
+    "context protocol provides allows enables tools".split()
+)
+
+# Prompt words that say what the user wants rather than what they use
+PROMPT_STOPWORDS = frozenset(
+    "need want use uses build building project app application help like would "
+    "should could make some something that have what which please tool".split()
+)
+
+# Weights for title, description, content, CLI command and GitHub URL matches
+FIELD_WEIGHTS = (0.5, 0.3, 0.2, 0.1, 0.1)
+
+# Bundle sections sent whole in deltas because they refer to catalog positions
+_INDEX_SECTIONS = ("facets", "trigram_keywords", "technologies", "search")
+
+# Record fields matched by queries, in FIELD_WEIGHTS order
+_SEARCH_FIELDS = ("title", "description", "content", "cli_command", "github_url")
+
+_TECHNOLOGY_WORD = re.compile(r"[a-z0-9@][a-z0-9@/._-]*")
+
+
+def extract_terms(text: str) -> FrozenSet[str]:
+    """
+    Extract the distinctive words of a text.
+
+    Args:
+        text: Free text
+
+    Returns:
+        Lowercase words of three or more characters, without stopwords
+    """
+    words = re.findall(r"[a-z0-9]{3,}", text.lower())
+    return frozenset(word for word in words if word not in TERM_STOPWORDS)
+
+
+def score_server_match(server: Any, query: str) -> float:
+    """
+    Score how well a server matches a query.
+
+    Args:
+        server: Record with precomputed lowercase ``search_fields``
+        query: Search query string
+
+    Returns:
+        Match score between 0 and 1
+    """
+    query = query.lower()
+    score = 0.0
+    for weight, field in zip(FIELD_WEIGHTS, server.search_fields):
+        if query in field:
+            score += weight
+    return min(score, 1.0)
+
+
+def top_k(scored: Iterable[Tuple[float, int]], k: int) -> List[Tuple[float, int]]:
+    """
+    Select the k best (score, catalog index) pairs without a full sort.
+
+    Args:
+        scored: Scores paired with catalog indices
+        k: Number of results to keep
+
+    Returns:
+        Best pairs by descending score, earlier catalog entries first on ties
+    """
+    return heapq.nlargest(k, scored, key=lambda item: (item[0], -item[1]))
+
+
+def term_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """
+    Jaccard similarity of two term sets.
+
+    Args:
+        a: Terms of the first record
+        b: Terms of the second record
+
+    Returns:
+        Similarity between 0 and 1
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def diversify(
+    candidates: List[Tuple[float, Any]], k: int, mmr_lambda: float
+) -> List[Any]:
+    """
+    Pick k candidates by maximal marginal relevance.
+
+    Each step takes the candidate with the best trade-off between its score
+    and its similarity to the records already picked, so the result is not
+    dominated by near-identical servers.
+
+    Args:
+        candidates: (score, record) pairs sorted by descending score
+        k: Number of records to pick
+        mmr_lambda: Weight of relevance against redundancy, 1.0 disables diversity
+
+    Returns:
+        Selected records in pick order
+    """
+    if not candidates:
+        return []
+    best_score = candidates[0][0] or 1.0
+    remaining = list(candidates)
+    selected: List[Any] = []
+
+    while remaining and len(selected) < k:
+        best_position, best_value = 0, float("-inf")
+        for position, (score, record) in enumerate(remaining):
+            redundancy = max(
+                (term_similarity(record.terms, chosen.terms) for chosen in selected),
+                default=0.0,
+            )
+            value = mmr_lambda * score / best_score - (1 - mmr_lambda) * redundancy
+            if value > best_value:
+                best_position, best_value = position, value
+        selected.append(remaining.pop(best_position)[1])
+
+    return selected
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    Yield the positions of set bits in ascending order.
+
+    Args:
+        mask: Bitset
+
+    Yields:
+        Catalog indices contained in the bitset
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class FacetBitsets:
+    """Bitsets of catalog indices per facet value."""
+
+    def __init__(self, bits: Dict[str, Dict[str, int]], size: int):
+        self._bits = bits
+        self.size = size
+        self.all = (1 << size) - 1
+
+    def matching(self, filters: Optional[Mapping[str, Sequence[str]]]) -> Optional[int]:
+        """
+        Resolve filters to a bitset of matching catalog indices.
+
+        Values of one facet are alternatives and different facets must all match.
+
+        Args:
+            filters: Facet name to accepted values; empty value lists are ignored
+
+        Returns:
+            Bitset of matching records, or None if no filter is active
+        """
+        mask = None
+        for facet, values in (filters or {}).items():
+            if not values:
+                continue
+            facet_bits = self._bits.get(facet, {})
+            allowed = 0
+            for value in values:
+                allowed |= facet_bits.get(value.lower(), 0)
+            mask = allowed if mask is None else mask & allowed
+        return mask
+
+    def counts(self, mask: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Count records per facet value, optionally within a bitset.
+
+        Args:
+            mask: Bitset to count within, all records if None
+
+        Returns:
+            Facet name to value counts
+        """
+        mask = self.all if mask is None else mask
+        return {
+            facet: {
+                value: (bits & mask).bit_count()
+                for value, bits in sorted(facet_bits.items())
+            }
+            for facet, facet_bits in self._bits.items()
+        }
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        """
+        Serialize the bitsets with values as hex strings.
+
+        Returns:
+            JSON-compatible facet bitsets
+        """
+        return {
+            facet: {value: format(bits, "x") for value, bits in facet_bits.items()}
+            for facet, facet_bits in self._bits.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, str]], size: int) -> "FacetBitsets":
+        """
+        Load bitsets serialized by ``to_dict``.
+
+        Args:
+            data: Facet bitsets with hex values
+            size: Number of catalog records
+
+        Returns:
+            Facet bitsets
+        """
+        bits = {
+            facet: {value: int(hex_bits, 16) for value, hex_bits in values.items()}
+            for facet, values in data.items()
+        }
+        return cls(bits, size)
+
+
+def trigrams(word: str) -> Set[str]:
+    """
+    Split a word into padded character trigrams, as PostgreSQL's pg_trgm does.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Set of trigrams
+    """
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Trigram postings over keywords, each keyword pointing at catalog records.
+
+    Postings are ``array`` objects of unsigned ints rather than Python lists,
+    so the index costs a few bytes per entry. Similarity is the number of
+    shared trigrams divided by the size of the union.
+    """
+
+    def __init__(self, keywords: Mapping[str, Iterable[int]]):
+        self.keywords: List[str] = sorted(keywords)
+        # Record indices per keyword id
+        self._records: List[array] = [
+            array("I", sorted(set(keywords[word]))) for word in self.keywords
+        ]
+        # Trigram count per keyword id, for the similarity denominator
+        self._sizes = array("H")
+        postings: Dict[str, List[int]] = {}
+        for keyword_id, word in enumerate(self.keywords):
+            grams = trigrams(word)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(keyword_id)
+        self._postings: Dict[str, array] = {
+            gram: array("I", ids) for gram, ids in postings.items()
+        }
+
+    @property
+    def trigram_count(self) -> int:
+        """Number of distinct trigrams in the index."""
+        return len(self._postings)
+
+    def _similar(self, word: str, threshold: float) -> List[Tuple[float, int]]:
+        """Keyword ids similar to a word with their similarity."""
+        grams = trigrams(word.lower())
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for keyword_id in self._postings.get(gram, ()):
+                shared[keyword_id] = shared.get(keyword_id, 0) + 1
+
+        matches = []
+        for keyword_id, count in shared.items():
+            similarity = count / (len(grams) + self._sizes[keyword_id] - count)
+            if similarity >= threshold:
+                matches.append((similarity, keyword_id))
+        return matches
+
+    def lookup(self, word: str, threshold: float) -> List[Tuple[float, str]]:
+        """
+        Find keywords similar to a word.
+
+        Args:
+            word: Word to look up, in any case
+            threshold: Minimum similarity between 0 and 1
+
+        Returns:
+            (similarity, keyword) pairs, most similar first
+        """
+        matches = self._similar(word, threshold)
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [(similarity, self.keywords[i]) for similarity, i in matches]
+
+    def match_records(self, word: str, threshold: float) -> Dict[int, float]:
+        """
+        Find catalog records with a keyword similar to a word.
+
+        Args:
+            word: Word to look up
+            threshold: Minimum similarity between 0 and 1
+
+        Returns:
+            Catalog index to the best similarity of any of its keywords
+        """
+        records: Dict[int, float] = {}
+        for similarity, keyword_id in self._similar(word, threshold):
+            for index in self._records[keyword_id]:
+                if similarity > records.get(index, 0.0):
+                    records[index] = similarity
+        return records
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        """
+        Serialize the keyword to record mapping; postings are rebuilt on load.
+
+        Returns:
+            Keyword to catalog indices
+        """
+        return {word: list(self._records[i]) for i, word in enumerate(self.keywords)}
+
+
+def detect_technologies(
+    content: str,
+    dependencies: Iterable[str],
+    keywords: Mapping[str, Sequence[str]],
+    dependency_only: Iterable[str] = (),
+) -> List[str]:
+    """
+    Detect well-known technologies in dependencies and free text.
+
+    Args:
+        content: File contents or prompt text
+        dependencies: Declared dependency names
+        keywords: Technology name to the markers that indicate it
+        dependency_only: Markers too generic to trust outside of dependencies
+
+    Returns:
+        Sorted list of detected technology names
+    """
+    lowered = content.lower()
+    words = set(_TECHNOLOGY_WORD.findall(lowered))
+    dependencies = set(dependencies)
+    dependency_only = set(dependency_only)
+
+    found = set()
+    for technology, markers in keywords.items():
+        for marker in markers:
+            if marker in dependencies:
+                found.add(technology)
+                break
+            if marker in dependency_only:
+                continue
+            if marker in words or (" " in marker and marker in lowered):
+                found.add(technology)
+                break
+    return sorted(found)
+
+
+def fuzzy_matches(
+    words: Iterable[str], trigram_index: TrigramIndex, threshold: float
+) -> Dict[int, float]:
+    """
+    Match possibly misspelled words against the trigram index.
+
+    Args:
+        words: Words from the queries and prompt
+        trigram_index: Index over catalog titles
+        threshold: Minimum trigram similarity
+
+    Returns:
+        Catalog index to the similarity of the best matching word
+    """
+    matches: Dict[int, float] = {}
+    for word in words:
+        if len(word) < 4:
+            continue
+        for index, similarity in trigram_index.match_records(word, threshold).items():
+            if similarity > matches.get(index, 0.0):
+                matches[index] = similarity
+    return matches
+
+
+def rank_servers(
+    servers: Sequence[Any],
+    candidates: Sequence[Any],
+    queries: Sequence[str],
+    prompt: str,
+    trigram_index: TrigramIndex,
+    k: int,
+    min_score: float,
+    pool_size: int,
+    mmr_lambda: float,
+    trigram_threshold: float,
+) -> Tuple[List[Any], bool]:
+    """
+    Rank catalog records for a set of queries.
+
+    Scores are summed across queries, so servers relevant to several
+    technologies rank higher. When nothing matches exactly, query and prompt
+    words are matched against titles with the trigram index. The best
+    ``pool_size`` results are then diversified down to ``k``.
+
+    Args:
+        servers: All catalog records, indexed by their ``index``
+        candidates: Records allowed by facet filters
+        queries: Search queries
+        prompt: User prompt, used for typo-tolerant matching
+        trigram_index: Index over catalog titles
+        k: Maximum number of results
+        min_score: Minimum per-query match score
+        pool_size: Top scoring results considered when diversifying
+        mmr_lambda: Relevance versus diversity trade-off
+        trigram_threshold: Minimum trigram similarity
+
+    Returns:
+        Ranked records and whether they came from exact matches
+    """
+    totals: Dict[int, float] = {}
+    for query in queries:
+        for server in candidates:
+            score = score_server_match(server, query)
+            if score > 0 and score >= min_score:
+                totals[server.index] = totals.get(server.index, 0.0) + score
+
+    exact = bool(totals)
+    if not exact:
+        # Nothing matched exactly, so try misspelled names like "postgress"
+        words = set(extract_terms(" ".join(queries)))
+        words |= extract_terms(prompt) - PROMPT_STOPWORDS
+        fuzzy = fuzzy_matches(words, trigram_index, trigram_threshold)
+        allowed = None
+        if len(candidates) != len(servers):
+            allowed = {server.index for server in candidates}
+        totals = {
+            index: score
+            for index, score in fuzzy.items()
+            if allowed is None or index in allowed
+        }
+
+    scored = ((score, index) for index, score in totals.items())
+    pool = top_k(scored, max(k, pool_size))
+    ranked = [(score, servers[index]) for score, index in pool]
+    return diversify(ranked, k, mmr_lambda), exact
+
+
+def record_key(record: Mapping[str, Any]) -> str:
+    """
+    Stable identity of a bundle record across versions.
+
+    Args:
+        record: Bundle record
+
+    Returns:
+        Lowercase GitHub URL, or the title for records without one
+    """
+    url = (record.get("github_url") or "").strip().lower().rstrip("/")
+    return url or f"title:{record.get('title', '')}"
+
+
+def record_keys(servers: Sequence[Mapping[str, Any]]) -> List[str]:
+    """
+    Identify bundle records, which deltas require to be unique.
+
+    Args:
+        servers: Bundle records in catalog order
+
+    Returns:
+        ``record_key`` of each record, in the same order
+
+    Raises:
+        ValueError: If two records share a key
+    """
+    keys = [record_key(record) for record in servers]
+    duplicates = sorted(key for key, count in Counter(keys).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Bundle records share keys: {', '.join(duplicates)}")
+    return keys
+
+
+def compute_delta(old: Mapping[str, Any], new: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Compute the changes between two bundles.
+
+    Records are sent only when new or changed. The record order and the index
+    sections refer to catalog positions, so they are sent whole.
+
+    Args:
+        old: Bundle the client has
+        new: Current bundle
+
+    Returns:
+        Delta that ``apply_delta`` turns ``old`` into ``new`` with
+
+    Raises:
+        ValueError: If records of either bundle share a ``record_key``
+    """
+    old_records = dict(zip(record_keys(old["servers"]), old["servers"]))
+    order = record_keys(new["servers"])
+    changed = {
+        key: record
+        for key, record in zip(order, new["servers"])
+        if old_records.get(key) != record
+    }
+    return {
+        "format": BUNDLE_FORMAT,
+        "type": "delta",
+        "from_version": old["version"],
+        "version": new["version"],
+        "order": order,
+        "changed": changed,
+        **{key: new[key] for key in _INDEX_SECTIONS},
+    }
+
+
+def apply_delta(bundle: Mapping[str, Any], delta: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a delta to a bundle.
+
+    Args:
+        bundle: Bundle the delta was computed from
+        delta: Result of ``compute_delta``
+
+    Returns:
+        Updated bundle
+
+    Raises:
+        ValueError: If the delta does not start from this bundle's version
+    """
+    if delta["from_version"] != bundle["version"]:
+        raise ValueError(
+            f"Delta from {delta['from_version']} cannot apply to {bundle['version']}"
+        )
+    records = {record_key(record): record for record in bundle["servers"]}
+    records.update(delta["changed"])
+    updated = {key: delta[key] for key in ("format", "version", *_INDEX_SECTIONS)}
+    updated["type"] = "bundle"
+    updated["servers"] = [records[key] for key in delta["order"]]
+    return updated
+
+
+def encode_bundle(data: Mapping[str, Any]) -> bytes:
+    """
+    Serialize a bundle or delta as gzip-compressed JSON.
+
+    Args:
+        data: Bundle or delta
+
+    Returns:
+        Compressed bytes, identical for identical input
+    """
+    raw = json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return gzip.compress(raw, mtime=0)
+
+
+def decode_bundle(data: bytes) -> Dict[str, Any]:
+    """
+    Deserialize a bundle or delta from ``encode_bundle``.
+
+    Args:
+        data: Compressed bytes
+
+    Returns:
+        Bundle or delta
+
+    Raises:
+        ValueError: If the bundle format is not supported
+    """
+    decoded = json.loads(gzip.decompress(data))
+    if decoded.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported index bundle format {decoded.get('format')}")
+    return decoded
+
+
+class IndexedServer:
+    """A bundle record with the fields the ranking functions read."""
+
+    __slots__ = ("index", "data", "search_fields", "terms")
+
+    def __init__(self, index: int, data: Dict[str, Any]):
+        self.index = index
+        self.data = data
+        self.search_fields = tuple(
+            (data.get(field) or "").lower()
+            for field in _SEARCH_FIELDS
+        )
+        self.terms = extract_terms(f"{data['title']} {data['description']}")
+
+
+class LocalIndex:
+    """Offline search over an index bundle."""
+
+    def __init__(self, bundle: Dict[str, Any]):
+        self.bundle = bundle
+        self.servers = [
+            IndexedServer(index, record)
+            for index, record in enumerate(bundle["servers"])
+        ]
+        self.facets = FacetBitsets.from_dict(bundle["facets"], len(self.servers))
+        self.trigrams = TrigramIndex(bundle["trigram_keywords"])
+        self.search_settings: Dict[str, Any] = bundle["search"]
+
+    @property
+    def version(self) -> str:
+        """Catalog version of the bundle."""
+        return self.bundle["version"]
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LocalIndex":
+        """
+        Load an index from a downloaded bundle.
+
+        Args:
+            data: Body of ``GET /index/bundle``
+
+        Returns:
+            Local index
+        """
+        return cls(decode_bundle(data))
+
+    def apply_delta(self, data: bytes) -> "LocalIndex":
+        """
+        Update the index with a downloaded delta or full bundle.
+
+        Args:
+            data: Body of ``GET /index/bundle?since=<version>``
+
+        Returns:
+            New local index at the served version
+        """
+        payload = decode_bundle(data)
+        if payload.get("type") == "delta":
+            return LocalIndex(apply_delta(self.bundle, payload))
+        return LocalIndex(payload)
+
+    def search(
+        self,
+        prompt: str,
+        queries: Optional[Sequence[str]] = None,
+        dependencies: Iterable[str] = (),
+        filters: Optional[Mapping[str, Sequence[str]]] = None,
+        k: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Rank servers the way the service's local search does.
+
+        Args:
+            prompt: User prompt
+            queries: Search queries, detected technologies if None
+            dependencies: Declared project dependencies
+            filters: Facet name to accepted values
+            k: Maximum number of results
+
+        Returns:
+            Ranked server records and whether they came from exact matches
+        """
+        search = self.search_settings
+        if queries is None:
+            technologies = self.bundle["technologies"]
+            queries = detect_technologies(
+                prompt,
+                dependencies,
+                technologies["keywords"],
+                technologies["dependency_only"],
+            )
+        mask = self.facets.matching(filters)
+        candidates = self.servers
+        if mask is not None:
+            candidates = [self.servers[index] for index in iter_bits(mask)]
+
+        ranked, exact = rank_servers(
+            self.servers,
+            candidates,
+            queries,
+            prompt,
+            self.trigrams,
+            k or search["k"],
+            search["min_score"],
+            search["pool_size"],
+            search["mmr_lambda"],
+            search["trigram_threshold"],
+        )
+        return [server.data for server in ranked], exact
+
+    def answer(
+        self,
+        prompt: str,
+        dependencies: Iterable[str] = (),
+        filters: Optional[Mapping[str, Sequence[str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Answer a discovery request locally when no LLM reasoning is needed.
+
+        The local answer is trusted when every technology detected in the
+        prompt and dependencies has an exact catalog match. Otherwise the
+        client should send the request to the service.
+
+        Args:
+            prompt: User prompt
+            dependencies: Declared project dependencies
+            filters: Facet name to accepted values
+
+        Returns:
+            Dictionary with ``servers``, ``needs_server`` and ``version``
+        """
+        technologies = self.bundle["technologies"]
+        detected = detect_technologies(
+            prompt,
+            dependencies,
+            technologies["keywords"],
+            technologies["dependency_only"],
+        )
+        servers, exact = self.search(prompt, detected, filters=filters)
+        covered = all(
+            any(score_server_match(server, tech) for server in self.servers)
+            for tech in detected
+        )
+        return {
+            "version": self.version,
+            "servers": servers,
+            "needs_server": not (detected and exact and covered and servers),
+        }
@@ -0,0 +1,306 @@
+"""
+Learned pre-ranking of search candidates.
+
+A logistic regression model estimates how likely the LLM is to select each
+candidate of a discovery request, from features of the project context and of
+the candidate. It is trained offline from logged selections, see
+``tools/train_preranker.py``, and stored as JSON. Like ``local_index`` this
+module only uses the standard library, so clients embedding the index bundle
+can score candidates with a downloaded model as well.
+
+Contexts are described by detected technologies, prompt keywords and hashed
+dependency words, so selection logs and models do not contain dependency names
+in plain text. The hashes are unsalted, so that clients can compute the same
+features, which means a known name can be recognized by hashing it; and prompt
+keywords are kept as typed, so names a user writes into the prompt appear in
+logs and in model feature names. Hashed dependencies are matched against
+hashed candidate terms.
+"""
+
+import hashlib
+import math
+import random
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from mcpsquared_discovery.offline.local_index import PROMPT_STOPWORDS, extract_terms
+
+MODEL_FORMAT = 1
+
+# Dependency words matched by a candidate beyond which the feature saturates
+_MAX_DEPENDENCY_MATCHES = 3
+
+Example = Tuple[Dict[str, float], int]
+
+
+def hash_word(word: str) -> str:
+    """
+    Hash a word so it can be compared without being stored.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        First 10 hex digits of its sha1
+    """
+    return hashlib.sha1(word.encode("utf-8")).hexdigest()[:10]
+
+
+def describe_context(
+    prompt: str, technologies: Iterable[str], dependencies: Iterable[str]
+) -> Dict[str, List[str]]:
+    """
+    Reduce a project context to the inputs of the pre-ranking features.
+
+    Args:
+        prompt: User prompt, already scrubbed of identifying values
+        technologies: Technologies detected in the project
+        dependencies: Dependency names from the project manifests
+
+    Returns:
+        Sorted technologies, prompt keywords and hashed dependency words
+    """
+    return {
+        "technologies": sorted({tech.lower() for tech in technologies}),
+        "keywords": sorted(extract_terms(prompt) - PROMPT_STOPWORDS),
+        "dependencies": sorted(
+            {hash_word(word) for word in extract_terms(" ".join(dependencies))}
+        ),
+    }
+
+
+def describe_candidate(
+    key: str,
+    title: str,
+    terms: Iterable[str],
+    category: str,
+    install_method: str,
+    rank: int,
+) -> Dict[str, Any]:
+    """
+    Reduce a search candidate to the inputs of the pre-ranking features.
+
+    Args:
+        key: Stable identity of the server, see ``local_index.record_key``
+        title: Server title
+        terms: Distinctive words of the title and description
+        category: Catalog category
+        install_method: How the server is installed
+        rank: Position in the search results, from 0
+
+    Returns:
+        Candidate description
+    """
+    return {
+        "key": key,
+        "title": title,
+        "terms": sorted(terms),
+        "category": category,
+        "install_method": install_method,
+        "rank": rank,
+    }
+
+
+def candidate_features(
+    context: Mapping[str, Sequence[str]], candidate: Mapping[str, Any]
+) -> Dict[str, float]:
+    """
+    Compute the sparse features of a candidate for a context.
+
+    Args:
+        context: Output of ``describe_context``
+        candidate: Output of ``describe_candidate``
+
+    Returns:
+        Feature names mapped to values
+    """
+    key = candidate["key"]
+    terms = set(candidate["terms"])
+    features = {
+        "bias": 1.0,
+        "rank": 1.0 / (1 + candidate["rank"]),
+        f"category={candidate['category']}": 1.0,
+        f"install={candidate['install_method']}": 1.0,
+        f"server={key}": 1.0,
+    }
+
+    technologies = context["technologies"]
+    if technologies:
+        matched = [tech for tech in technologies if extract_terms(tech) & terms]
+        features["technology_match"] = len(matched) / len(technologies)
+        for tech in technologies:
+            features[f"technology={tech}|server={key}"] = 1.0
+            features[f"technology={tech}|category={candidate['category']}"] = 1.0
+
+    keywords = context["keywords"]
+    if keywords:
+        features["keyword_match"] = len(terms.intersection(keywords)) / len(keywords)
+        for keyword in keywords:
+            features[f"keyword={keyword}|server={key}"] = 1.0
+
+    if context["dependencies"]:
+        hashed_terms = {hash_word(term) for term in terms}
+        matched_count = len(hashed_terms.intersection(context["dependencies"]))
+        features["dependency_match"] = (
+            min(matched_count, _MAX_DEPENDENCY_MATCHES) / _MAX_DEPENDENCY_MATCHES
+        )
+    return features
+
+
+def examples_from_event(event: Mapping[str, Any]) -> List[Example]:
+    """
+    Turn a logged selection into labeled training examples.
+
+    Candidates the LLM was not shown, because the pre-ranker dropped them,
+    have no label and give no example.
+
+    Args:
+        event: Selection event with "context", "candidates" and "selected"
+            keys, and "shown" when only some candidates were shown
+
+    Returns:
+        One (features, label) pair per shown candidate, labeled 1 if it was
+        selected
+    """
+    selected = set(event["selected"])
+    shown = event.get("shown")
+    return [
+        (
+            candidate_features(event["context"], candidate),
+            int(candidate["key"] in selected),
+        )
+        for candidate in event["candidates"]
+        if shown is None or candidate["key"] in shown
+    ]
+
+
+def _sigmoid(z: float) -> float:
+    """Logistic function, safe for large magnitudes."""
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+class LogisticModel:
+    """Sparse logistic regression over named features."""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.weights: Dict[str, float] = dict(weights or {})
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+
+    def probability(self, features: Mapping[str, float]) -> float:
+        """
+        Estimate the probability that a candidate is selected.
+
+        Args:
+            features: Output of ``candidate_features``
+
+        Returns:
+            Probability between 0 and 1
+        """
+        weights = self.weights
+        z = sum(weights.get(name, 0.0) * value for name, value in features.items())
+        return _sigmoid(z)
+
+    def fit(
+        self,
+        examples: Sequence[Example],
+        epochs: int = 10,
+        learning_rate: float = 0.1,
+        l2: float = 1e-4,
+        seed: int = 0,
+    ) -> None:
+        """
+        Train with stochastic gradient descent and L2 regularization.
+
+        Regularization is applied to the weights of the features an example
+        has, which keeps updates proportional to the example size.
+
+        Args:
+            examples: (features, label) pairs
+            epochs: Passes over the examples
+            learning_rate: Initial step size, decayed with the square root of
+                the epoch
+            l2: Regularization strength
+            seed: Seed for shuffling the examples
+        """
+        rng = random.Random(seed)
+        order = list(range(len(examples)))
+        weights = self.weights
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            step = learning_rate / math.sqrt(1 + epoch)
+            for position in order:
+                features, label = examples[position]
+                error = self.probability(features) - label
+                for name, value in features.items():
+                    weight = weights.get(name, 0.0)
+                    weights[name] = weight - step * (error * value + l2 * weight)
+
+    def evaluate(self, examples: Sequence[Example]) -> Dict[str, float]:
+        """
+        Measure the model on labeled examples.
+
+        Args:
+            examples: (features, label) pairs
+
+        Returns:
+            Mean log loss, and accuracy, precision and recall at probability 0.5
+        """
+        loss = 0.0
+        true_positives = false_positives = false_negatives = correct = 0
+        for features, label in examples:
+            p = min(max(self.probability(features), 1e-12), 1 - 1e-12)
+            loss -= math.log(p) if label else math.log(1 - p)
+            predicted = p >= 0.5
+            correct += predicted == bool(label)
+            true_positives += predicted and bool(label)
+            false_positives += predicted and not label
+            false_negatives += not predicted and bool(label)
+        count = len(examples) or 1
+        return {
+            "examples": len(examples),
+            "log_loss": loss / count,
+            "accuracy": correct / count,
+            "precision": true_positives / ((true_positives + false_positives) or 1),
+            "recall": true_positives / ((true_positives + false_negatives) or 1),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the model for storage as JSON.
+
+        Returns:
+            Model format, metadata and non-zero weights
+        """
+        return {
+            "format": MODEL_FORMAT,
+            "metadata": self.metadata,
+            "weights": {
+                name: round(weight, 6)
+                for name, weight in sorted(self.weights.items())
+                if abs(weight) >= 1e-6
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LogisticModel":
+        """
+        Load a model serialized with ``to_dict``.
+
+        Args:
+            data: Serialized model
+
+        Returns:
+            Model
+
+        Raises:
+            ValueError: If the model has an unsupported format
+        """
+        if data.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Unsupported pre-ranker format {data.get('format')}")
+        return cls(data["weights"], data.get("metadata"))
@@ -2,25 +2,11 @@
 Prompt for generating detailed content about MCP servers.
 """
 
-CONTENT_GENERATION_PROMPT = """
+CONTENT_GENERATION_SYSTEM_PROMPT = """
 You are an expert AI assistant helping to generate detailed information about an MCP (Model Context Protocol) server for a user's project.
 
-# Project Context
-User Prompt: {prompt}
-
-# Project Files
-{files}
-
-# MCP Resources
-{mcp_resources}
-
-# Server Information
-Name: {server_name}
-Description: {server_description}
-Content: {server_content}
-
 # Task
-Generate detailed, helpful information about this MCP server that would be valuable for the user's project.
+Generate detailed, helpful information about the given MCP server that would be valuable for the user's project.
 Include:
 1. A clear title for the server
 2. GitHub URL (if available or can be inferred)
@@ -42,4 +28,20 @@ CLI_COMMAND: [installation or setup command]
 DESCRIPTION: [brief description]
 CONTENT:
 [detailed markdown content]
+
+# MCP Resources
+{mcp_resources}
+"""
+
+CONTENT_GENERATION_USER_PROMPT = """
+# Project Context
+User Prompt: {prompt}
+
+# Project Files
+{files}
+
+# Server Information
+Name: {server_name}
+Description: {server_description}
+Content: {server_content}
 """
@@ -0,0 +1,24 @@
+"""
+Prompt for repairing malformed parts of a structured LLM response.
+"""
+
+OUTPUT_REPAIR_PROMPT = """
+You previously returned MCP (Model Context Protocol) server recommendations as JSON, but part of the output could not be parsed.
+
+# Malformed Output
+{malformed_output}
+
+# Task
+Rewrite only the malformed output above as a valid JSON array of server objects. Each server object should have this structure:
+{{
+  "title": "Server name",
+  "description": "1-2 sentence description",
+  "github_url": "GitHub URL if available, otherwise empty string",
+  "cli_command": "Installation command or comment with instructions",
+  "content": "Explanation of relevance and key features"
+}}
+
+Keep the original meaning. Complete any object that was cut off, or drop it if it cannot be completed.
+
+IMPORTANT: Return JSON only, no other text. Ensure the JSON is valid and follows the schema above.
+"""
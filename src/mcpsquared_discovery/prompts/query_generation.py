@@ -2,18 +2,9 @@
 Prompt for generating search queries.
 """
 
-QUERY_GENERATION_PROMPT = """
+QUERY_GENERATION_SYSTEM_PROMPT = """
 You are an expert AI assistant helping to generate search queries for finding relevant MCP (Model Context Protocol) servers based on a user's project context.
 
-# Project Context
-User Prompt: {prompt}
-
-# Project Files
-{files}
-
-# MCP Resources
-{mcp_resources}
-
 # Task
 Generate 3-5 specific search queries that would help find the most relevant MCP servers for this project. 
 Each query should focus on a different aspect or technology mentioned in the context.
@@ -21,4 +12,15 @@ Make the queries specific and targeted to find MCP servers that would be most he
 Consider the available MCP resources when generating queries to ensure we find the most relevant servers.
 
 Format your response as a list of queries, one per line, without numbering or bullet points.
+
+# MCP Resources
+{mcp_resources}
+"""
+
+QUERY_GENERATION_USER_PROMPT = """
+# Project Context
+User Prompt: {prompt}
+
+# Project Files
+{files}
 """
@@ -1,22 +1,13 @@
 """
 Prompt for selecting the best search results.
+
+Batched selection keeps the same system prompt and puts one keyed section per
+request in the user prompt.
 """
 
-RESULT_SELECTION_PROMPT = """
+RESULT_SELECTION_SYSTEM_PROMPT = """
 You are an expert AI assistant helping to select the most relevant MCP (Model Context Protocol) servers for a user's project.
 
-# Project Context
-User Prompt: {prompt}
-
-# Project Files
-{files}
-
-# MCP Resources
-{mcp_resources}
-
-# Search Results
-{search_results}
-
 # Task
 Analyze the available information and provide 2-4 of the most relevant MCP servers that would be most helpful for this project.
 
@@ -38,4 +29,44 @@ Return your response as a JSON array of server objects. Each server object shoul
 For direct matches, use the existing information. For suggestions from MCP resources, create appropriate server objects with the same structure.
 
 IMPORTANT: Return JSON only, no other text. Ensure the JSON is valid and follows the schema above.
+
+# MCP Resources
+{mcp_resources}
+"""
+
+RESULT_SELECTION_USER_PROMPT = """
+# Project Context
+User Prompt: {prompt}
+
+# Project Files
+{files}
+
+# Search Results
+{search_results}
+"""
+
+RESULT_SELECTION_BATCH_USER_PROMPT = """
+The following {count} requests come from different, unrelated projects. Answer
+each one independently, following the instructions above, as if it were the
+only request.
+
+Return a single JSON object with one key per request ({keys}). The value for
+each key is the JSON array of server objects for that request.
+
+IMPORTANT: Return JSON only, no other text.
+
+{requests}
+"""
+
+RESULT_SELECTION_BATCH_ITEM = """
+# Request {key}
+
+## Project Context
+User Prompt: {prompt}
+
+## Project Files
+{files}
+
+## Search Results
+{search_results}
 """
@@ -7,6 +7,13 @@ from typing import Dict, List, Optional
 from fastapi import UploadFile
 
 from mcpsquared_discovery.models.schemas import ProjectContext
+from mcpsquared_discovery.core.deadline import Deadline
+from mcpsquared_discovery.core.executor import get_cpu_executor
+from mcpsquared_discovery.services.file_cache import (
+    extract_technologies,
+    get_file_artifacts,
+    resolve_project_files,
+)
 from mcpsquared_discovery.services.llm import generate_search_queries
 
 
@@ -26,24 +33,39 @@ async def read_file_content(file: UploadFile) -> str:
 
 
 def extract_project_context(
-    prompt: str, context: Optional[ProjectContext] = None
+    prompt: str,
+    context: Optional[ProjectContext] = None,
+    package_manager_filename: str = "package_manager.json",
 ) -> Dict:
     """
     Extract project context from the provided ProjectContext model.
 
+    File values may be ``sha256:`` references to contents sent in an earlier
+    request; they are resolved from the file cache along with the artifacts
+    derived from each file.
+
     Args:
         prompt: User prompt describing the project needs
         context: Optional ProjectContext model
+        package_manager_filename: Name the package manager contents are
+            shown under in prompts
 
     Returns:
         Dictionary containing project context
+
+    Raises:
+        UnknownFileReferenceError: If a file reference is no longer cached
     """
     # Initialize context with prompt
     project_context = {
         "prompt": prompt,
         "files": {},
+        "file_artifacts": {},
+        "dependencies": [],
         "technologies": [],
+        "file_token_count": 0,
         "search_queries": [],
+        "filters": {},
     }
 
     # Add context from ProjectContext model if provided
@@ -53,13 +75,26 @@ def extract_project_context(
 
         if context.project_package_manager_contents:
             project_context["files"][
-                "package_manager.json"
+                package_manager_filename
             ] = context.project_package_manager_contents
 
         if context.additional_files:
             for filename, content in context.additional_files.items():
                 project_context["files"][filename] = content
 
+    # Resolve references and reuse cached artifacts for unchanged files
+    artifacts = resolve_project_files(project_context["files"])
+    project_context["file_artifacts"] = artifacts
+    project_context["files"] = {name: a.content for name, a in artifacts.items()}
+    project_context["dependencies"] = sorted(
+        {dep for a in artifacts.values() for dep in a.dependencies}
+    )
+    project_context["technologies"] = sorted(
+        {tech for a in artifacts.values() for tech in a.technologies}
+        | set(extract_technologies(prompt, []))
+    )
+    project_context["file_token_count"] = sum(a.token_count for a in artifacts.values())
+
     return project_context
 
 
@@ -67,6 +102,7 @@ async def analyze_project_files(
     prompt: str, 
     files: Optional[List[UploadFile]] = None,
     existing_context: Optional[ProjectContext] = None,
+    deadline: Optional[Deadline] = None,
 ) -> ProjectContext:
     """
     Analyze project files to understand context and generate search queries.
@@ -75,9 +111,13 @@ async def analyze_project_files(
         prompt: User prompt describing the project needs
         files: Optional project files for context
         existing_context: Optional existing ProjectContext to enhance
+        deadline: Optional request deadline checked between files
 
     Returns:
         ProjectContext object with analyzed information
+
+    Raises:
+        DeadlineExceeded: If the request budget runs out while reading files
     """
     # Start with existing context or create new one
     if existing_context:
@@ -93,7 +133,18 @@ async def analyze_project_files(
     # Process files if provided
     if files:
         for file in files:
+            if deadline:
+                deadline.check("file analysis")
             file_content = await read_file_content(file)
+
+            # Hash and cache derived artifacts so later references resolve
+            await get_cpu_executor().run(
+                "file analysis",
+                get_file_artifacts,
+                file.filename,
+                file_content,
+                stateful=True,
+            )
             
             # Update appropriate fields based on file type
             if file.filename.endswith(".mdc"):
@@ -0,0 +1,165 @@
+"""
+Micro-batching of concurrent calls into shared upstream requests.
+
+Items submitted within a short window, or until the batch is full, are handed
+to a single batch function together. Each caller waits on its own future and
+receives the answer for its item. The batch function may return None for an
+item it could not answer, letting the caller fall back to an individual call.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from mcpsquared_discovery.core.request_context import client_id_var
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect items for a short window and run them as one batch."""
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[T]], Awaitable[List[Optional[R]]]],
+        window_seconds: float,
+        max_batch: int,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.max_batch = max(max_batch, 1)
+        self._run_batch = run_batch
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._unanswered = 0
+        self._largest = 0
+        self._seconds = 0.0
+
+    async def submit(self, item: T) -> Optional[R]:
+        """
+        Add an item to the next batch and wait for its answer.
+
+        Args:
+            item: Item to answer
+
+        Returns:
+            Answer for the item, or None if the batch could not answer it
+
+        Raises:
+            Exception: Whatever the batch function raised for the whole batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Start a batch with the pending items."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Callers that gave up while waiting for the window need no answer
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        # A fresh context keeps the batch from being queued, logged or profiled
+        # as the request that happened to start it
+        task = asyncio.create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        """Run one batch and resolve the futures of its callers."""
+        client_id_var.set(f"batch:{self.name}")
+        started = time.monotonic()
+        try:
+            answers = await self._run_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._record(len(batch), time.monotonic() - started)
+
+        if len(answers) != len(batch):
+            logger.error(
+                "%s batch returned %d answers for %d items",
+                self.name,
+                len(answers),
+                len(batch),
+            )
+            answers = [None] * len(batch)
+
+        unanswered = 0
+        for (_, future), answer in zip(batch, answers):
+            unanswered += answer is None
+            if not future.done():
+                future.set_result(answer)
+        if unanswered:
+            with self._lock:
+                self._unanswered += unanswered
+        logger.debug(
+            "%s batch of %d answered %d items in %.2fs",
+            self.name,
+            len(batch),
+            len(batch) - unanswered,
+            time.monotonic() - started,
+        )
+
+    def _record(self, size: int, seconds: float) -> None:
+        """Count a finished batch."""
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._largest = max(self._largest, size)
+            self._seconds += seconds
+
+    def stats(self) -> Dict:
+        """
+        Report batching counters for monitoring.
+
+        Returns:
+            Batch count, item count, average and largest batch size,
+            unanswered items and average batch latency
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "average_batch_size": (
+                    self._items / self._batches if self._batches else 0.0
+                ),
+                "largest_batch": self._largest,
+                "unanswered_items": self._unanswered,
+                "average_batch_seconds": (
+                    self._seconds / self._batches if self._batches else 0.0
+                ),
+                "pending": len(self._pending),
+            }
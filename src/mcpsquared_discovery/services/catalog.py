@@ -0,0 +1,458 @@
+"""
+Unified catalog of known MCP servers.
+
+Merges the curated records in ``mcp_servers.json`` with the server lists in
+``mcp_resources.md`` (reference, official and community sections), so every
+known server can be searched locally instead of only being read by the LLM.
+Markdown entries are parsed into records with the same schema as the JSON,
+deduplicated against it by GitHub URL or normalized title, and tagged with
+their category and provenance.
+
+The loaded catalog is a tuple of immutable, slotted ``CatalogRecord`` objects
+validated once at load time. Search hands out references to these records and
+responses are built from them without validating again.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from pydantic import ValidationError
+
+from mcpsquared_discovery.models.schemas import MCPServer, Source
+from mcpsquared_discovery.offline.local_index import extract_terms
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+SERVERS_JSON = "mcp_servers.json"
+RESOURCES_MD = "mcp_resources.md"
+
+# Relative links in the reference section point into this repository
+REFERENCE_BASE_URL = "https://github.com/modelcontextprotocol/servers/tree/main/"
+
+CATEGORY_REFERENCE = "reference"
+CATEGORY_OFFICIAL = "official"
+CATEGORY_COMMUNITY = "community"
+CATEGORY_CURATED = "curated"
+
+# Markdown headings that start a server section, matched on their text
+_SECTION_CATEGORIES = {
+    "reference servers": CATEGORY_REFERENCE,
+    "official integrations": CATEGORY_OFFICIAL,
+    "community servers": CATEGORY_COMMUNITY,
+}
+
+_HEADING = re.compile(r"^(#{2,3})\s+(.*)$")
+_BULLET = re.compile(r"^[-*]\s+(?:<img[^>]*>\s*)?")
+_LINK = re.compile(r"(\*\*)?\[(?P<title>[^\]]+)\]\((?P<url>[^)\s]+)\)(?(1)\*\*)")
+_SEPARATOR = re.compile(r"\s+[-–—]\s+")
+_INLINE_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_EMPHASIS = re.compile(r"\*\*|__")
+
+# Shown in place of a missing install command in responses
+MISSING_CLI_COMMAND = "# Visit https://mcpindex.net for installation instructions"
+
+# Words dropped when comparing titles, e.g. "Xero-mcp-server" matches "Xero"
+_TITLE_STOPWORDS = {"mcp", "server", "servers"}
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a server title for duplicate detection.
+
+    Args:
+        title: Server title
+
+    Returns:
+        Lowercase alphanumeric key without generic words like "mcp" or "server"
+    """
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    return "".join(word for word in words if word not in _TITLE_STOPWORDS)
+
+
+def normalize_github_url(url: Optional[str]) -> str:
+    """
+    Normalize a GitHub URL for duplicate detection.
+
+    Args:
+        url: Repository or tree URL
+
+    Returns:
+        Lowercase URL without scheme, trailing slash or ``.git``, or "" if empty
+    """
+    if not url:
+        return ""
+    parsed = urlparse(url.strip().lower())
+    path = parsed.path.rstrip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    return f"{parsed.netloc}{path}"
+
+
+def _plain_text(markdown: str) -> str:
+    """Flatten inline links and emphasis to plain text."""
+    return _EMPHASIS.sub("", _INLINE_LINK.sub(r"\1", markdown)).strip()
+
+
+def parse_resource_line(line: str, category: str) -> Optional[Dict]:
+    """
+    Parse one markdown bullet into a catalog record.
+
+    Args:
+        line: Bullet line such as ``- **[Title](url)** - description``
+        category: Category of the section the line belongs to
+
+    Returns:
+        Record with the mcp_servers.json schema, or None if the line is not an entry
+    """
+    bullet = _BULLET.match(line)
+    if not bullet:
+        return None
+    match = _LINK.match(line, bullet.end())
+    if not match:
+        return None
+
+    title = match.group("title").strip()
+    url = match.group("url")
+    if category == CATEGORY_REFERENCE and not urlparse(url).scheme:
+        url = urljoin(REFERENCE_BASE_URL, url)
+
+    rest = line[match.end():]
+    separator = _SEPARATOR.search(rest)
+    if separator:
+        qualifier, description_md = rest[: separator.start()], rest[separator.end():]
+    else:
+        qualifier, description_md = rest, ""
+    # Keep qualifiers like "(by author)" so same-named servers stay distinct
+    qualifier = _plain_text(qualifier)
+    if qualifier.startswith("(") and qualifier.endswith(")"):
+        title = f"{title} {qualifier}"
+
+    description_md = description_md.strip()
+    description = _plain_text(description_md) or title
+    is_github = urlparse(url).netloc.lower() == "github.com"
+
+    return {
+        "title": title,
+        "github_url": url if is_github else "",
+        "project_url": None if is_github else url,
+        "sources": [
+            {
+                "source_name": urlparse(url).netloc,
+                "source_url": url,
+                "source_title": title,
+                "source_description": description,
+            }
+        ],
+        "cli_command": "",
+        "description": description,
+        "content": f"# {title}\n\n{description_md or description}",
+        "category": category,
+        "provenance": [RESOURCES_MD],
+    }
+
+
+def parse_mcp_resources(markdown: str) -> List[Dict]:
+    """
+    Parse the server sections of the MCP resources markdown.
+
+    Only the reference, official and community sections are read; frameworks,
+    clients and other resources are skipped.
+
+    Args:
+        markdown: Contents of mcp_resources.md
+
+    Returns:
+        Records in document order
+    """
+    records = []
+    category = None
+    for line in markdown.splitlines():
+        heading = _HEADING.match(line)
+        if heading:
+            text = heading.group(2).lower()
+            category = next(
+                (cat for name, cat in _SECTION_CATEGORIES.items() if name in text),
+                # A level 3 heading inside "Third-Party Servers" keeps the section open
+                category if heading.group(1) == "###" and category else None,
+            )
+            continue
+        if category:
+            record = parse_resource_line(line.strip(), category)
+            if record:
+                records.append(record)
+    return records
+
+
+def _dedupe_keys(record: Dict) -> Tuple[str, str]:
+    """GitHub URL and normalized title keys of a record."""
+    return normalize_github_url(record.get("github_url")), normalize_title(
+        record.get("title", "")
+    )
+
+
+def build_catalog(servers: List[Dict], resource_entries: List[Dict]) -> List[Dict]:
+    """
+    Merge curated server records with entries parsed from the resources markdown.
+
+    Curated records win on conflicts and are tagged with the category of the
+    markdown entry they match. Markdown entries are deduplicated against the
+    curated records by GitHub URL or normalized title, and against each other
+    by GitHub URL.
+
+    Args:
+        servers: Records from mcp_servers.json
+        resource_entries: Records from parse_mcp_resources
+
+    Returns:
+        Unified list of records, curated records first
+    """
+    catalog = []
+    by_url: Dict[str, Dict] = {}
+    curated_by_title: Dict[str, Dict] = {}
+
+    for server in servers:
+        record = {
+            **server,
+            "category": server.get("category", CATEGORY_CURATED),
+            "provenance": [SERVERS_JSON],
+        }
+        url_key, title_key = _dedupe_keys(record)
+        if url_key:
+            by_url.setdefault(url_key, record)
+        curated_by_title.setdefault(title_key, record)
+        catalog.append(record)
+
+    merged = 0
+    for entry in resource_entries:
+        url_key, title_key = _dedupe_keys(entry)
+        existing = by_url.get(url_key) if url_key else None
+        if existing is None:
+            existing = curated_by_title.get(title_key)
+
+        if existing is not None:
+            if RESOURCES_MD not in existing["provenance"]:
+                existing["provenance"].append(RESOURCES_MD)
+                if existing["category"] == CATEGORY_CURATED:
+                    existing["category"] = entry["category"]
+                merged += 1
+            continue
+
+        if url_key:
+            by_url[url_key] = entry
+        catalog.append(entry)
+
+    logger.info(
+        "Catalog built with %d servers (%d curated, %d from resources, %d merged)",
+        len(catalog),
+        len(servers),
+        len(catalog) - len(servers),
+        merged,
+    )
+    return catalog
+
+
+@lru_cache(maxsize=1)
+def load_mcp_servers() -> List[Dict]:
+    """
+    Load MCP servers from the local JSON file.
+
+    The file is read once per process and the parsed records are shared, so
+    callers must not mutate them.
+
+    Returns:
+        List of server records
+    """
+    with open(DATA_DIR / SERVERS_JSON) as f:
+        data = json.load(f)
+    return data.get("mcp_servers", [])
+
+
+# Install method from the leading command of cli_command, first match wins
+_INSTALL_METHODS = (
+    ("docker", re.compile(r"^docker\b")),
+    ("npx", re.compile(r"^npx\b")),
+    ("uvx", re.compile(r"^uvx\b")),
+    ("npm", re.compile(r"^(npm|pnpm|yarn)\b")),
+    ("pip", re.compile(r"^(pip3?|pipx|uv pip|python3? -m pip)\b")),
+)
+INSTALL_UNKNOWN = "unknown"
+INSTALL_OTHER = "other"
+
+# Languages implied by the install method
+_INSTALL_LANGUAGES = {"npx": "typescript", "npm": "typescript", "uvx": "python", "pip": "python"}
+
+# Languages mentioned in a title or description
+_LANGUAGE_PATTERNS = (
+    ("typescript", re.compile(r"\b(typescript|javascript|node\.?js|deno)\b")),
+    ("python", re.compile(r"\bpython\b")),
+    ("go", re.compile(r"\b(golang|written in go)\b")),
+    ("rust", re.compile(r"\brust\b")),
+    ("java", re.compile(r"\b(java|kotlin)\b")),
+    ("csharp", re.compile(r"(\bc#|\.net\b)")),
+    ("ruby", re.compile(r"\bruby\b")),
+    ("php", re.compile(r"\bphp\b")),
+    ("swift", re.compile(r"\bswift\b")),
+)
+
+
+def detect_install_method(cli_command: str) -> str:
+    """
+    Classify how a server is installed from its CLI command.
+
+    Args:
+        cli_command: Install or run command, may be empty
+
+    Returns:
+        One of docker, npx, uvx, npm, pip, other or unknown
+    """
+    command = cli_command.strip().lower()
+    if not command:
+        return INSTALL_UNKNOWN
+    for method, pattern in _INSTALL_METHODS:
+        if pattern.match(command):
+            return method
+    return INSTALL_OTHER
+
+
+def detect_languages(install_method: str, text: str) -> Tuple[str, ...]:
+    """
+    Infer implementation languages from the install method and description.
+
+    Args:
+        install_method: Result of detect_install_method
+        text: Title and description of the server
+
+    Returns:
+        Sorted language names, empty if unknown
+    """
+    text = text.lower()
+    languages = {name for name, pattern in _LANGUAGE_PATTERNS if pattern.search(text)}
+    if install_method in _INSTALL_LANGUAGES:
+        languages.add(_INSTALL_LANGUAGES[install_method])
+    return tuple(sorted(languages))
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogRecord:
+    """A validated catalog entry shared by all requests."""
+
+    index: int
+    title: str
+    github_url: str
+    project_url: str
+    sources: Tuple[Source, ...]
+    cli_command: str
+    description: str
+    content: str
+    category: str
+    provenance: Tuple[str, ...]
+    # Lowercased title, description, content, cli_command and github_url
+    search_fields: Tuple[str, str, str, str, str]
+    # Distinctive words of the title and description, for similarity
+    terms: FrozenSet[str]
+    # Facet values, see services.facets
+    install_method: str
+    languages: Tuple[str, ...]
+
+    def to_server(self) -> MCPServer:
+        """
+        Build a response model without re-running field validation.
+
+        Returns:
+            MCPServer for this record
+        """
+        return MCPServer.model_construct(
+            title=self.title,
+            github_url=self.github_url,
+            project_url=self.project_url,
+            sources=list(self.sources),
+            cli_command=self.cli_command or MISSING_CLI_COMMAND,
+            description=self.description,
+            content=self.content,
+        )
+
+
+def make_record(index: int, data: Dict) -> CatalogRecord:
+    """
+    Validate a raw catalog entry and freeze it into a record.
+
+    Args:
+        index: Position of the record in the catalog
+        data: Entry with the mcp_servers.json schema
+
+    Returns:
+        Catalog record
+
+    Raises:
+        ValidationError: If the entry does not fit the MCPServer schema
+    """
+    server = MCPServer(
+        title=data["title"],
+        github_url=data.get("github_url") or "",
+        project_url=data.get("project_url") or "",
+        sources=data.get("sources") or [],
+        cli_command=data.get("cli_command") or "",
+        description=data.get("description") or "No description available",
+        content=data.get("content") or "No detailed content available",
+    )
+    sources = tuple(server.sources) or (
+        Source(
+            source_name="github.com",
+            source_url=server.github_url,
+            source_title=server.title,
+            source_description=server.description,
+        ),
+    )
+    install_method = detect_install_method(server.cli_command)
+    return CatalogRecord(
+        index=index,
+        title=server.title,
+        github_url=server.github_url,
+        project_url=server.project_url,
+        sources=sources,
+        cli_command=server.cli_command,
+        description=server.description,
+        content=server.content,
+        category=data.get("category", CATEGORY_CURATED),
+        provenance=tuple(data.get("provenance", ())),
+        search_fields=(
+            server.title.lower(),
+            server.description.lower(),
+            server.content.lower(),
+            server.cli_command.lower(),
+            server.github_url.lower(),
+        ),
+        terms=extract_terms(f"{server.title} {server.description}"),
+        install_method=install_method,
+        languages=detect_languages(
+            install_method, f"{server.title} {server.description}"
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def load_catalog() -> Tuple[CatalogRecord, ...]:
+    """
+    Build and validate the unified catalog once per process.
+
+    Returns:
+        Catalog records; a record's ``index`` is its position in the tuple
+    """
+    with open(DATA_DIR / RESOURCES_MD) as f:
+        resource_entries = parse_mcp_resources(f.read())
+
+    records: List[CatalogRecord] = []
+    for entry in build_catalog(load_mcp_servers(), resource_entries):
+        try:
+            records.append(make_record(len(records), entry))
+        except (KeyError, ValidationError) as e:
+            logger.warning("Skipping invalid catalog entry %r: %s", entry.get("title"), e)
+    return tuple(records)
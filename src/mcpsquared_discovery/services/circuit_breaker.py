@@ -0,0 +1,110 @@
+"""
+Circuit breaker guarding calls to the upstream LLM provider.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Track upstream failures and slow calls and stop sending traffic when unhealthy.
+
+    The breaker opens after ``failure_threshold`` consecutive failures, where a
+    call slower than ``slow_call_seconds`` counts as a failure. While open all
+    calls are refused. After ``reset_seconds`` a single probe call is allowed
+    through (half open); its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(
+        self, failure_threshold: int, reset_seconds: float, slow_call_seconds: float
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half open after the reset period."""
+        with self._lock:
+            elapsed = time.monotonic() - self._opened_at
+            if self._state == OPEN and elapsed >= self.reset_seconds:
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may go to the upstream provider.
+
+        Returns:
+            True if the call should be attempted
+        """
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            # A probe that never reported back is replaced after the reset period
+            now = time.monotonic()
+            probe_stale = now - self._probe_started >= self.reset_seconds
+            if state == HALF_OPEN and (not self._probe_in_flight or probe_stale):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        """
+        Record a completed call.
+
+        Args:
+            latency: Call duration in seconds; slow calls count as failures
+        """
+        if latency >= self.slow_call_seconds:
+            logger.warning("Slow LLM call took %.1fs", latency)
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("LLM circuit breaker closed after successful probe")
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed or slow call, opening the breaker at the threshold."""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            tripped = self._consecutive_failures >= self.failure_threshold
+            if self._state == HALF_OPEN or tripped:
+                if self._state != OPEN:
+                    logger.warning(
+                        "LLM circuit breaker opened after %d failures",
+                        self._consecutive_failures,
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        """
+        Report breaker state for monitoring.
+
+        Returns:
+            Dictionary with state and consecutive failure count
+        """
+        return {"state": self.state, "consecutive_failures": self._consecutive_failures}
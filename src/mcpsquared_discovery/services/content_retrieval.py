@@ -2,26 +2,38 @@
 Service for retrieving content from URLs.
 """
 
+from typing import Optional
+
 import httpx
 
 from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.deadline import Deadline
 
 
-async def retrieve_content(url: str) -> str:
+async def retrieve_content(url: str, deadline: Optional[Deadline] = None) -> str:
     """
     Retrieve and parse content from a URL using the Andi Search API.
 
     Args:
         url: The URL to retrieve content from
+        deadline: Optional request deadline bounding the call
 
     Returns:
         Parsed content as markdown or text
+
+    Raises:
+        DeadlineExceeded: If the request budget is already exhausted
     """
     params = {"url": url, "api_key": settings.ANDISEARCH_API_KEY}
 
+    timeout = settings.CONTENT_RETRIEVAL_TIMEOUT_SECONDS
+    if deadline:
+        deadline.check("content retrieval")
+        timeout = deadline.timeout_for(timeout)
+
     async with httpx.AsyncClient() as client:
         response = await client.get(
-            settings.CONTENT_RETRIEVAL_URL, params=params, timeout=30.0
+            settings.CONTENT_RETRIEVAL_URL, params=params, timeout=timeout
         )
 
         if response.status_code == 200:
@@ -0,0 +1,360 @@
+"""
+Service that runs the discovery pipeline from project context to recommendations.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+from pydantic import BaseModel, Field
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.deadline import Deadline, DeadlineExceeded
+from mcpsquared_discovery.core.profiling import mark_stage
+from mcpsquared_discovery.models.schemas import MCPServer
+from mcpsquared_discovery.services.fallback import build_local_recommendations
+from mcpsquared_discovery.services.catalog import CatalogRecord
+from mcpsquared_discovery.services.llm import (
+    generate_search_queries,
+    generate_server_recommendations,
+    llm_available,
+)
+from mcpsquared_discovery.services.index_bundle import catalog_version
+from mcpsquared_discovery.services.llm_routing import resolve_model
+from mcpsquared_discovery.services.preranker import (
+    confident_selection,
+    preranker_version,
+)
+from mcpsquared_discovery.services.rate_limiter import AdmissionRejected
+from mcpsquared_discovery.services.result_cache import get_result_cache
+from mcpsquared_discovery.services.search import search_mcp_servers
+from mcpsquared_discovery.services.stack_table import lookup_stack, stack_table_version
+from mcpsquared_discovery.services.traffic import (
+    inputs_key,
+    normalize_inputs,
+    get_traffic_recorder,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Outcomes of speculative selection, reported in /metrics/llm
+_speculation_counts = {
+    "kept": 0,
+    "rerun": 0,
+    "query_generation_failed": 0,
+    "kept_without_queries": 0,
+}
+
+
+def speculation_stats() -> Dict[str, int]:
+    """
+    Report how often speculative selections were kept or rerun.
+
+    Returns:
+        Outcome counters
+    """
+    return dict(_speculation_counts)
+
+
+def candidate_overlap(
+    speculative: Sequence[CatalogRecord], final: Sequence[CatalogRecord]
+) -> float:
+    """
+    Measure how much of the candidate set survived query generation.
+
+    Args:
+        speculative: Candidates found with locally derived queries
+        final: Candidates found with the generated queries
+
+    Returns:
+        Jaccard overlap of the two sets, 1.0 when both are empty
+    """
+    a = {record.index for record in speculative}
+    b = {record.index for record in final}
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+async def recommend_with_query_generation(
+    context: Dict, local_results: Sequence[CatalogRecord], deadline: Deadline
+) -> List[MCPServer]:
+    """
+    Generate search queries with the LLM and select from what they find.
+
+    With speculative selection enabled, selection starts right away on the
+    candidates found with locally derived queries while the queries are
+    generated. If the generated queries find about the same candidates, the
+    speculative answer is kept and the request costs one LLM round-trip;
+    otherwise it is cancelled and selection reruns on the new candidates.
+    If query generation runs out of time or is rejected after the speculative
+    selection has already answered, that answer is returned.
+
+    Args:
+        context: Project context dictionary, updated with the generated queries
+        local_results: Candidates found with locally derived queries
+        deadline: Request deadline
+
+    Returns:
+        Recommended servers
+    """
+    query_task = asyncio.create_task(
+        generate_search_queries(context["prompt"], context, deadline)
+    )
+    speculative = None
+    if settings.LLM_SPECULATIVE_SELECTION:
+        speculative = asyncio.create_task(
+            generate_server_recommendations(context, local_results, deadline)
+        )
+
+    try:
+        try:
+            queries = await query_task
+        except (DeadlineExceeded, AdmissionRejected) as e:
+            if (
+                speculative is not None
+                and speculative.done()
+                and not speculative.cancelled()
+                and speculative.exception() is None
+            ):
+                logger.debug("Query generation failed (%r), keeping speculation", e)
+                _speculation_counts["kept_without_queries"] += 1
+                return speculative.result()
+            raise
+        except Exception as e:
+            logger.warning("Query generation failed, using local candidates: %s", e)
+            _speculation_counts["query_generation_failed"] += 1
+            queries = []
+
+        results = local_results
+        if queries:
+            mark_stage("local search")
+            context["search_queries"] = queries
+            # Queries that find nothing do not justify dropping the local candidates
+            results = await search_mcp_servers(context) or local_results
+
+        if speculative is not None:
+            overlap = candidate_overlap(local_results, results)
+            if overlap >= settings.SPECULATION_MIN_OVERLAP:
+                logger.debug("Keeping speculative selection, overlap %.2f", overlap)
+                _speculation_counts["kept"] += 1
+                return await speculative
+            logger.debug("Candidates changed, overlap %.2f, selecting again", overlap)
+            _speculation_counts["rerun"] += 1
+            speculative.cancel()
+
+        return await generate_server_recommendations(context, results, deadline)
+    finally:
+        for task in (query_task, speculative):
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Mark failures of abandoned tasks as handled
+                task.exception()
+
+
+class DiscoveryResult(BaseModel):
+    """Recommendations together with how they were produced."""
+
+    servers: List[MCPServer] = Field(..., description="Recommended MCP servers")
+    source: str = Field(
+        "llm",
+        description="Pipeline path that produced the answer: "
+        "llm, precomputed, cache, prerank, partial or local",
+    )
+
+
+def answer_is_complete(result: DiscoveryResult, mode: str) -> bool:
+    """
+    Check whether an answer is the one a healthy pipeline gives.
+
+    Args:
+        result: Discovery result
+        mode: Discovery mode of the request
+
+    Returns:
+        False for answers degraded to local results or cut off by the deadline
+    """
+    complete = ("llm", "precomputed", "cache", "prerank")
+    return result.source in complete or mode == "local"
+
+
+def discovery_fingerprint(context: Dict, mode: str = "auto") -> str:
+    """
+    Hash the inputs that determine a discovery answer.
+
+    Whitespace in the prompt is normalized and file references are already
+    resolved, so a file sent by content or by reference hashes the same.
+
+    Args:
+        context: Project context dictionary
+        mode: Discovery mode
+
+    Returns:
+        Hex sha256 of the normalized inputs
+    """
+    inputs = {
+        "prompt": " ".join(context["prompt"].split()),
+        "files": context.get("files", {}),
+        "filters": {
+            facet: sorted(values)
+            for facet, values in context.get("filters", {}).items()
+        },
+        "mode": mode,
+    }
+    canonical = json.dumps(inputs, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def answer_version() -> str:
+    """
+    Version of everything besides the request that shapes a discovery answer.
+
+    Covers the catalog, the model each stage is routed to, the pre-ranker and
+    the precomputed stack table, so an answer's ETag changes with any of them.
+    Computed once and cleared when the catalog or stack table is reloaded.
+
+    Returns:
+        Short hex version
+    """
+    inputs = {
+        "catalog": catalog_version(),
+        "models": {
+            "default": settings.LLM_MODEL,
+            **{stage: resolve_model(stage) for stage in settings.LLM_STAGE_MODELS},
+        },
+        "preranker": preranker_version(),
+        "stack_table": stack_table_version(),
+    }
+    canonical = json.dumps(inputs, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+async def run_pipeline(
+    context: Dict, deadline: Deadline, mode: str = "auto"
+) -> DiscoveryResult:
+    """
+    Search the local catalog and select recommendations within a deadline.
+
+    Local search is cheap and always runs, on the technologies detected in the
+    project files and prompt. With ``LLM_QUERY_GENERATION`` enabled the LLM
+    also generates search queries, see ``recommend_with_query_generation``.
+    The LLM stages are skipped and the ranked local hits returned directly
+    when the client asks for local mode, when the LLM circuit breaker is open,
+    or when too many LLM calls are running or queued. With
+    ``PRERANK_SKIP_LLM`` the candidates the trained pre-ranker confidently
+    selects are returned without the LLM. If the LLM stages fail or cannot
+    finish before the deadline the local hits are returned as well. Calls
+    rejected by LLM admission control are passed on so the client can retry
+    later.
+
+    Args:
+        context: Project context dictionary
+        deadline: Request deadline
+        mode: "auto" to use the LLM when healthy, "local" to never call it
+
+    Returns:
+        DiscoveryResult with the recommended servers
+
+    Raises:
+        AdmissionRejected: If the LLM queue is full
+    """
+    mark_stage("local search")
+    search_results = await search_mcp_servers(context)
+
+    if mode == "local" or not llm_available():
+        return DiscoveryResult(
+            servers=build_local_recommendations(search_results), source="local"
+        )
+
+    confident = confident_selection(context, search_results)
+    if confident:
+        return DiscoveryResult(
+            servers=build_local_recommendations(confident), source="prerank"
+        )
+
+    try:
+        if settings.LLM_QUERY_GENERATION:
+            recommendations = await recommend_with_query_generation(
+                context, search_results, deadline
+            )
+        else:
+            recommendations = await generate_server_recommendations(
+                context, search_results, deadline=deadline
+            )
+        return DiscoveryResult(servers=recommendations, source="llm")
+    except DeadlineExceeded as e:
+        logger.warning("%s after %.1fs, returning local results", e, deadline.timeout)
+        return DiscoveryResult(
+            servers=build_local_recommendations(search_results), source="partial"
+        )
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.error("LLM pipeline failed, returning local results: %s", e)
+        return DiscoveryResult(
+            servers=build_local_recommendations(search_results), source="local"
+        )
+
+
+async def run_discovery(
+    context: Dict, deadline: Deadline, mode: str = "auto"
+) -> DiscoveryResult:
+    """
+    Answer a discovery request from precomputed answers, the cache or the pipeline.
+
+    Requests for a canonical stack are answered from the precomputed stack
+    table when ``STACK_TABLE_ENABLED`` is set. With ``RESULT_CACHE_ENABLED``
+    complete LLM answers are cached by the normalized request inputs. With
+    traffic capture running, the inputs, duration and outcome of every request
+    are recorded.
+
+    Args:
+        context: Project context dictionary
+        deadline: Request deadline
+        mode: "auto" to use the LLM when healthy, "local" to never call it
+
+    Returns:
+        DiscoveryResult with the recommended servers
+
+    Raises:
+        AdmissionRejected: If the LLM queue is full
+    """
+    started = time.monotonic()
+    inputs = normalize_inputs(context, mode)
+    key = inputs_key(inputs)
+    cacheable = settings.RESULT_CACHE_ENABLED and mode != "local"
+    result_cache = get_result_cache()
+    recorder = get_traffic_recorder()
+
+    try:
+        precomputed = lookup_stack(context, mode)
+        cached = result_cache.get(key) if cacheable and precomputed is None else None
+        if precomputed is not None:
+            result = DiscoveryResult(servers=precomputed, source="precomputed")
+        elif cached is not None:
+            result = DiscoveryResult(servers=cached, source="cache")
+        else:
+            result = await run_pipeline(context, deadline, mode)
+            if cacheable and result.source == "llm":
+                result_cache.put(key, result.servers)
+    except BaseException as e:
+        recorder.record(inputs, time.monotonic() - started, type(e).__name__)
+        raise
+
+    recorder.record(
+        inputs,
+        time.monotonic() - started,
+        "ok",
+        source=result.source,
+        servers=len(result.servers),
+    )
+    return result
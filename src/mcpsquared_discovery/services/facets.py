@@ -0,0 +1,79 @@
+"""
+Facet bitsets over the catalog for filtering before scoring.
+
+Each facet value maps to a Python int used as a bitset, where bit ``i`` is set
+when the catalog record with index ``i`` has that value. Filters are resolved
+with bitwise operations: values of one facet are OR-ed together and facets
+are AND-ed, so candidate selection costs a few integer operations no matter
+how large the catalog is.
+
+Resolving filters is shared with ``offline.local_index``, which loads the same
+bitsets from the exported index bundle.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Sequence
+
+from mcpsquared_discovery.offline.local_index import FacetBitsets, iter_bits
+from mcpsquared_discovery.services.catalog import (
+    INSTALL_UNKNOWN,
+    CatalogRecord,
+    load_catalog,
+)
+
+logger = logging.getLogger(__name__)
+
+FACET_CATEGORY = "category"
+FACET_INSTALL_METHOD = "install_method"
+FACET_LANGUAGE = "language"
+
+
+def record_facets(record: CatalogRecord) -> Dict[str, Sequence[str]]:
+    """
+    Facet values of a catalog record.
+
+    Records whose install method is unknown get no install_method value, so
+    only methods a client can usefully filter on are advertised.
+
+    Args:
+        record: Catalog record
+
+    Returns:
+        Mapping of facet name to the record's values
+    """
+    install_methods: Sequence[str] = (record.install_method,)
+    if record.install_method == INSTALL_UNKNOWN:
+        install_methods = ()
+    return {
+        FACET_CATEGORY: (record.category,),
+        FACET_INSTALL_METHOD: install_methods,
+        FACET_LANGUAGE: record.languages,
+    }
+
+
+class FacetIndex(FacetBitsets):
+    """Facet bitsets built from catalog records."""
+
+    def __init__(self, records: Sequence[CatalogRecord]):
+        bits: Dict[str, Dict[str, int]] = {}
+        for record in records:
+            bit = 1 << record.index
+            for facet, values in record_facets(record).items():
+                facet_bits = bits.setdefault(facet, {})
+                for value in values:
+                    facet_bits[value] = facet_bits.get(value, 0) | bit
+        super().__init__(bits, len(records))
+
+
+@lru_cache(maxsize=1)
+def load_facet_index() -> FacetIndex:
+    """
+    Build the facet bitsets for the loaded catalog once per process.
+
+    Returns:
+        Facet index
+    """
+    index = FacetIndex(load_catalog())
+    logger.info("Facet index built: %s", index.counts())
+    return index
@@ -0,0 +1,46 @@
+"""
+Service for building recommendations without an LLM call.
+"""
+
+from typing import List, Optional, Sequence
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.models.schemas import MCPServer
+from mcpsquared_discovery.services.catalog import CatalogRecord
+
+
+def default_recommendation() -> MCPServer:
+    """
+    Build the generic recommendation used when nothing better is available.
+
+    Returns:
+        MCPServer pointing the user at the MCP Index
+    """
+    return MCPServer(
+        title="MCP Server Recommendation",
+        description="Based on your requirements, please visit the MCP Index for available servers.",
+        github_url="https://github.com/modelcontextprotocol/servers",
+        project_url="https://mcpindex.net",
+        sources=[],
+        cli_command="# Visit https://mcpindex.net to find the right MCP server for your needs",
+        content="The Model Context Protocol (MCP) offers various servers that might meet your needs. "
+                "Please visit https://mcpindex.net to explore available servers and find detailed installation instructions."
+    )
+
+
+def build_local_recommendations(
+    search_results: Sequence[CatalogRecord], limit: Optional[int] = None
+) -> List[MCPServer]:
+    """
+    Build recommendations directly from ranked local search results.
+
+    Args:
+        search_results: Catalog records ordered by relevance
+        limit: Maximum number of servers to return, defaults to FALLBACK_MAX_RESULTS
+
+    Returns:
+        List of MCPServer objects, or the default recommendation if none matched
+    """
+    limit = limit or settings.FALLBACK_MAX_RESULTS
+    recommendations = [record.to_server() for record in search_results[:limit]]
+    return recommendations or [default_recommendation()]
@@ -0,0 +1,509 @@
+"""
+Service for caching derived artifacts of uploaded project files by content hash.
+
+Clients tend to send the same package manifests, specs and READMEs on every
+discovery call. Each file is hashed once and the artifacts derived from it
+(dependency list, detected technologies, truncated prompt section and token
+count) are kept in an LRU bounded by size, so repeated uploads skip the
+parsing work. Artifacts are keyed by the contents and by how the filename is
+parsed, since the same contents parse differently under another name.
+Clients may also send ``sha256:<hex>`` references instead of file contents
+for files the service has already seen.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import tomllib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.offline.local_index import detect_technologies
+
+logger = logging.getLogger(__name__)
+
+HASH_PREFIX = "sha256:"
+_REFERENCE_PATTERN = re.compile(r"^sha256:[0-9a-f]{64}$")
+
+# Technology name -> lowercase markers found in dependency names or file text
+TECHNOLOGY_KEYWORDS: Dict[str, List[str]] = {
+    "aws": ["aws-sdk", "@aws-sdk", "boto3", "botocore", "aws"],
+    "docker": ["docker", "dockerfile"],
+    "github": ["github", "octokit"],
+    "gitlab": ["gitlab"],
+    "google drive": ["googleapis", "google drive", "gdrive"],
+    "google maps": ["google maps", "@googlemaps", "googlemaps"],
+    "mongodb": ["mongodb", "mongoose", "pymongo"],
+    "mysql": ["mysql", "mysql2", "pymysql"],
+    "next.js": ["next", "nextjs", "next.js"],
+    "node": ["node", "nodejs", "express"],
+    "postgres": ["postgres", "postgresql", "psycopg", "psycopg2", "pg", "asyncpg"],
+    "puppeteer": ["puppeteer", "playwright", "selenium"],
+    "python": ["python", "pyproject", "fastapi", "django", "flask"],
+    "react": ["react", "react-dom"],
+    "redis": ["redis", "ioredis", "aioredis"],
+    "sentry": ["sentry", "@sentry/node", "sentry-sdk"],
+    "slack": [
+        "slack",
+        "@slack/web-api",
+        "@slack/bolt",
+        "slack-sdk",
+        "slack_sdk",
+        "slack-bolt",
+        "slack_bolt",
+    ],
+    "sqlite": ["sqlite", "sqlite3", "better-sqlite3"],
+    "stripe": ["stripe"],
+    "typescript": ["typescript", "ts-node"],
+}
+
+# Markers too generic to trust outside of declared dependencies
+DEPENDENCY_ONLY_MARKERS = {"next", "pg", "react"}
+
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+class FileArtifacts(BaseModel):
+    """Artifacts derived from a single project file's contents."""
+
+    model_config = ConfigDict(frozen=True)
+
+    content_hash: str = Field(..., description="sha256 reference of the file contents")
+    content: str = Field(..., description="Original file contents")
+    dependencies: List[str] = Field(
+        default_factory=list, description="Dependency names declared in the file"
+    )
+    technologies: List[str] = Field(
+        default_factory=list, description="Technologies detected in the file"
+    )
+    prompt_section: str = Field(..., description="File contents truncated for prompts")
+    token_count: int = Field(0, description="Estimated prompt tokens of the section")
+
+
+class UnknownFileReferenceError(LookupError):
+    """Raised when a client references file contents the cache no longer holds."""
+
+    def __init__(self, missing: Dict[str, str]):
+        self.missing = missing
+        super().__init__(
+            "Unknown file references, please resend contents for: "
+            + ", ".join(sorted(missing))
+        )
+
+
+class FileArtifactCache:
+    """Thread-safe LRU of FileArtifacts bounded by the UTF-8 bytes it holds."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, FileArtifacts]" = OrderedDict()
+        # Cache keys by content hash, for resolving references without a scan
+        self._keys_by_hash: Dict[str, Set[str]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[FileArtifacts]:
+        """
+        Look up artifacts, marking them recently used.
+
+        Args:
+            key: Cache key from ``artifact_key``
+
+        Returns:
+            Cached artifacts or None
+        """
+        with self._lock:
+            artifacts = self._entries.get(key)
+            if artifacts is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return artifacts
+
+    def find_content(self, content_hash: str) -> Optional[str]:
+        """
+        Find file contents cached under any filename.
+
+        Args:
+            content_hash: sha256 reference of the file contents
+
+        Returns:
+            File contents, or None if no artifacts with that hash are cached
+        """
+        with self._lock:
+            keys = self._keys_by_hash.get(content_hash)
+            if not keys:
+                return None
+            return self._entries[next(iter(keys))].content
+
+    def put(self, key: str, artifacts: FileArtifacts) -> None:
+        """
+        Store artifacts, evicting least recently used entries over the size bound.
+
+        Args:
+            key: Cache key from ``artifact_key``
+            artifacts: Artifacts to store
+        """
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = artifacts
+            self._keys_by_hash.setdefault(artifacts.content_hash, set()).add(key)
+            self._size += artifact_size(artifacts)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry and its hash index entry. Caller holds the lock."""
+        artifacts = self._entries.pop(key, None)
+        if artifacts is None:
+            return
+        self._size -= artifact_size(artifacts)
+        keys = self._keys_by_hash[artifacts.content_hash]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_hash[artifacts.content_hash]
+
+    def snapshot(self) -> List[FileArtifacts]:
+        """
+        Copy the cached artifacts, for walking them without holding the lock.
+
+        Returns:
+            Cached artifacts, least recently used first
+        """
+        with self._lock:
+            return list(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report cache size and hit counters.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def artifact_size(artifacts: FileArtifacts) -> int:
+    """
+    Approximate the memory held by cached artifacts.
+
+    Args:
+        artifacts: Cached artifacts
+
+    Returns:
+        UTF-8 bytes of the contents and of the prompt section
+    """
+    return len(artifacts.content.encode("utf-8")) + len(
+        artifacts.prompt_section.encode("utf-8")
+    )
+
+
+@lru_cache(maxsize=1)
+def get_file_cache() -> FileArtifactCache:
+    """
+    Get the process-wide file artifact cache, created on first use.
+
+    Returns:
+        Shared file artifact cache
+    """
+    return FileArtifactCache(settings.FILE_CACHE_MAX_BYTES)
+
+
+def compute_content_hash(content: str) -> str:
+    """
+    Compute the content reference clients can send instead of file contents.
+
+    Args:
+        content: File contents
+
+    Returns:
+        Reference of the form ``sha256:<hex digest of the UTF-8 bytes>``
+    """
+    return HASH_PREFIX + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def is_content_reference(value: str) -> bool:
+    """
+    Check whether a file value is a content hash reference.
+
+    Args:
+        value: File value sent by the client
+
+    Returns:
+        True if the value is a sha256 reference
+    """
+    return bool(_REFERENCE_PATTERN.match(value.strip()))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of prompt tokens for a piece of text.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Approximate token count (about four characters per token)
+    """
+    return (len(text) + 3) // 4
+
+
+def _package_json_dependencies(data: Dict) -> List[str]:
+    """Collect dependency names from a parsed package.json."""
+    names: List[str] = []
+    for key in ("dependencies", "devDependencies", "peerDependencies"):
+        section = data.get(key)
+        if isinstance(section, dict):
+            names.extend(section.keys())
+    return names
+
+
+def _toml_dependencies(data: Dict) -> List[str]:
+    """Collect dependency names from a parsed pyproject.toml or Cargo.toml."""
+    names: List[str] = []
+    project = data.get("project", {})
+    for requirement in project.get("dependencies", []):
+        match = _REQUIREMENT_NAME.match(requirement)
+        if match:
+            names.append(match.group(1))
+
+    poetry = data.get("tool", {}).get("poetry", {})
+    names.extend(name for name in poetry.get("dependencies", {}) if name != "python")
+    for group in poetry.get("group", {}).values():
+        names.extend(group.get("dependencies", {}).keys())
+
+    for key in ("dependencies", "dev-dependencies"):
+        section = data.get(key)
+        if isinstance(section, dict):
+            names.extend(section.keys())
+    return names
+
+
+def _requirements_dependencies(content: str) -> List[str]:
+    """Collect dependency names from a requirements.txt style file."""
+    names = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "-")):
+            continue
+        match = _REQUIREMENT_NAME.match(line)
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def dependency_parsers(filename: str) -> Tuple[str, ...]:
+    """
+    Choose the dependency parsers for a file by its name.
+
+    Args:
+        filename: Name of the file
+
+    Returns:
+        Parser names tried in order: "json", "toml" and "requirements"
+    """
+    name = filename.lower()
+    parsers = []
+    if name.endswith(".json"):
+        parsers.append("json")
+    if name.endswith(".toml") or name.startswith("package_manager"):
+        parsers.append("toml")
+    if name.endswith(".txt") and "requirements" in name:
+        parsers.append("requirements")
+    return tuple(parsers)
+
+
+def parse_dependencies(filename: str, content: str) -> List[str]:
+    """
+    Parse declared dependency names from a package manager file.
+
+    Args:
+        filename: Name of the file
+        content: File contents
+
+    Returns:
+        Sorted, de-duplicated list of lowercase dependency names
+    """
+    names: List[str] = []
+    for parser in dependency_parsers(filename):
+        if parser == "json":
+            try:
+                data = json.loads(content)
+                if isinstance(data, dict):
+                    names = _package_json_dependencies(data)
+            except json.JSONDecodeError:
+                pass
+        elif parser == "toml":
+            try:
+                names = _toml_dependencies(tomllib.loads(content))
+            except tomllib.TOMLDecodeError:
+                pass
+        else:
+            names = _requirements_dependencies(content)
+        if names:
+            break
+
+    return sorted({n.lower() for n in names})
+
+
+def artifact_key(filename: str, content_hash: str) -> str:
+    """
+    Key cached artifacts by contents and by how the file is parsed.
+
+    The same contents uploaded under names parsed differently, such as
+    ``notes.txt`` and ``requirements.txt``, have different dependencies.
+
+    Args:
+        filename: Name of the file
+        content_hash: sha256 reference of the file contents
+
+    Returns:
+        Cache key
+    """
+    return f"{'+'.join(dependency_parsers(filename)) or 'text'}:{content_hash}"
+
+
+def extract_technologies(content: str, dependencies: List[str]) -> List[str]:
+    """
+    Detect well-known technologies in a file's dependencies and text.
+
+    Args:
+        content: File contents
+        dependencies: Dependency names parsed from the file
+
+    Returns:
+        Sorted list of detected technology names
+    """
+    return detect_technologies(
+        content, dependencies, TECHNOLOGY_KEYWORDS, DEPENDENCY_ONLY_MARKERS
+    )
+
+
+def build_file_artifacts(filename: str, content: str, content_hash: str) -> FileArtifacts:
+    """
+    Derive artifacts for a file without consulting the cache.
+
+    Args:
+        filename: Name of the file
+        content: File contents
+        content_hash: Precomputed content reference
+
+    Returns:
+        FileArtifacts for the file
+    """
+    dependencies = parse_dependencies(filename, content)
+    prompt_section = content[: settings.PROMPT_FILE_MAX_CHARS]
+    if len(content) > settings.PROMPT_FILE_MAX_CHARS:
+        prompt_section += "\n[... truncated ...]"
+
+    return FileArtifacts(
+        content_hash=content_hash,
+        content=content,
+        dependencies=dependencies,
+        technologies=extract_technologies(content, dependencies),
+        prompt_section=prompt_section,
+        token_count=estimate_tokens(prompt_section),
+    )
+
+
+def get_file_artifacts(filename: str, content: str) -> FileArtifacts:
+    """
+    Get artifacts for a file, resolving references and reusing cached work.
+
+    Args:
+        filename: Name of the file
+        content: File contents or a ``sha256:`` reference to earlier contents
+
+    Returns:
+        FileArtifacts for the file
+
+    Raises:
+        UnknownFileReferenceError: If a reference is not in the cache
+    """
+    cache = get_file_cache()
+    if is_content_reference(content):
+        content_hash = content.strip()
+        artifacts = cache.get(artifact_key(filename, content_hash))
+        if artifacts is not None:
+            return artifacts
+        # Seen before under a name that is parsed differently
+        cached_content = cache.find_content(content_hash)
+        if cached_content is None:
+            raise UnknownFileReferenceError({filename: content_hash})
+        content = cached_content
+    else:
+        content_hash = compute_content_hash(content)
+
+    key = artifact_key(filename, content_hash)
+    artifacts = cache.get(key)
+    if artifacts is None:
+        artifacts = build_file_artifacts(filename, content, content_hash)
+        cache.put(key, artifacts)
+    return artifacts
+
+
+def resolve_project_files(files: Dict[str, str]) -> Dict[str, FileArtifacts]:
+    """
+    Resolve every project file to its artifacts.
+
+    Args:
+        files: Mapping of filename to contents or content reference
+
+    Returns:
+        Mapping of filename to FileArtifacts
+
+    Raises:
+        UnknownFileReferenceError: Listing every reference that could not be resolved
+    """
+    resolved: Dict[str, FileArtifacts] = {}
+    missing: Dict[str, str] = {}
+    for filename, content in files.items():
+        try:
+            resolved[filename] = get_file_artifacts(filename, content)
+        except UnknownFileReferenceError as e:
+            missing.update(e.missing)
+
+    if missing:
+        raise UnknownFileReferenceError(missing)
+
+    logger.debug(
+        "Resolved %d project files, cache stats: %s",
+        len(resolved),
+        get_file_cache().stats(),
+    )
+    return resolved
+
+
+def format_files_for_prompt(context: Dict) -> str:
+    """
+    Build the project files section of an LLM prompt from a context dictionary.
+
+    Args:
+        context: Project context with ``files`` and optional ``file_artifacts``
+
+    Returns:
+        Files section text
+    """
+    artifacts = context.get("file_artifacts") or {}
+    sections = []
+    for name, content in context["files"].items():
+        section = artifacts[name].prompt_section if name in artifacts else content
+        sections.append(f"File: {name}\n{section}")
+    return "\n\n".join(sections)
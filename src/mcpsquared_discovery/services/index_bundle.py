@@ -0,0 +1,261 @@
+"""
+Service for exporting the catalog and search index as a versioned bundle.
+
+The bundle holds every catalog record with its facet values, the facet
+bitsets, the trigram keywords, the technology markers and the search settings,
+which is everything ``offline.local_index`` needs to answer discovery requests
+without the service. It is serialized as gzip-compressed JSON and versioned by
+a hash of the records and settings it is derived from, so clients can
+revalidate cheaply and the version is known without building the bundle.
+
+Past bundles are kept on disk so clients holding an older version can fetch a
+record-level delta instead of the whole bundle.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.offline.local_index import (
+    BUNDLE_FORMAT,
+    compute_delta,
+    decode_bundle,
+    encode_bundle,
+    record_keys,
+)
+from mcpsquared_discovery.services.catalog import (
+    CatalogRecord,
+    load_catalog,
+    load_mcp_servers,
+)
+from mcpsquared_discovery.services.facets import load_facet_index
+from mcpsquared_discovery.services.file_cache import (
+    DEPENDENCY_ONLY_MARKERS,
+    TECHNOLOGY_KEYWORDS,
+)
+from mcpsquared_discovery.services.llm import load_mcp_resources, render_static_prefix
+from mcpsquared_discovery.services.trigram import load_trigram_index
+
+logger = logging.getLogger(__name__)
+
+_VERSION_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+
+def bundle_record(record: CatalogRecord) -> Dict:
+    """
+    Serialize a catalog record for the bundle.
+
+    Args:
+        record: Catalog record
+
+    Returns:
+        JSON-compatible record with its facet values
+    """
+    return {
+        "title": record.title,
+        "github_url": record.github_url,
+        "project_url": record.project_url,
+        "sources": [source.model_dump() for source in record.sources],
+        "cli_command": record.cli_command,
+        "description": record.description,
+        "content": record.content,
+        "category": record.category,
+        "provenance": list(record.provenance),
+        "install_method": record.install_method,
+        "languages": list(record.languages),
+    }
+
+
+def bundle_sources() -> Dict:
+    """
+    Parts of the bundle that everything else in it is derived from.
+
+    Returns:
+        Bundle format, catalog records, technology markers and search settings
+    """
+    return {
+        "format": BUNDLE_FORMAT,
+        "servers": [bundle_record(record) for record in load_catalog()],
+        "technologies": {
+            "keywords": TECHNOLOGY_KEYWORDS,
+            "dependency_only": sorted(DEPENDENCY_ONLY_MARKERS),
+        },
+        "search": {
+            "k": settings.SEARCH_MAX_CANDIDATES,
+            "min_score": settings.SEARCH_MIN_SCORE,
+            "mmr_lambda": settings.SEARCH_MMR_LAMBDA,
+            "pool_size": settings.SEARCH_MMR_POOL_SIZE,
+            "trigram_threshold": settings.SEARCH_TRIGRAM_THRESHOLD,
+        },
+    }
+
+
+@lru_cache(maxsize=1)
+def catalog_version() -> str:
+    """
+    Version of the loaded catalog and search settings.
+
+    Hashes only what the bundle is derived from: the facet and trigram
+    sections follow from the records, so this changes whenever the bundle
+    does, without building, encoding or storing the bundle.
+
+    Returns:
+        Short hex version, also the version of the index bundle
+    """
+    canonical = json.dumps(bundle_sources(), separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def build_bundle() -> Dict:
+    """
+    Build the index bundle for the loaded catalog.
+
+    Returns:
+        Bundle versioned by ``catalog_version``
+
+    Raises:
+        ValueError: If catalog records share a ``record_key``, which deltas
+            could not tell apart
+    """
+    sources = bundle_sources()
+    record_keys(sources["servers"])
+    return {
+        **sources,
+        "type": "bundle",
+        "version": catalog_version(),
+        "facets": load_facet_index().to_dict(),
+        "trigram_keywords": load_trigram_index().to_dict(),
+    }
+
+
+class BundleStore:
+    """Directory of past bundles, keyed by version."""
+
+    def __init__(self, directory: Path, history: int):
+        self.directory = directory
+        self.history = history
+
+    def _path(self, version: str) -> Path:
+        return self.directory / f"{version}.json.gz"
+
+    def save(self, version: str, data: bytes) -> None:
+        """
+        Keep an encoded bundle and drop the oldest versions beyond the history.
+
+        Args:
+            version: Bundle version
+            data: Encoded bundle
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(version)
+            if path.exists():
+                path.touch()
+            else:
+                path.write_bytes(data)
+            stored = sorted(
+                self.directory.glob("*.json.gz"),
+                key=lambda p: p.stat().st_mtime,
+                reverse=True,
+            )
+            for old in stored[self.history :]:
+                old.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Could not store index bundle %s: %s", version, e)
+
+    def load(self, version: str) -> Optional[Dict]:
+        """
+        Load a past bundle.
+
+        Args:
+            version: Bundle version
+
+        Returns:
+            Bundle, or None if it is unknown or unreadable
+        """
+        if not _VERSION_PATTERN.match(version):
+            return None
+        try:
+            return decode_bundle(self._path(version).read_bytes())
+        except (OSError, ValueError) as e:
+            logger.debug("Index bundle %s not available: %s", version, e)
+            return None
+
+
+@lru_cache(maxsize=1)
+def get_bundle_store() -> BundleStore:
+    """
+    Get the bundle store configured in settings.
+
+    Returns:
+        Bundle store
+    """
+    return BundleStore(settings.INDEX_BUNDLE_DIR, settings.INDEX_BUNDLE_HISTORY)
+
+
+@lru_cache(maxsize=1)
+def get_current_bundle() -> Dict:
+    """
+    Build, encode and store the current bundle once per process.
+
+    Returns:
+        Dictionary with the ``bundle``, its ``version`` and the ``encoded`` bytes
+    """
+    bundle = build_bundle()
+    encoded = encode_bundle(bundle)
+    get_bundle_store().save(bundle["version"], encoded)
+    logger.info(
+        "Index bundle %s built: %d servers, %d bytes compressed",
+        bundle["version"],
+        len(bundle["servers"]),
+        len(encoded),
+    )
+    return {"bundle": bundle, "version": bundle["version"], "encoded": encoded}
+
+
+def reload_catalog() -> str:
+    """
+    Drop the loaded catalog and everything derived from it, then rebuild.
+
+    The LLM system prompts embed the MCP resources markdown, so their rendered
+    prefixes are dropped too.
+
+    Returns:
+        Version of the rebuilt catalog
+    """
+    for loader in (
+        load_mcp_servers,
+        load_catalog,
+        load_facet_index,
+        load_trigram_index,
+        catalog_version,
+        get_current_bundle,
+        get_bundle_delta,
+        load_mcp_resources,
+        render_static_prefix,
+    ):
+        loader.cache_clear()
+    return catalog_version()
+
+
+@lru_cache(maxsize=16)
+def get_bundle_delta(since: str) -> Optional[bytes]:
+    """
+    Encode the delta from a past version to the current bundle.
+
+    Args:
+        since: Version the client holds
+
+    Returns:
+        Encoded delta, or None if the past version is not stored
+    """
+    current = get_current_bundle()
+    old = get_bundle_store().load(since)
+    if old is None:
+        return None
+    return encode_bundle(compute_delta(old, current["bundle"]))
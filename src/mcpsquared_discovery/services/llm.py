@@ -1,25 +1,111 @@
 """
 Service for LLM interactions using LangChain.
+
+LangChain and LiteLLM are imported on first use rather than at module import,
+which keeps worker cold starts fast; see ``preload_llm_tooling``.
 """
 
+import asyncio
+import json
 import logging
-from typing import Dict, List
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
-import json
-
-from langchain_community.chat_models import ChatLiteLLM
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import StrOutputParser
 
 from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.deadline import Deadline, DeadlineExceeded
+from mcpsquared_discovery.core.profiling import mark_stage
 from mcpsquared_discovery.models.schemas import MCPServer, Source
-from mcpsquared_discovery.prompts.content_generation import CONTENT_GENERATION_PROMPT
-from mcpsquared_discovery.prompts.query_generation import QUERY_GENERATION_PROMPT
-from mcpsquared_discovery.prompts.result_selection import RESULT_SELECTION_PROMPT
+from mcpsquared_discovery.services.batching import MicroBatcher
+from mcpsquared_discovery.services.catalog import CatalogRecord
+from mcpsquared_discovery.services.circuit_breaker import CircuitBreaker
+from mcpsquared_discovery.services.fallback import default_recommendation
+from mcpsquared_discovery.core.request_context import client_id_var
+from mcpsquared_discovery.services.file_cache import (
+    estimate_tokens,
+    format_files_for_prompt,
+)
+from mcpsquared_discovery.services.llm_routing import resolve_model, route_recorder
+from mcpsquared_discovery.services.llm_usage import usage_callback
+from mcpsquared_discovery.services.preranker import record_selection
+from mcpsquared_discovery.services.rate_limiter import (
+    AdmissionRejected,
+    get_llm_limiter,
+)
+from mcpsquared_discovery.services.output_parsing import (
+    ParsedServers,
+    parse_keyed_object,
+    parse_server_list,
+)
+from mcpsquared_discovery.prompts.content_generation import (
+    CONTENT_GENERATION_SYSTEM_PROMPT,
+    CONTENT_GENERATION_USER_PROMPT,
+)
+from mcpsquared_discovery.prompts.query_generation import (
+    QUERY_GENERATION_SYSTEM_PROMPT,
+    QUERY_GENERATION_USER_PROMPT,
+)
+from mcpsquared_discovery.prompts.output_repair import OUTPUT_REPAIR_PROMPT
+from mcpsquared_discovery.prompts.result_selection import (
+    RESULT_SELECTION_BATCH_ITEM,
+    RESULT_SELECTION_BATCH_USER_PROMPT,
+    RESULT_SELECTION_SYSTEM_PROMPT,
+    RESULT_SELECTION_USER_PROMPT,
+)
 from mcpsquared_discovery.core.logging import log_llm_call
 
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
 logger = logging.getLogger(__name__)
 
+_in_flight_calls = 0
+
+
+@lru_cache(maxsize=1)
+def get_llm_breaker() -> CircuitBreaker:
+    """
+    Get the circuit breaker shared across requests, created on first use.
+
+    Shared so that upstream health is tracked per process.
+
+    Returns:
+        Shared LLM circuit breaker
+    """
+    return CircuitBreaker(
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+        slow_call_seconds=settings.LLM_SLOW_CALL_SECONDS,
+    )
+
+
+def llm_in_flight() -> int:
+    """
+    Number of admitted LLM calls currently awaiting a response.
+
+    Returns:
+        In-flight call count, not counting calls queued for admission
+    """
+    return _in_flight_calls
+
+
+def llm_available() -> bool:
+    """
+    Check whether a new request should use the LLM pipeline.
+
+    Returns:
+        False when the circuit breaker is open or the limiter holds
+        ``LLM_MAX_IN_FLIGHT`` calls, running or queued
+    """
+    load = get_llm_limiter().load
+    if load >= settings.LLM_MAX_IN_FLIGHT:
+        logger.warning("%d LLM calls running or queued, using local results", load)
+        return False
+    return get_llm_breaker().allow_request()
+
+
+@lru_cache(maxsize=1)
 def load_mcp_resources() -> str:
     """
     Load MCP resources markdown file.
@@ -32,22 +118,109 @@ def load_mcp_resources() -> str:
         return f.read()
 
 
-def get_llm():
+@lru_cache(maxsize=None)
+def render_static_prefix(system_template: str) -> str:
+    """
+    Render a system prompt with the MCP resources once per process.
+
+    Rendering once keeps the prefix byte-identical across requests, which is
+    what provider-side prompt caching keys on.
+
+    Args:
+        system_template: System prompt template with an ``mcp_resources`` field
+
+    Returns:
+        Rendered system prompt
+    """
+    return system_template.format(mcp_resources=load_mcp_resources())
+
+
+def build_messages(
+    user_template: str, variables: Dict, system_template: Optional[str] = None
+) -> List["BaseMessage"]:
+    """
+    Build chat messages with a cacheable static prefix and a dynamic suffix.
+
+    Every prompt module follows this split: the system prompt holds the
+    instructions and the static MCP resources, so it is byte-identical across
+    requests and can be served from the provider's prompt cache, and the
+    per-request details go in the user prompt that follows it.
+
+    Args:
+        user_template: Per-request prompt template
+        variables: Values for the user prompt template
+        system_template: Optional static system prompt template
+
+    Returns:
+        List of messages for the chat model
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    messages: List["BaseMessage"] = []
+    if system_template:
+        system_text = render_static_prefix(system_template)
+        if settings.LLM_PROMPT_CACHING:
+            # Providers that support it (e.g. Anthropic via OpenRouter) cache up to here
+            messages.append(SystemMessage(content=[{
+                "type": "text",
+                "text": system_text,
+                "cache_control": {"type": "ephemeral"},
+            }]))
+        else:
+            messages.append(SystemMessage(content=system_text))
+    messages.append(HumanMessage(content=user_template.format(**variables)))
+    return messages
+
+
+def _message_text(message: "BaseMessage") -> str:
+    """Flatten message content to text for token estimation."""
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(block.get("text", "") for block in message.content)
+
+
+def preload_llm_tooling() -> None:
+    """
+    Import the LLM libraries ahead of the first request.
+
+    Run from the application lifespan in a worker thread so the service can
+    accept health checks while LangChain and LiteLLM load.
+    """
+    started = time.perf_counter()
+    import langchain_core.messages  # noqa: F401
+    import langchain_core.output_parsers  # noqa: F401
+    from langchain_community.chat_models import ChatLiteLLM  # noqa: F401
+
+    try:
+        import litellm  # noqa: F401
+    except ImportError:
+        logger.warning("litellm is not installed; LLM calls will fail")
+    logger.info("LLM tooling loaded in %.2fs", time.perf_counter() - started)
+
+
+@lru_cache(maxsize=None)
+def get_llm(model: Optional[str] = None):
     """
-    Initialize and return the LLM client.
+    Initialize and return the LLM client for a model.
+
+    Args:
+        model: OpenRouter model name, defaults to LLM_MODEL
 
     Returns:
-        Configured LangChain ChatLiteLLM instance
+        Configured LangChain ChatLiteLLM instance, shared per model
     """
+    from langchain_community.chat_models import ChatLiteLLM
+
+    model = model or settings.LLM_MODEL
+
     # Configure default headers for OpenRouter
     default_headers = {
         "HTTP-Referer": "https://mcpsquared-discovery.ai",
         "X-Title": "MCP Squared Discovery Service"
     }
 
-    # Log the call to be made
-    logger.debug("Making call to OpenRouter with model: %s", settings.LLM_MODEL)
-    logger.debug("OpenRouter API Key: %s", settings.OPENROUTER_API_KEY)
+    # Log the client being created
+    logger.debug("Creating OpenRouter client for model: %s", model)
     logger.debug("OpenRouter API Base: %s", settings.OPENROUTER_BASE_URL)
 
     model_kwargs = {
@@ -55,207 +228,495 @@ def get_llm():
     }
 
     return ChatLiteLLM(
-        model="openrouter/anthropic/claude-3.5-sonnet",
-        temperature=0.7,  # Add to settings if you want to make configurable
+        model=f"openrouter/{model}",
+        temperature=settings.LLM_TEMPERATURE,
         api_base=settings.OPENROUTER_BASE_URL,
         api_key=settings.OPENROUTER_API_KEY,
         model_kwargs=model_kwargs,
         max_retries=2,
+        request_timeout=settings.LLM_TIMEOUT_SECONDS,
     )
 
 
-async def generate_search_queries(prompt: str, context: Dict) -> List[str]:
+async def call_model(messages: List["BaseMessage"], stage: str, model: str) -> str:
+    """
+    Send messages to one model and record the call on its route.
+
+    Args:
+        messages: Chat messages to send
+        stage: Name of the pipeline stage for usage tracking
+        model: OpenRouter model name
+
+    Returns:
+        Raw LLM output
+    """
+    from langchain_core.output_parsers import StrOutputParser
+
+    chain = get_llm(model) | StrOutputParser()
+    config = {"callbacks": [usage_callback(stage, model)]}
+    started = time.monotonic()
+    try:
+        result = await chain.ainvoke(messages, config=config)
+    except asyncio.CancelledError:
+        # Losing hedges and expired deadlines are not failures of the route
+        route_recorder.record_cancelled(stage, model, time.monotonic() - started)
+        raise
+    except Exception:
+        route_recorder.record_call(
+            stage, model, time.monotonic() - started, failed=True
+        )
+        raise
+    route_recorder.record_call(stage, model, time.monotonic() - started)
+    return result
+
+
+async def hedged_call(messages: List["BaseMessage"], stage: str, model: str) -> str:
+    """
+    Call a model, sending a duplicate request if it is slower than usual.
+
+    Once the primary call passes its route's p95 latency, the same messages
+    go to LLM_HEDGE_MODEL (or the same model) and the first non-empty answer
+    wins. The other call is cancelled. The duplicate is only sent when the
+    limiter has capacity for it right away, and it counts as an in-flight call
+    while it runs. Without hedging enabled, or before a route has enough
+    latency samples, this is a plain call.
+
+    Args:
+        messages: Chat messages to send
+        stage: Name of the pipeline stage
+        model: Primary OpenRouter model name
+
+    Returns:
+        Raw LLM output
+    """
+    global _in_flight_calls
+
+    delay = route_recorder.hedge_delay(stage, model)
+    if delay is None:
+        return await call_model(messages, stage, model)
+
+    primary = asyncio.create_task(call_model(messages, stage, model))
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        prompt_tokens = estimate_tokens("".join(_message_text(m) for m in messages))
+        with get_llm_limiter().admit_if_free(prompt_tokens) as admitted:
+            if not admitted:
+                logger.info(
+                    "%s call to %s passed %.1fs, no capacity to hedge",
+                    stage,
+                    model,
+                    delay,
+                )
+                route_recorder.record_hedge(stage, model, "hedges_skipped")
+                return await primary
+
+            hedge_model = settings.LLM_HEDGE_MODEL or model
+            logger.info(
+                "%s call to %s passed %.1fs, hedging with %s",
+                stage,
+                model,
+                delay,
+                hedge_model,
+            )
+            route_recorder.record_hedge(stage, model)
+            _in_flight_calls += 1
+            hedge = asyncio.create_task(call_model(messages, stage, hedge_model))
+            pending = {primary, hedge}
+            fallback: Optional[str] = None
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.exception() is not None:
+                            continue
+                        if task.result().strip():
+                            if task is hedge:
+                                route_recorder.record_hedge(stage, model, "hedge_wins")
+                            return task.result()
+                        fallback = task.result()
+                if fallback is not None:
+                    return fallback
+                raise primary.exception()
+            finally:
+                hedge.cancel()
+                _in_flight_calls -= 1
+    finally:
+        primary.cancel()
+
+
+async def invoke_llm(
+    messages: List["BaseMessage"], stage: str, deadline: Optional[Deadline] = None
+) -> str:
+    """
+    Invoke the LLM within the request deadline and admission limits.
+
+    Args:
+        messages: Chat messages to send
+        stage: Name of the pipeline stage for logging, usage and errors
+        deadline: Request deadline, defaults to a single LLM call budget
+
+    Returns:
+        Raw LLM output
+
+    Raises:
+        DeadlineExceeded: If the call does not finish within the budget
+        AdmissionRejected: If the LLM queue is full
+    """
+    global _in_flight_calls
+
+    mark_stage(stage)
+    deadline = deadline or Deadline(settings.LLM_TIMEOUT_SECONDS)
+    model = resolve_model(stage)
+    logger.debug(
+        "Invoking %s for %s with %.1fs budget", model, stage, deadline.remaining()
+    )
+
+    prompt_tokens = estimate_tokens("".join(_message_text(m) for m in messages))
+    max_wait = deadline.timeout_for(settings.LLM_QUEUE_MAX_WAIT_SECONDS)
+    breaker = get_llm_breaker()
+    limiter = get_llm_limiter()
+
+    try:
+        async with limiter.admit(client_id_var.get(), prompt_tokens, max_wait):
+            # Only admitted calls count; queued calls are bounded by the limiter
+            _in_flight_calls += 1
+            started = time.monotonic()
+            try:
+                result = await deadline.run(
+                    hedged_call(messages, stage, model),
+                    stage,
+                    stage_cap=settings.LLM_TIMEOUT_SECONDS,
+                )
+            except DeadlineExceeded:
+                # Short client budgets are not an upstream fault; only slow calls count
+                if time.monotonic() - started >= settings.LLM_SLOW_CALL_SECONDS:
+                    breaker.record_failure()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            finally:
+                _in_flight_calls -= 1
+    except AdmissionRejected:
+        # Running out of request budget while queued is a deadline, not a rejection
+        if deadline.expired:
+            raise DeadlineExceeded(stage)
+        raise
+
+    breaker.record_success(time.monotonic() - started)
+    return result
+
+
+async def generate_search_queries(
+    prompt: str, context: Dict, deadline: Optional[Deadline] = None
+) -> List[str]:
     """
     Generate search queries based on project context using LLM.
 
     Args:
         prompt: User prompt
         context: Project context dictionary
+        deadline: Optional request deadline
 
     Returns:
         List of generated search queries
     """
     logger.debug("Generating search queries from context")
-    llm = get_llm()
-
-    # Add MCP resources to context if not already present
-    if "mcp_resources" not in context:
-        context["mcp_resources"] = load_mcp_resources()
 
     # Prepare context for the prompt
     prompt_context = {
         "prompt": prompt,
-        "files": "\n\n".join(
-            [f"File: {name}\n{content}" for name, content in context["files"].items()]
-        ),
-        "mcp_resources": context["mcp_resources"]
+        "files": format_files_for_prompt(context),
     }
 
-    # Create prompt
-    prompt = ChatPromptTemplate.from_template(QUERY_GENERATION_PROMPT)
-
-    # Create chain
-    chain = prompt | llm | StrOutputParser()
+    # Static instructions and resources first, project details after
+    messages = build_messages(
+        QUERY_GENERATION_USER_PROMPT, prompt_context, QUERY_GENERATION_SYSTEM_PROMPT
+    )
 
     # Generate queries
-    result = await chain.ainvoke(prompt_context)
+    result = await invoke_llm(messages, "query generation", deadline)
 
     # Parse the result into a list of queries
     queries = [q.strip() for q in result.split("\n") if q.strip()]
     
-    log_llm_call(
-        logger,
-        f"Generate search queries for prompt: {prompt}",
-        f"Generated queries: {queries}\nRaw LLM response: {result}"
-    )
+    log_llm_call(logger, "Generate search queries", result, queries=queries)
     
     return queries
 
 
-async def select_best_results(context: Dict, search_results: List[Dict]) -> List[Dict]:
+async def repair_server_list(
+    malformed: List[str], deadline: Optional[Deadline] = None
+) -> ParsedServers:
     """
-    Select the best MCP servers from search results and MCP resources using LLM.
+    Ask the LLM to rewrite only the malformed fragments of a server list.
 
     Args:
-        context: Project context
-        search_results: List of search results (may be empty)
+        malformed: Raw fragments that failed to parse
+        deadline: Optional request deadline
+
+    Returns:
+        ParsedServers recovered from the repair response
+    """
+    messages = build_messages(
+        OUTPUT_REPAIR_PROMPT, {"malformed_output": "\n\n".join(malformed)}
+    )
+
+    result = await invoke_llm(messages, "output repair", deadline)
+
+    log_llm_call(logger, "Repair malformed server list", result)
+
+    return parse_server_list(result)
+
+
+async def _invoke_selection(prompt_context: Dict, deadline: Optional[Deadline]) -> str:
+    """
+    Run result selection for one request.
+
+    Args:
+        prompt_context: Values for the result selection user prompt
+        deadline: Optional request deadline
+
+    Returns:
+        Raw LLM output
+    """
+    # Static instructions and resources first, project details after
+    messages = build_messages(
+        RESULT_SELECTION_USER_PROMPT, prompt_context, RESULT_SELECTION_SYSTEM_PROMPT
+    )
+
+    result = await invoke_llm(messages, "result selection", deadline)
+
+    log_llm_call(logger, "Select best results from search", result)
+    return result
+
+
+async def _select_batch(
+    items: List[Tuple[Dict, Optional[Deadline]]],
+) -> List[Optional[str]]:
+    """
+    Run result selection for several requests in one LLM call.
+
+    The system prompt is the same as for a single selection, so the batch
+    shares the cached static prefix. Each request gets a keyed section and the
+    model answers with a JSON object of server arrays by key.
+
+    Args:
+        items: Prompt context and deadline of each request
+
+    Returns:
+        Raw server array text per request, None where the answer was unusable
+    """
+    if len(items) == 1:
+        prompt_context, deadline = items[0]
+        return [await _invoke_selection(prompt_context, deadline)]
+
+    keys = [f"r{i + 1}" for i in range(len(items))]
+    sections = "\n".join(
+        RESULT_SELECTION_BATCH_ITEM.format(key=key, **prompt_context)
+        for key, (prompt_context, _) in zip(keys, items)
+    )
+    messages = build_messages(
+        RESULT_SELECTION_BATCH_USER_PROMPT,
+        {"count": len(items), "keys": ", ".join(keys), "requests": sections},
+        RESULT_SELECTION_SYSTEM_PROMPT,
+    )
+
+    # The call may run as long as the most patient request; others time out alone
+    deadlines = [deadline for _, deadline in items]
+    batch_deadline = None
+    if all(deadlines):
+        batch_deadline = Deadline(max(d.remaining() for d in deadlines))
+
+    result = await invoke_llm(messages, "batched result selection", batch_deadline)
+
+    log_llm_call(
+        logger, "Select best results for batched requests", result, batch_size=len(items)
+    )
+
+    answers = parse_keyed_object(result) or {}
+    return [
+        json.dumps(answers[key]) if isinstance(answers.get(key), list) else None
+        for key in keys
+    ]
+
+
+@lru_cache(maxsize=1)
+def get_selection_batcher() -> MicroBatcher[Tuple[Dict, Optional[Deadline]], str]:
+    """
+    Get the micro-batcher for result selection, created on first use.
+
+    Returns:
+        Shared result selection batcher
+    """
+    return MicroBatcher(
+        "result selection",
+        _select_batch,
+        window_seconds=settings.LLM_SELECTION_BATCH_WINDOW_MS / 1000,
+        max_batch=settings.LLM_SELECTION_BATCH_MAX_SIZE,
+    )
+
+
+async def _batched_selection(prompt_context: Dict, deadline: Optional[Deadline]) -> str:
+    """
+    Run result selection through the micro-batcher.
+
+    Falls back to an individual call when the batched answer for this request
+    cannot be parsed.
+
+    Args:
+        prompt_context: Values for the result selection user prompt
+        deadline: Optional request deadline
 
     Returns:
-        List of recommended servers, including suggestions from MCP resources
+        Raw LLM output for this request
     """
-    llm = get_llm()
+    submitted = get_selection_batcher().submit((prompt_context, deadline))
+    if deadline:
+        answer = await deadline.run(submitted, "result selection")
+    else:
+        answer = await submitted
+    if answer is None:
+        logger.warning("Batched selection answer unusable, selecting individually")
+        return await _invoke_selection(prompt_context, deadline)
+    return answer
 
-    # Always load MCP resources
-    context["mcp_resources"] = load_mcp_resources()
 
+async def select_best_results(
+    context: Dict,
+    search_results: Sequence[CatalogRecord],
+    deadline: Optional[Deadline] = None,
+) -> List[MCPServer]:
+    """
+    Select the best MCP servers from search results and MCP resources using LLM.
+
+    Args:
+        context: Project context
+        search_results: Catalog records from local search (may be empty)
+        deadline: Optional request deadline
+
+    Returns:
+        List of validated MCPServer objects, including suggestions from MCP resources
+    """
     # Prepare search results section
     search_results_text = ""
     if search_results:
         search_results_text = "# Direct Matches\n" + "\n\n".join(
             [
-                f"Result {i+1}:\nTitle: {result.get('title', 'Unknown')}\n"
-                f"Description: {result.get('description', 'No description')}\n"
-                f"CLI Command: {result.get('cli_command', 'Not specified')}\n"
-                f"GitHub URL: {result.get('github_url', 'Not specified')}\n"
-                f"Content: {result.get('content', '')[:1000]}..."
+                f"Result {i+1}:\nTitle: {result.title}\n"
+                f"Description: {result.description}\n"
+                f"CLI Command: {result.cli_command or 'Not specified'}\n"
+                f"GitHub URL: {result.github_url or 'Not specified'}\n"
+                f"Category: {result.category}\n"
+                f"Content: {result.content[:1000]}..."
                 for i, result in enumerate(search_results)
             ]
         )
     else:
         search_results_text = "# No Direct Matches Found\nPlease suggest relevant servers from the MCP Resources."
 
+    # Facet filters chosen by the client also constrain suggestions from the resources
+    if context.get("filters"):
+        constraints = "; ".join(
+            f"{facet.replace('_', ' ')}: {', '.join(values)}"
+            for facet, values in context["filters"].items()
+        )
+        search_results_text += (
+            f"\n\n# Constraints\nOnly recommend servers matching {constraints}."
+        )
+
     # Prepare context for the prompt
     prompt_context = {
         "prompt": context["prompt"],
-        "files": "\n\n".join(
-            [f"File: {name}\n{content}" for name, content in context["files"].items()]
-        ),
-        "mcp_resources": context["mcp_resources"],
+        "files": format_files_for_prompt(context),
         "search_results": search_results_text,
     }
 
-    # Create prompt
-    prompt = ChatPromptTemplate.from_template(RESULT_SELECTION_PROMPT)
-
-    # Create chain
-    chain = prompt | llm | StrOutputParser()
-
-    # Generate selection
-    result = await chain.ainvoke(prompt_context)
-
-    log_llm_call(
-        logger,
-        "Select best results from search",
-        f"Raw LLM response: {result}"
-    )
+    # Generate selection, sharing one LLM call with concurrent requests if enabled
+    if settings.LLM_SELECTION_BATCHING:
+        result = await _batched_selection(prompt_context, deadline)
+    else:
+        result = await _invoke_selection(prompt_context, deadline)
+
+    # Parse the response, re-asking only for fragments that fail to parse
+    parsed = parse_server_list(result)
+    selected = list(parsed.servers)
+    malformed = parsed.malformed
+    attempts = 0
+    while (
+        malformed
+        and attempts < settings.LLM_OUTPUT_REPAIR_ATTEMPTS
+        and not (deadline and deadline.expired)
+    ):
+        attempts += 1
+        logger.warning(
+            "Repairing %d malformed fragments of LLM output (attempt %d)",
+            len(malformed),
+            attempts,
+        )
+        try:
+            repaired = await repair_server_list(malformed, deadline)
+        except Exception as e:
+            logger.error("Repair call for malformed LLM output failed: %s", e)
+            break
+        selected.extend(repaired.servers)
+        malformed = repaired.malformed
 
-    try:
-        # Parse JSON response
-        selected_servers = json.loads(result)
-        
-        # Validate and normalize server objects
-        selected = []
-        for server in selected_servers:
-            if not isinstance(server, dict) or "title" not in server:
-                continue
-                
-            # Ensure all required fields are present with defaults
-            normalized_server = {
-                "title": server.get("title", "Unknown"),
-                "description": server.get("description", "No description available"),
-                "github_url": server.get("github_url", ""),
-                "project_url": server.get("project_url", ""),
-                "sources": [],  # Can be populated if needed
-                "cli_command": server.get("cli_command", "# Visit https://mcpindex.net for installation instructions"),
-                "content": server.get("content", "Please check the MCP documentation for more details.")
-            }
-            selected.append(normalized_server)
-            
-    except (json.JSONDecodeError, AttributeError) as e:
-        logger.error(f"Failed to parse LLM response as JSON: {e}")
-        logger.debug(f"Raw response: {result}")
-        selected = []
+    if malformed:
+        logger.error("Failed to parse %d fragments of LLM response", len(malformed))
+        logger.debug("Raw response: %s", result)
+    else:
+        record_selection(context, search_results, selected)
 
     # If no valid results, provide a default suggestion
     if not selected:
-        default_server = {
-            "title": "MCP Server Recommendation",
-            "description": "Based on your requirements, please visit the MCP Index for available servers.",
-            "github_url": "https://github.com/modelcontextprotocol/servers",
-            "project_url": "https://mcpindex.net",
-            "sources": [],
-            "cli_command": "# Visit https://mcpindex.net to find the right MCP server for your needs",
-            "content": "The Model Context Protocol (MCP) offers various servers that might meet your needs. "
-                      "Please visit https://mcpindex.net to explore available servers and find detailed installation instructions."
-        }
-        selected.append(default_server)
-
-    logger.debug(f"Selected {len(selected)} recommendations")
+        selected.append(default_recommendation())
+
+    logger.debug("Selected %d recommendations", len(selected))
     return selected
 
 
-async def generate_server_content(context: Dict, server: Dict) -> Dict:
+async def generate_server_content(
+    context: Dict, server: Dict, deadline: Optional[Deadline] = None
+) -> Dict:
     """
     Generate detailed content for an MCP server.
 
     Args:
         context: Project context
         server: Server information
+        deadline: Optional request deadline
 
     Returns:
         Dictionary with generated content
     """
-    llm = get_llm()
-
-    # Add MCP resources to context if not already present
-    if "mcp_resources" not in context:
-        context["mcp_resources"] = load_mcp_resources()
-
     # Prepare context for the prompt
     prompt_context = {
         "prompt": context["prompt"],
-        "files": "\n\n".join(
-            [f"File: {name}\n{content}" for name, content in context["files"].items()]
-        ),
-        "mcp_resources": context["mcp_resources"],
+        "files": format_files_for_prompt(context),
         "server_name": server.get("title", "Unknown"),
         "server_description": server.get("description", "No description"),
         "server_content": server.get("content", ""),
     }
 
-    # Create prompt
-    prompt = ChatPromptTemplate.from_template(CONTENT_GENERATION_PROMPT)
-
-    # Create chain
-    chain = prompt | llm | StrOutputParser()
+    # Static instructions and resources first, project and server details after
+    messages = build_messages(
+        CONTENT_GENERATION_USER_PROMPT, prompt_context, CONTENT_GENERATION_SYSTEM_PROMPT
+    )
 
     # Generate content
-    result = await chain.ainvoke(prompt_context)
+    result = await invoke_llm(messages, "content generation", deadline)
 
     log_llm_call(
         logger,
-        f"Generate content for server: {server.get('title', 'Unknown')}",
-        f"Raw LLM response: {result}"
+        "Generate content for server",
+        result,
+        server_title=server.get("title", "Unknown"),
     )
 
     # Parse the result to extract different sections
@@ -282,66 +743,44 @@ async def generate_server_content(context: Dict, server: Dict) -> Dict:
 
 
 async def generate_server_recommendations(
-    context: Dict, search_results: List[Dict]
+    context: Dict,
+    search_results: Sequence[CatalogRecord],
+    deadline: Optional[Deadline] = None,
 ) -> List[MCPServer]:
     """
     Generate final MCP server recommendations.
 
     Args:
         context: Project context
-        search_results: List of search results
+        search_results: Catalog records from local search
+        deadline: Optional request deadline
 
     Returns:
         List of MCPServer objects with recommendations
     """
     logger.debug("Generating server recommendations")
-    
-    # Add MCP resources to context
-    context["mcp_resources"] = load_mcp_resources()
-    
+
     # Select best results
-    best_results = await select_best_results(context, search_results)
+    best_results = await select_best_results(context, search_results, deadline)
 
     recommendations = []
 
-    for result in best_results:
-        # Create source objects from the sources list
-        sources = []
-        for source_data in result.get("sources", []):
-            source = Source(
-                source_name=source_data.get("source_name", "unknown"),
-                source_url=source_data.get("source_url", ""),
-                source_title=source_data.get("source_title", ""),
-                source_description=source_data.get("source_description", "")
-            )
-            sources.append(source)
-
+    for server in best_results:
         # If no sources provided, create a default one
-        if not sources:
-            sources = [Source(
+        if not server.sources:
+            server.sources = [Source(
                 source_name="github.com",
-                source_url=result.get("github_url", ""),
-                source_title=result.get("title", "Unknown"),
-                source_description=result.get("description", "")
+                source_url=server.github_url,
+                source_title=server.title,
+                source_description=server.description
             )]
 
-        # Create server object using the JSON structure directly
-        server = MCPServer(
-            title=result.get("title", "Unknown"),
-            github_url=result.get("github_url"),
-            project_url=result.get("project_url"),
-            sources=sources,
-            cli_command=result.get("cli_command", "npm install -g unknown-mcp-server"),
-            description=result.get("description", "No description"),
-            content=result.get("content", "No detailed information available.")
-        )
-
         recommendations.append(server)
 
     log_llm_call(
         logger,
         "Generate final recommendations",
-        f"Generated {len(recommendations)} recommendations with details"
+        [server.title for server in recommendations],
     )
     
     return recommendations
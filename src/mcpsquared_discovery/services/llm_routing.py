@@ -0,0 +1,221 @@
+"""
+Service for routing pipeline stages to models and tracking each route.
+
+Stages are mapped to a model tier in ``LLM_STAGE_MODELS``: cheap, latency
+sensitive stages such as query generation go to the small model and selection
+and content generation go to the large one. Each route (stage and model)
+keeps recent latencies, failures, hedges and token costs, and its p95 latency
+is the delay after which a hedged duplicate request is sent.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from mcpsquared_discovery.core.config import settings
+
+TIER_SMALL = "small"
+TIER_LARGE = "large"
+
+
+def resolve_model(stage: str) -> str:
+    """
+    Pick the model for a pipeline stage.
+
+    Args:
+        stage: Pipeline stage name, e.g. "query generation"
+
+    Returns:
+        OpenRouter model name; stages without a route use the large model
+    """
+    route = settings.LLM_STAGE_MODELS.get(stage, TIER_LARGE)
+    if route == TIER_SMALL:
+        return settings.LLM_SMALL_MODEL
+    if route == TIER_LARGE:
+        return settings.LLM_MODEL
+    return route
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the price of a call from the configured per-model prices.
+
+    Args:
+        model: OpenRouter model name
+        prompt_tokens: Prompt tokens of the call
+        completion_tokens: Completion tokens of the call
+
+    Returns:
+        Cost in USD, 0.0 for models without a configured price
+    """
+    prices = settings.LLM_MODEL_PRICES.get(model)
+    if not prices:
+        return 0.0
+    prompt_price, completion_price = prices
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+class RouteRecorder:
+    """Latency, failure, hedge and cost counters per stage and model."""
+
+    def __init__(self, window: int = 500):
+        self._window = window
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._counters: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, stage: str, model: str) -> Dict[str, float]:
+        """Counters of a route, created on first use. Caller holds the lock."""
+        route = (stage, model)
+        if route not in self._counters:
+            self._latencies[route] = deque(maxlen=self._window)
+            self._counters[route] = {
+                "calls": 0,
+                "failures": 0,
+                "cancelled": 0,
+                "hedges": 0,
+                "hedge_wins": 0,
+                "hedges_skipped": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost_usd": 0.0,
+            }
+        return self._counters[route]
+
+    def _percentile(self, stage: str, model: str, fraction: float) -> Optional[float]:
+        """Latency percentile of a route. Caller holds the lock."""
+        latencies = sorted(self._latencies.get((stage, model), ()))
+        if len(latencies) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+    def record_call(
+        self, stage: str, model: str, seconds: float, failed: bool = False
+    ) -> None:
+        """
+        Record a finished call.
+
+        Args:
+            stage: Pipeline stage of the call
+            model: Model the call went to
+            seconds: Call latency
+            failed: Whether the call raised
+        """
+        with self._lock:
+            counters = self._route(stage, model)
+            counters["calls"] += 1
+            if failed:
+                counters["failures"] += 1
+            else:
+                self._latencies[(stage, model)].append(seconds)
+
+    def record_cancelled(self, stage: str, model: str, seconds: float) -> None:
+        """
+        Record a call cancelled before it answered.
+
+        Hedging cancels the slowest calls, so dropping them would pull the
+        route's p95 down and make hedges ever more frequent. A call cancelled
+        after running past the p95 keeps its running time as a sample, which
+        is a lower bound on its latency. Earlier cancellations, such as short
+        client deadlines, say nothing about the route and are only counted.
+
+        Args:
+            stage: Pipeline stage of the call
+            model: Model the call went to
+            seconds: Time the call ran before it was cancelled
+        """
+        with self._lock:
+            self._route(stage, model)["cancelled"] += 1
+            p95 = self._percentile(stage, model, 0.95)
+            if p95 is not None and seconds >= p95:
+                self._latencies[(stage, model)].append(seconds)
+
+    def record_usage(
+        self, stage: str, model: str, prompt_tokens: int, completion_tokens: int
+    ) -> None:
+        """
+        Add token usage and its estimated cost to a route.
+
+        Args:
+            stage: Pipeline stage of the call
+            model: Model the call went to
+            prompt_tokens: Prompt tokens of the call
+            completion_tokens: Completion tokens of the call
+        """
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            counters = self._route(stage, model)
+            counters["prompt_tokens"] += prompt_tokens
+            counters["completion_tokens"] += completion_tokens
+            counters["cost_usd"] += cost
+
+    def record_hedge(self, stage: str, model: str, outcome: str = "hedges") -> None:
+        """
+        Count a hedge of a slow call: sent, won, or skipped for lack of capacity.
+
+        Args:
+            stage: Pipeline stage of the slow primary call
+            model: Model of the slow primary call
+            outcome: "hedges", "hedge_wins" or "hedges_skipped"
+        """
+        with self._lock:
+            self._route(stage, model)[outcome] += 1
+
+    def percentile(self, stage: str, model: str, fraction: float) -> Optional[float]:
+        """
+        Latency percentile of a route's recent calls.
+
+        Args:
+            stage: Pipeline stage
+            model: Model name
+            fraction: Percentile between 0 and 1
+
+        Returns:
+            Latency in seconds, or None without enough samples
+        """
+        with self._lock:
+            return self._percentile(stage, model, fraction)
+
+    def hedge_delay(self, stage: str, model: str) -> Optional[float]:
+        """
+        Seconds after which a call on a route gets a hedged duplicate.
+
+        Args:
+            stage: Pipeline stage of the primary call
+            model: Model of the primary call
+
+        Returns:
+            The route's p95 latency, at least LLM_HEDGE_MIN_DELAY_SECONDS, or
+            None when hedging is disabled or the route has too few samples
+        """
+        if not settings.LLM_HEDGING:
+            return None
+        p95 = self.percentile(stage, model, 0.95)
+        if p95 is None:
+            return None
+        return max(p95, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    def stats(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Report counters and latency percentiles per route.
+
+        Returns:
+            Mapping of stage name to model name to its counters
+        """
+        with self._lock:
+            routes = {
+                route: (dict(counters), sorted(self._latencies[route]))
+                for route, counters in self._counters.items()
+            }
+        report: Dict[str, Dict[str, Dict]] = {}
+        for (stage, model), (counters, latencies) in routes.items():
+            if latencies:
+                counters["latency_p50"] = latencies[len(latencies) // 2]
+                counters["latency_p95"] = latencies[int(len(latencies) * 0.95)]
+            else:
+                counters["latency_p50"] = counters["latency_p95"] = 0.0
+            report.setdefault(stage, {})[model] = counters
+        return report
+
+
+route_recorder = RouteRecorder()
@@ -0,0 +1,135 @@
+"""
+Service for recording token usage of LLM calls, including prompt cache hits.
+"""
+
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from mcpsquared_discovery.services.llm_routing import route_recorder
+
+logger = logging.getLogger(__name__)
+
+
+def _usage_value(usage: Any, *path: str) -> int:
+    """
+    Read a nested counter from a usage dict or object, defaulting to zero.
+
+    Args:
+        usage: Provider usage payload as a dict or attribute object
+        path: Keys to follow
+
+    Returns:
+        Integer value or 0 if missing
+    """
+    value = usage
+    for key in path:
+        if value is None:
+            return 0
+        value = value.get(key) if isinstance(value, dict) else getattr(value, key, None)
+    return int(value or 0)
+
+
+class UsageRecorder:
+    """Aggregate token counters per pipeline stage."""
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, usage: Any) -> Dict[str, int]:
+        """
+        Add the usage of one LLM call to the stage totals.
+
+        Args:
+            stage: Pipeline stage name
+            usage: Provider usage payload
+
+        Returns:
+            Counters extracted from this call
+        """
+        counts = {
+            "prompt_tokens": _usage_value(usage, "prompt_tokens"),
+            "completion_tokens": _usage_value(usage, "completion_tokens"),
+            # OpenAI style details, with Anthropic style fields as a fallback
+            "cached_tokens": _usage_value(usage, "prompt_tokens_details", "cached_tokens")
+            or _usage_value(usage, "cache_read_input_tokens"),
+            "cache_write_tokens": _usage_value(usage, "cache_creation_input_tokens"),
+        }
+        with self._lock:
+            totals = self._stages.setdefault(
+                stage, {"calls": 0, **{key: 0 for key in counts}}
+            )
+            totals["calls"] += 1
+            for key, value in counts.items():
+                totals[key] += value
+        return counts
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Report token totals per stage.
+
+        Returns:
+            Mapping of stage name to counters
+        """
+        with self._lock:
+            return {stage: dict(totals) for stage, totals in self._stages.items()}
+
+
+usage_recorder = UsageRecorder()
+
+
+@lru_cache(maxsize=1)
+def _usage_handler_class() -> type:
+    """Define the callback handler on first use to keep LangChain imports lazy."""
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.outputs import LLMResult
+
+    class UsageCallbackHandler(BaseCallbackHandler):
+        """LangChain callback that records token usage for one pipeline stage."""
+
+        # Counting is cheap, so skip the executor hop for sync handlers
+        run_inline = True
+
+        def __init__(self, stage: str, model: Optional[str] = None):
+            self.stage = stage
+            self.model = model
+
+        def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+            """Record token usage reported by the provider."""
+            usage = (response.llm_output or {}).get("token_usage")
+            if not usage:
+                return
+            counts = usage_recorder.record(self.stage, usage)
+            if self.model:
+                route_recorder.record_usage(
+                    self.stage,
+                    self.model,
+                    counts["prompt_tokens"],
+                    counts["completion_tokens"],
+                )
+            logger.debug(
+                "LLM usage for %s: %d prompt (%d cached, %d cache writes), %d completion",
+                self.stage,
+                counts["prompt_tokens"],
+                counts["cached_tokens"],
+                counts["cache_write_tokens"],
+                counts["completion_tokens"],
+            )
+
+    return UsageCallbackHandler
+
+
+def usage_callback(stage: str, model: Optional[str] = None) -> Any:
+    """
+    Create a LangChain callback handler that records usage for a stage.
+
+    Args:
+        stage: Pipeline stage name
+        model: Model route the call goes to, for per-route cost tracking
+
+    Returns:
+        Callback handler instance
+    """
+    return _usage_handler_class()(stage, model)
@@ -0,0 +1,147 @@
+"""
+Service for reporting memory use of the process and its in-memory data.
+
+Sizes are only reported for structures that are already built, so asking for
+a report never loads the catalog or builds an index.
+"""
+
+import sys
+import tracemalloc
+from typing import Any, Dict, Optional
+
+from mcpsquared_discovery.services.catalog import load_catalog, load_mcp_servers
+from mcpsquared_discovery.services.facets import load_facet_index
+from mcpsquared_discovery.services.file_cache import get_file_cache
+from mcpsquared_discovery.services.index_bundle import get_current_bundle
+from mcpsquared_discovery.services.trigram import load_trigram_index
+
+# Objects that hold no references worth following
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, bool, type(None))
+
+
+def deep_size(obj: Any) -> int:
+    """
+    Approximate the memory held by an object graph.
+
+    Shared objects are counted once. Slotted objects, arrays and pydantic
+    models are followed through their attributes.
+
+    Args:
+        obj: Root object
+
+    Returns:
+        Size in bytes
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, _ATOMIC_TYPES):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(vars(current))
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def _cached_result(loader: Any) -> Optional[Any]:
+    """Result of an lru_cached loader if it has run, without running it."""
+    if loader.cache_info().currsize == 0:
+        return None
+    return loader()
+
+
+def data_sizes() -> Dict[str, Dict[str, int]]:
+    """
+    Report entry counts and approximate sizes of the in-memory data.
+
+    Returns:
+        Mapping of structure name to its ``entries`` and ``bytes``
+    """
+    sizes: Dict[str, Dict[str, int]] = {}
+
+    servers = _cached_result(load_mcp_servers)
+    if servers is not None:
+        sizes["catalog_sources"] = {
+            "entries": len(servers),
+            "bytes": deep_size(servers),
+        }
+
+    catalog = _cached_result(load_catalog)
+    if catalog is not None:
+        sizes["catalog"] = {"entries": len(catalog), "bytes": deep_size(catalog)}
+
+    facets = _cached_result(load_facet_index)
+    if facets is not None:
+        sizes["facet_index"] = {
+            "entries": sum(len(values) for values in facets.to_dict().values()),
+            "bytes": deep_size(facets),
+        }
+
+    trigrams = _cached_result(load_trigram_index)
+    if trigrams is not None:
+        sizes["trigram_index"] = {
+            "entries": trigrams.trigram_count,
+            "bytes": deep_size(trigrams),
+        }
+
+    bundle = _cached_result(get_current_bundle)
+    if bundle is not None:
+        sizes["index_bundle"] = {
+            "entries": len(bundle["bundle"]["servers"]),
+            "bytes": len(bundle["encoded"]),
+        }
+
+    # Requests add to the file cache concurrently, so walk a copy
+    file_artifacts = get_file_cache().snapshot()
+    sizes["file_cache"] = {
+        "entries": len(file_artifacts),
+        "bytes": deep_size(file_artifacts),
+    }
+    return sizes
+
+
+def top_allocations(limit: int = 20) -> Dict[str, Any]:
+    """
+    Report the source lines holding the most memory according to tracemalloc.
+
+    Args:
+        limit: Number of allocation sites to report
+
+    Returns:
+        Whether tracing is on, traced totals and the top allocation sites
+    """
+    if not tracemalloc.is_tracing():
+        return {"tracing": False, "top": []}
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    stats = snapshot.statistics("lineno")[:limit]
+    frames = [stat.traceback[0] for stat in stats]
+    return {
+        "tracing": True,
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "location": f"{frame.filename}:{frame.lineno}",
+                "bytes": stat.size,
+                "blocks": stat.count,
+            }
+            for stat, frame in zip(stats, frames)
+        ],
+    }
@@ -0,0 +1,300 @@
+"""
+Service for parsing structured output from raw LLM text.
+
+LLM responses frequently wrap the requested JSON in code fences, add a short
+preamble, or get cut off at the token limit. This module locates the JSON
+array inside the text, repairs common truncation, and validates each element
+into an MCPServer so that one bad element does not discard the whole answer.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, Field, ValidationError
+
+from mcpsquared_discovery.models.schemas import MCPServer
+
+try:
+    import orjson
+
+    def _loads(text: str) -> Any:
+        """Decode JSON with orjson."""
+        return orjson.loads(text)
+
+except ImportError:  # pragma: no cover - orjson is optional
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([\]}])")
+_ARRAY_OF_OBJECTS = re.compile(r"\[\s*\{")
+
+DEFAULT_CLI_COMMAND = "# Visit https://mcpindex.net for installation instructions"
+DEFAULT_DESCRIPTION = "No description available"
+DEFAULT_CONTENT = "Please check the MCP documentation for more details."
+
+
+class ParsedServers(BaseModel):
+    """Result of parsing a server list out of LLM output."""
+
+    servers: List[MCPServer] = Field(
+        default_factory=list, description="Servers that parsed and validated"
+    )
+    malformed: List[str] = Field(
+        default_factory=list, description="Raw fragments that could not be parsed"
+    )
+
+
+def loads(text: str) -> Any:
+    """
+    Decode JSON text, using orjson when it is installed.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        Decoded value
+
+    Raises:
+        ValueError: If the text is not valid JSON
+    """
+    return _loads(text)
+
+
+def _strip_code_fence(text: str) -> str:
+    """Return the body of the first code fence, or the text unchanged."""
+    match = _FENCE_PATTERN.search(text)
+    if match and "[" in match.group(1):
+        return match.group(1)
+    return text
+
+
+def _scan_top_level(text: str, start: int) -> Tuple[List[Tuple[int, int]], int, bool]:
+    """
+    Scan a JSON array starting at ``start`` and locate its top-level elements.
+
+    Also finds where a JSON object ends when ``start`` is an opening brace;
+    element spans are only meaningful for arrays.
+
+    Args:
+        text: Text containing the array
+        start: Index of the opening bracket or brace
+
+    Returns:
+        Tuple of (element spans, end index, whether the array was closed)
+    """
+    spans: List[Tuple[int, int]] = []
+    depth = 0
+    in_string = False
+    escaped = False
+    element_start: Optional[int] = None
+
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+            if depth == 1 and element_start is None:
+                element_start = i
+        elif char in "[{":
+            depth += 1
+            if depth == 2 and element_start is None:
+                element_start = i
+        elif char in "]}":
+            depth -= 1
+            if depth == 1 and element_start is not None:
+                spans.append((element_start, i + 1))
+                element_start = None
+            elif depth == 0:
+                return spans, i + 1, True
+        elif char == "," and depth == 1:
+            element_start = None
+
+    # Text ended before the array closed; keep the partial element for repair
+    if element_start is not None:
+        spans.append((element_start, len(text)))
+    return spans, len(text), False
+
+
+def _repair_element(fragment: str) -> Optional[Any]:
+    """
+    Try to decode a single array element, repairing trailing commas.
+
+    Args:
+        fragment: Raw element text
+
+    Returns:
+        Decoded value or None if it cannot be repaired
+    """
+    for candidate in (fragment, _TRAILING_COMMA.sub(r"\1", fragment)):
+        try:
+            return loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+
+def _coerce_sources(value: Any, title: str) -> List[Dict[str, Any]]:
+    """
+    Turn the sources an LLM wrote into Source fields.
+
+    Models often list sources as plain URLs or omit fields; those are filled
+    in rather than failing the whole server.
+
+    Args:
+        value: Decoded "sources" value
+        title: Title of the server, used as the source title when missing
+
+    Returns:
+        Source dictionaries
+    """
+    if isinstance(value, (str, dict)):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    sources = []
+    for source in value:
+        if isinstance(source, str) and source.strip():
+            source = {"source_url": source.strip()}
+        if not isinstance(source, dict):
+            continue
+        url = str(source.get("source_url") or "")
+        sources.append(
+            {
+                "source_name": source.get("source_name") or urlparse(url).netloc,
+                "source_url": url,
+                "source_title": source.get("source_title") or title,
+                "source_description": source.get("source_description") or "",
+            }
+        )
+    return sources
+
+
+def _to_server(data: Any) -> Optional[MCPServer]:
+    """
+    Validate a decoded element into an MCPServer, filling defaults.
+
+    Args:
+        data: Decoded JSON element
+
+    Returns:
+        MCPServer or None if the element is not a usable server object
+    """
+    if not isinstance(data, dict) or not data.get("title"):
+        return None
+    title = str(data["title"])
+    try:
+        return MCPServer(
+            title=title,
+            github_url=data.get("github_url") or "",
+            project_url=data.get("project_url") or "",
+            sources=_coerce_sources(data.get("sources"), title),
+            cli_command=data.get("cli_command") or DEFAULT_CLI_COMMAND,
+            description=data.get("description") or DEFAULT_DESCRIPTION,
+            content=data.get("content") or DEFAULT_CONTENT,
+        )
+    except ValidationError:
+        return None
+
+
+def parse_server_list(text: str) -> ParsedServers:
+    """
+    Parse a JSON array of servers out of raw LLM text.
+
+    Handles code fences, chatty preambles, trailing commas and responses that
+    were cut off mid-array. Elements that cannot be repaired are returned as
+    malformed fragments so the caller can ask the model to fix just those.
+
+    Args:
+        text: Raw LLM output
+
+    Returns:
+        ParsedServers with validated servers and malformed fragments
+    """
+    body = _strip_code_fence(text)
+    array_match = _ARRAY_OF_OBJECTS.search(body)
+    start = array_match.start() if array_match else body.find("[")
+    if start == -1:
+        # A single object instead of an array is still usable
+        brace = body.find("{")
+        server = _to_server(_repair_element(body[brace:])) if brace != -1 else None
+        if server:
+            return ParsedServers(servers=[server])
+        return ParsedServers(malformed=[text.strip()] if text.strip() else [])
+
+    # Fast path: decode the whole array at once when it is valid JSON
+    spans, end, closed = _scan_top_level(body, start)
+    decoded: Optional[List[Any]] = None
+    if closed:
+        try:
+            data = loads(body[start:end])
+            if isinstance(data, list) and len(data) == len(spans):
+                decoded = data
+        except ValueError:
+            pass
+
+    # Either way, elements that do not validate go to repair
+    result = ParsedServers()
+    for position, (element_start, element_end) in enumerate(spans):
+        fragment = body[element_start:element_end]
+        if decoded is not None:
+            item = decoded[position]
+        else:
+            item = _repair_element(fragment)
+        server = _to_server(item)
+        if server:
+            result.servers.append(server)
+        elif fragment.strip():
+            result.malformed.append(fragment.strip())
+
+    if not closed:
+        logger.debug(
+            "Repaired truncated LLM output: %d servers kept, %d fragments malformed",
+            len(result.servers),
+            len(result.malformed),
+        )
+    return result
+
+
+def parse_keyed_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a JSON object of answers keyed by request out of raw LLM text.
+
+    Each opening brace is tried in turn and matched to its balanced closing
+    brace, so braces in a preamble or in trailing text are skipped.
+
+    Args:
+        text: Raw LLM output
+
+    Returns:
+        Decoded object, or None if the text holds no valid JSON object
+    """
+    match = _FENCE_PATTERN.search(text)
+    body = match.group(1) if match and "{" in match.group(1) else text
+    start = body.find("{")
+    while start != -1:
+        _, end, closed = _scan_top_level(body, start)
+        if closed:
+            fragment = body[start:end]
+            for candidate in (fragment, _TRAILING_COMMA.sub(r"\1", fragment)):
+                try:
+                    data = loads(candidate)
+                except ValueError:
+                    continue
+                if isinstance(data, dict):
+                    return data
+                break
+        start = body.find("{", start + 1)
+    return None
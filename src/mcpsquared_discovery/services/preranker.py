@@ -0,0 +1,294 @@
+"""
+Service for learned pre-ranking of search candidates.
+
+With ``SELECTION_LOG_ENABLED`` every LLM selection is logged with the
+described context and the search candidates in search order, before
+pre-ranking, as training data for ``tools/train_preranker.py``. Logging them
+before pre-ranking keeps the rank feature the same in training and serving and
+keeps candidates the model dropped in the log. A model loaded from
+``PRERANKER_MODEL_PATH`` then reorders search results by the probability that
+the LLM selects them, drops unlikely candidates and caps how many are sent to
+the LLM. With ``PRERANK_SKIP_LLM`` a request is answered without the LLM when
+the model is confident about every candidate.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.models.schemas import MCPServer
+from mcpsquared_discovery.offline.local_index import record_key
+from mcpsquared_discovery.offline.preranker import (
+    LogisticModel,
+    candidate_features,
+    describe_candidate,
+    describe_context,
+)
+from mcpsquared_discovery.services.catalog import (
+    CatalogRecord,
+    normalize_github_url,
+    normalize_title,
+)
+from mcpsquared_discovery.services.traffic import TrafficRecorder, scrub_prompt
+
+logger = logging.getLogger(__name__)
+
+# Context key holding pre-ranking probabilities by catalog index
+PRERANK_CONTEXT_KEY = "prerank"
+# Context key holding the search results in search order, before pre-ranking
+SEARCH_ORDER_CONTEXT_KEY = "search_order"
+
+# Pre-ranking outcomes, reported in /metrics/llm
+_prerank_counts = {"reranked": 0, "dropped": 0, "skipped_llm": 0}
+
+
+def context_description(context: Dict) -> Dict[str, List[str]]:
+    """
+    Describe a project context for pre-ranking.
+
+    Args:
+        context: Project context dictionary
+
+    Returns:
+        Context description
+    """
+    return describe_context(
+        scrub_prompt(context.get("prompt", "")),
+        context.get("technologies", []),
+        context.get("dependencies", []),
+    )
+
+
+def candidate_descriptions(
+    search_results: Sequence[CatalogRecord],
+) -> List[Dict[str, Any]]:
+    """
+    Describe search results for pre-ranking.
+
+    Args:
+        search_results: Catalog records in ranked order
+
+    Returns:
+        Candidate descriptions in the same order
+    """
+    return [
+        describe_candidate(
+            record_key({"github_url": record.github_url, "title": record.title}),
+            record.title,
+            record.terms,
+            record.category,
+            record.install_method,
+            rank,
+        )
+        for rank, record in enumerate(search_results)
+    ]
+
+
+@lru_cache(maxsize=1)
+def load_preranker() -> Optional[LogisticModel]:
+    """
+    Load the trained pre-ranker.
+
+    Returns:
+        Model, or None if no model is configured or it cannot be read
+    """
+    if not settings.PRERANKER_MODEL_PATH:
+        return None
+    path = Path(settings.PRERANKER_MODEL_PATH)
+    try:
+        with path.open(encoding="utf-8") as f:
+            model = LogisticModel.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Pre-ranker model %s not loaded: %s", path, e)
+        return None
+    logger.info("Loaded pre-ranker with %d weights from %s", len(model.weights), path)
+    return model
+
+
+@lru_cache(maxsize=1)
+def preranker_version() -> Optional[str]:
+    """
+    Version of the pre-ranker and the thresholds it is applied with.
+
+    Returns:
+        Short hex hash, or None when no model is loaded
+    """
+    model = load_preranker()
+    if model is None:
+        return None
+    inputs = {
+        "model": model.to_dict(),
+        "max_candidates": settings.PRERANK_MAX_CANDIDATES,
+        "drop": settings.PRERANK_DROP_PROBABILITY,
+        "skip_llm": settings.PRERANK_SKIP_LLM,
+        "accept": settings.PRERANK_ACCEPT_PROBABILITY,
+        "reject": settings.PRERANK_REJECT_PROBABILITY,
+    }
+    canonical = json.dumps(inputs, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def prerank(context: Dict, search_results: List[CatalogRecord]) -> List[CatalogRecord]:
+    """
+    Reorder and trim search results by predicted selection probability.
+
+    Candidates below ``PRERANK_DROP_PROBABILITY`` are dropped, keeping at
+    least the most likely one, and at most ``PRERANK_MAX_CANDIDATES`` are
+    kept. The probabilities are stored in the context for
+    ``confident_selection``, and the results in search order for
+    ``record_selection``.
+
+    Args:
+        context: Project context dictionary
+        search_results: Catalog records in search order
+
+    Returns:
+        Catalog records, most likely to be selected first; the results
+        unchanged when no model is loaded
+    """
+    model = load_preranker()
+    if model is None or not search_results:
+        return search_results
+
+    description = context_description(context)
+    probabilities = [
+        model.probability(candidate_features(description, candidate))
+        for candidate in candidate_descriptions(search_results)
+    ]
+    # Stable, so ties keep their search order
+    ranked = sorted(
+        zip(probabilities, search_results), key=lambda pair: pair[0], reverse=True
+    )
+    kept = [
+        record
+        for probability, record in ranked
+        if probability >= settings.PRERANK_DROP_PROBABILITY
+    ] or [ranked[0][1]]
+    kept = kept[: settings.PRERANK_MAX_CANDIDATES]
+
+    context[PRERANK_CONTEXT_KEY] = {
+        record.index: probability for probability, record in ranked
+    }
+    context[SEARCH_ORDER_CONTEXT_KEY] = list(search_results)
+    _prerank_counts["reranked"] += 1
+    _prerank_counts["dropped"] += len(search_results) - len(kept)
+    return kept
+
+
+def confident_selection(
+    context: Dict, search_results: Sequence[CatalogRecord]
+) -> Optional[List[CatalogRecord]]:
+    """
+    Select candidates without the LLM when the pre-ranker is confident.
+
+    Args:
+        context: Project context dictionary, pre-ranked by ``prerank``
+        search_results: Pre-ranked catalog records
+
+    Returns:
+        Candidates at or above ``PRERANK_ACCEPT_PROBABILITY``, or None unless
+        ``PRERANK_SKIP_LLM`` is set, at least one candidate is accepted and
+        all others are at or below ``PRERANK_REJECT_PROBABILITY``
+    """
+    probabilities = context.get(PRERANK_CONTEXT_KEY)
+    if not settings.PRERANK_SKIP_LLM or not probabilities or not search_results:
+        return None
+
+    accepted = []
+    for record in search_results:
+        probability = probabilities.get(record.index, 0.0)
+        if probability >= settings.PRERANK_ACCEPT_PROBABILITY:
+            accepted.append(record)
+        elif probability > settings.PRERANK_REJECT_PROBABILITY:
+            return None
+    if accepted:
+        _prerank_counts["skipped_llm"] += 1
+    return accepted or None
+
+
+def record_selection(
+    context: Dict,
+    search_results: Sequence[CatalogRecord],
+    selected: Sequence[MCPServer],
+) -> None:
+    """
+    Log the candidates of an LLM selection and which of them were selected.
+
+    Candidates are logged in search order, as ``prerank`` received them, with
+    the keys of those shown to the LLM. Selected servers are matched to
+    candidates by normalized title or GitHub URL. Servers the LLM suggested
+    from elsewhere are counted but not named.
+
+    Args:
+        context: Project context dictionary
+        search_results: Catalog records the LLM selected from
+        selected: Servers the LLM selected
+    """
+    if not get_selection_recorder().running or not search_results:
+        return
+    titles = {normalize_title(server.title) for server in selected}
+    urls = {normalize_github_url(server.github_url) for server in selected} - {""}
+    search_order = context.get(SEARCH_ORDER_CONTEXT_KEY) or search_results
+    shown = {record.index for record in search_results}
+    if not shown <= {record.index for record in search_order}:
+        # Pre-ranked by a later search of the same request, e.g. speculation
+        search_order = search_results
+    candidates = candidate_descriptions(search_order)
+    keys = {
+        record.index: candidate["key"]
+        for candidate, record in zip(candidates, search_order)
+    }
+    chosen = [
+        keys[record.index]
+        for record in search_results
+        if normalize_title(record.title) in titles
+        or normalize_github_url(record.github_url) in urls
+    ]
+    get_selection_recorder().write(
+        {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "model": settings.LLM_MODEL,
+            "context": context_description(context),
+            "candidates": candidates,
+            "shown": [keys[record.index] for record in search_results],
+            "selected": chosen,
+            "suggested_elsewhere": max(len(selected) - len(chosen), 0),
+        }
+    )
+
+
+def preranker_stats() -> Dict[str, Any]:
+    """
+    Report whether a pre-ranker is loaded and what it did.
+
+    Returns:
+        Model state, outcome counters and selection log counters
+    """
+    model = load_preranker()
+    return {
+        "model_loaded": model is not None,
+        "model": model.metadata if model is not None else None,
+        **_prerank_counts,
+        "selection_log": get_selection_recorder().stats(),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_selection_recorder() -> TrafficRecorder:
+    """
+    Get the process-wide selection log writer, created on first use.
+
+    Returns:
+        Shared selection log recorder
+    """
+    return TrafficRecorder(
+        settings.SELECTION_LOG_PATH,
+        settings.TRAFFIC_CAPTURE_MAX_BYTES,
+        settings.TRAFFIC_CAPTURE_BACKUPS,
+        settings.TRAFFIC_CAPTURE_MAX_QUEUE,
+    )
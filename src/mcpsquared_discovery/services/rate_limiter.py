@@ -0,0 +1,309 @@
+"""
+Admission control and fair queuing for outbound LLM calls.
+
+All LLM calls in the process go through a single controller that enforces a
+concurrency cap, a requests-per-second limit and a token-per-minute budget
+based on estimated prompt tokens. Calls that cannot start immediately wait in
+a bounded queue that is served round-robin across clients, so one noisy
+client cannot starve the others. When the queue is full new calls are
+rejected straight away with a suggested retry delay.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional
+
+from mcpsquared_discovery.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when an LLM call cannot be admitted and the client should retry."""
+
+    def __init__(self, retry_after: float, reason: str):
+        self.retry_after = retry_after
+        super().__init__(
+            f"LLM capacity exhausted ({reason}), retry after {retry_after:.0f}s"
+        )
+
+
+class TokenBucket:
+    """Continuously refilling token bucket."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add tokens accrued since the last update."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.refill_per_second
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until ``amount`` tokens are available.
+
+        Args:
+            amount: Tokens needed
+
+        Returns:
+            Zero if available now, otherwise the expected wait
+        """
+        self._refill()
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def take(self, amount: float) -> None:
+        """
+        Consume tokens, which must be available.
+
+        Args:
+            amount: Tokens to consume
+        """
+        self._refill()
+        self.tokens -= amount
+
+
+class _Waiter:
+    """A queued LLM call."""
+
+    __slots__ = ("client_id", "tokens", "future", "enqueued_at")
+
+    def __init__(self, client_id: str, tokens: int, future: asyncio.Future):
+        self.client_id = client_id
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class LLMAdmissionController:
+    """Global limiter in front of LLM chain invocations."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        requests_per_second: float,
+        tokens_per_minute: int,
+        max_queue: int,
+        max_wait_seconds: float,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self._requests = TokenBucket(max(requests_per_second, 1.0), requests_per_second)
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self.admitted = 0
+        self.rejected = 0
+
+    def _cost(self, tokens: int) -> int:
+        """Clamp a call's token estimate so it can always eventually be admitted."""
+        return min(max(tokens, 1), int(self._tokens.capacity))
+
+    def _ready_in(self, tokens: int) -> float:
+        """Seconds until a call of ``tokens`` could start, ignoring the queue."""
+        if self._active >= self.max_concurrent:
+            return -1.0
+        return max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+
+    def _start(self, tokens: int, enqueued_at: float) -> None:
+        """Account for a call that is starting now."""
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self._active += 1
+        self.admitted += 1
+        self._waits.append(time.monotonic() - enqueued_at)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """Peek at the head of the next client's queue in round-robin order."""
+        while self._queues:
+            client_id, queue = next(iter(self._queues.items()))
+            while queue and queue[0].future.done():
+                queue.popleft()
+                self._queued -= 1
+            if queue:
+                return queue[0]
+            del self._queues[client_id]
+        return None
+
+    def _dispatch(self) -> None:
+        """Start as many queued calls as the limits allow, rotating across clients."""
+        self._wake_handle = None
+        while True:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            ready_in = self._ready_in(waiter.tokens)
+            if ready_in < 0:
+                # Concurrency limited; release() will dispatch again
+                return
+            if ready_in > 0:
+                loop = asyncio.get_running_loop()
+                self._wake_handle = loop.call_later(ready_in, self._dispatch)
+                return
+
+            queue = self._queues.pop(waiter.client_id)
+            queue.popleft()
+            self._queued -= 1
+            if queue:
+                # Move the client to the back so others get the next slot
+                self._queues[waiter.client_id] = queue
+            self._start(waiter.tokens, waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _discard(self, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up before being admitted."""
+        waiter.future.cancel()
+        queue = self._queues.get(waiter.client_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._queues[waiter.client_id]
+
+    def _retry_after(self) -> float:
+        """Estimate how long a rejected client should wait before retrying."""
+        average_wait = sum(self._waits) / len(self._waits) if self._waits else 1.0
+        return max(1.0, min(average_wait * 2, self.max_wait_seconds))
+
+    def _release(self) -> None:
+        """Free a concurrency slot and start queued calls."""
+        self._active -= 1
+        if self._wake_handle is None:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def admit(
+        self, client_id: str, tokens: int, max_wait: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """
+        Wait for capacity to make an LLM call and hold it for the duration.
+
+        Args:
+            client_id: Caller identity used for fair queuing
+            tokens: Estimated prompt tokens of the call
+            max_wait: Seconds to wait in the queue, defaults to the configured maximum
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait times out
+        """
+        tokens = self._cost(tokens)
+        max_wait = self.max_wait_seconds if max_wait is None else max_wait
+        enqueued_at = time.monotonic()
+
+        if self._queued == 0 and self._ready_in(tokens) == 0:
+            self._start(tokens, enqueued_at)
+        else:
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected(self._retry_after(), "queue full")
+
+            future = asyncio.get_running_loop().create_future()
+            waiter = _Waiter(client_id, tokens, future)
+            self._queues.setdefault(client_id, deque()).append(waiter)
+            self._queued += 1
+            if self._wake_handle is None:
+                self._dispatch()
+
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout=max_wait)
+            except asyncio.TimeoutError:
+                if not future.done():
+                    self._discard(waiter)
+                    self.rejected += 1
+                    raise AdmissionRejected(self._retry_after(), "queue wait timed out")
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()
+                else:
+                    self._discard(waiter)
+                raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def admit_if_free(self, tokens: int) -> Iterator[bool]:
+        """
+        Take capacity for an optional call only if it could start right away.
+
+        Optional calls, such as hedged duplicates, never queue, so they cannot
+        delay or displace calls that are waiting. They are not counted as
+        rejected when there is no capacity.
+
+        Args:
+            tokens: Estimated prompt tokens of the call
+
+        Yields:
+            Whether capacity was taken; it is held until the block exits
+        """
+        tokens = self._cost(tokens)
+        admitted = self._queued == 0 and self._ready_in(tokens) == 0
+        if admitted:
+            self._start(tokens, time.monotonic())
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self._release()
+
+    @property
+    def load(self) -> int:
+        """Calls running plus calls waiting in the queue."""
+        return self._active + self._queued
+
+    def stats(self) -> Dict:
+        """
+        Report queue depth, wait times and admission counters for monitoring.
+
+        Returns:
+            Dictionary of limiter statistics
+        """
+        waits = sorted(self._waits)
+        return {
+            "active": self._active,
+            "queue_depth": self._queued,
+            "queued_clients": sum(1 for queue in self._queues.values() if queue),
+            "max_client_queue_depth": max(
+                (len(queue) for queue in self._queues.values()), default=0
+            ),
+            "wait_seconds_p50": waits[len(waits) // 2] if waits else 0.0,
+            "wait_seconds_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            "wait_seconds_max": waits[-1] if waits else 0.0,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_llm_limiter() -> LLMAdmissionController:
+    """
+    Get the process-wide LLM admission controller, created on first use.
+
+    Returns:
+        Shared LLM admission controller
+    """
+    return LLMAdmissionController(
+        max_concurrent=settings.LLM_MAX_CONCURRENT,
+        requests_per_second=settings.LLM_REQUESTS_PER_SECOND,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        max_queue=settings.LLM_QUEUE_MAX_SIZE,
+        max_wait_seconds=settings.LLM_QUEUE_MAX_WAIT_SECONDS,
+    )
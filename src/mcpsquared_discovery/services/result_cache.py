@@ -0,0 +1,101 @@
+"""
+Service for caching discovery answers by normalized request inputs.
+
+Only complete LLM answers are cached, keyed by the normalized inputs from
+``services.traffic``, so requests with the same prompt and project files are
+answered without an LLM round-trip. Entries expire after ``RESULT_CACHE_TTL_SECONDS``
+and the cache is cleared when the catalog is reloaded.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.models.schemas import MCPServer
+
+
+class ResultCache:
+    """Thread-safe LRU of recommended servers with a time to live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[MCPServer]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[MCPServer]]:
+        """
+        Look up a cached answer, marking it recently used.
+
+        Args:
+            key: Normalized inputs key
+
+        Returns:
+            Recommended servers, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+
+    def put(self, key: str, servers: List[MCPServer]) -> None:
+        """
+        Store an answer, evicting the least recently used entry when full.
+
+        Args:
+            key: Normalized inputs key
+            servers: Recommended servers
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, servers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report cache size and hit counters.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCache:
+    """
+    Get the process-wide result cache, created on first use.
+
+    Returns:
+        Shared result cache
+    """
+    return ResultCache(
+        settings.RESULT_CACHE_MAX_ENTRIES, settings.RESULT_CACHE_TTL_SECONDS
+    )
@@ -1,141 +1,157 @@
 """
 Service for searching MCP servers from various sources.
+
+Scoring and ranking live in ``offline.local_index`` so that clients searching
+an exported index bundle rank exactly like the service does. Scans of the
+catalog run in the CPU worker pool and hand back catalog indices, which map
+onto the shared records of this process whichever pool kind ran them.
 """
 
 import logging
-import json
-from typing import Dict, List
-from pathlib import Path
-
-import httpx
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
 from mcpsquared_discovery.core.config import settings
-from mcpsquared_discovery.core.logging import log_api_call
-from mcpsquared_discovery.services.content_retrieval import retrieve_content
+from mcpsquared_discovery.core.executor import get_cpu_executor
+from mcpsquared_discovery.offline.local_index import rank_servers
+from mcpsquared_discovery.services.catalog import CatalogRecord, load_catalog
+from mcpsquared_discovery.services.facets import iter_bits, load_facet_index
+from mcpsquared_discovery.services.preranker import prerank
+from mcpsquared_discovery.services.trigram import load_trigram_index
 
 logger = logging.getLogger(__name__)
 
-def load_mcp_servers() -> List[Dict]:
+
+async def enrich_search_results(results: List[Dict]) -> List[Dict]:
     """
-    Load MCP servers from the local JSON file.
+    Enrich search results with additional content from source pages.
+
+    Args:
+        results: Raw search results
 
     Returns:
-        List of server records
+        Enriched search results with full content
     """
-    json_path = Path(__file__).parent.parent / "data" / "mcp_servers.json"
-    with open(json_path) as f:
-        data = json.load(f)
-    return data.get("mcp_servers", [])
+    # No need to enrich as content is already in the JSON
+    return results
 
-def score_server_match(server: Dict, query: str) -> float:
+def derive_search_queries(context: Dict) -> List[str]:
     """
-    Score how well a server matches a query.
+    Derive local search queries from the project context without an LLM.
 
     Args:
-        server: Server record
-        query: Search query string
+        context: Project context with detected technologies
 
     Returns:
-        Match score between 0 and 1
+        List of technology names to search for
     """
-    query = query.lower()
-    score = 0.0
-    
-    # Check title match (highest weight)
-    if query in server.get("title", "").lower():
-        score += 0.5
-        
-    # Check description match
-    if query in server.get("description", "").lower():
-        score += 0.3
-        
-    # Check content match
-    if query in server.get("content", "").lower():
-        score += 0.2
-        
-    # Check CLI command match
-    if query in server.get("cli_command", "").lower():
-        score += 0.1
-        
-    # Check GitHub URL match
-    if query in server.get("github_url", "").lower():
-        score += 0.1
-        
-    return min(score, 1.0)
-
-async def search_local_servers(query: str) -> List[Dict]:
+    return list(context.get("technologies", []))
+
+
+def filter_catalog(
+    filters: Optional[Mapping[str, Sequence[str]]],
+) -> Sequence[CatalogRecord]:
     """
-    Search for MCP servers in the local JSON data.
+    Restrict the catalog to records matching facet filters.
 
     Args:
-        query: Search query string
+        filters: Facet name to accepted values
 
     Returns:
-        List of matching server records
+        Matching records, or the whole catalog if no filter is active
     """
-    servers = load_mcp_servers()
-    
-    # Score each server's match against the query
-    scored_servers = []
-    for server in servers:
-        score = score_server_match(server, query)
-        if score > 0:
-            scored_servers.append((score, server))
-    
-    # Sort by score descending and return servers
-    scored_servers.sort(reverse=True, key=lambda x: x[0])
-    matches = [server for score, server in scored_servers]
-    
-    logger.debug("Local search with query '%s' found %d matches", query, len(matches))
-    return matches
-
-async def enrich_search_results(results: List[Dict]) -> List[Dict]:
+    servers = load_catalog()
+    mask = load_facet_index().matching(filters)
+    if mask is None:
+        return servers
+    return [servers[index] for index in iter_bits(mask)]
+
+
+def rank_catalog(
+    queries: Sequence[str],
+    prompt: str,
+    filters: Optional[Mapping[str, Sequence[str]]],
+    k: int,
+    min_score: float,
+) -> Tuple[List[int], bool, int]:
     """
-    Enrich search results with additional content from source pages.
+    Filter and rank the catalog for a set of search queries.
 
     Args:
-        results: Raw search results
+        queries: Search queries
+        prompt: User prompt, used for fuzzy title matching
+        filters: Facet filters applied before scoring
+        k: Maximum number of results
+        min_score: Minimum per-query match score
 
     Returns:
-        Enriched search results with full content
+        Catalog indices in ranked order, whether the matches were exact, and
+        the number of candidates that passed the filters
     """
-    # No need to enrich as content is already in the JSON
-    return results
-
-async def search_mcp_servers(context: Dict) -> List[Dict]:
+    candidates = filter_catalog(filters)
+    results, exact = rank_servers(
+        load_catalog(),
+        candidates,
+        queries,
+        prompt,
+        load_trigram_index(),
+        k,
+        min_score,
+        settings.SEARCH_MMR_POOL_SIZE,
+        settings.SEARCH_MMR_LAMBDA,
+        settings.SEARCH_TRIGRAM_THRESHOLD,
+    )
+    return [record.index for record in results], exact, len(candidates)
+
+
+async def search_mcp_servers(
+    context: Dict,
+    k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    filters: Optional[Mapping[str, Sequence[str]]] = None,
+) -> List[CatalogRecord]:
     """
     Search for MCP servers based on project context.
 
+    Falls back to the technologies detected in the project files and prompt
+    when no search queries have been generated, and to typo-tolerant trigram
+    matching of titles when the queries find nothing. Scores are summed across
+    queries, so servers relevant to several technologies rank higher. The
+    best results are then diversified and capped, bounding the candidate set
+    handed to the LLM. With a trained pre-ranker loaded, the results are
+    reordered and trimmed by how likely the LLM is to select them.
+
     Args:
         context: Project context including search queries
+        k: Maximum number of results, defaults to SEARCH_MAX_CANDIDATES
+        min_score: Minimum per-query match score, defaults to SEARCH_MIN_SCORE
+        filters: Facet filters applied before scoring, defaults to context["filters"]
 
     Returns:
-        List of search results
+        Shared, read-only catalog records in ranked order
     """
-    all_results = []
-    seen_titles = set()
-
-    # Search using each generated query
-    for query in context["search_queries"]:
-        # Search local JSON data
-        local_results = await search_local_servers(query)
-        
-        # Add unique results
-        for result in local_results:
-            title = result.get("title")
-            if title and title not in seen_titles:
-                seen_titles.add(title)
-                # Ensure all required fields are present with defaults if needed
-                enriched_result = {
-                    "title": title,
-                    "github_url": result.get("github_url", ""),
-                    "project_url": result.get("project_url", ""),
-                    "sources": result.get("sources", []),
-                    "cli_command": result.get("cli_command", "npm install -g unknown-mcp-server"),
-                    "description": result.get("description", "No description available"),
-                    "content": result.get("content", "No detailed content available")
-                }
-                all_results.append(enriched_result)
-
-    logger.debug("Found %d unique servers across all queries", len(all_results))
-    return all_results
+    k = settings.SEARCH_MAX_CANDIDATES if k is None else k
+    min_score = settings.SEARCH_MIN_SCORE if min_score is None else min_score
+    if filters is None:
+        filters = context.get("filters")
+    queries = context.get("search_queries") or derive_search_queries(context)
+
+    indices, exact, candidate_count = await get_cpu_executor().run(
+        "search",
+        rank_catalog,
+        list(queries),
+        context.get("prompt", ""),
+        filters,
+        k,
+        min_score,
+    )
+    servers = load_catalog()
+    results = prerank(context, [servers[index] for index in indices])
+
+    logger.debug(
+        "Returning %d %s matches among %d candidates across %d queries",
+        len(results),
+        "exact" if exact else "fuzzy",
+        candidate_count,
+        len(queries),
+    )
+    return results
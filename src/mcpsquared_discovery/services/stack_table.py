@@ -0,0 +1,254 @@
+"""
+Service for precomputed recommendations of common technology stacks.
+
+A build-time job (``tools/build_stack_table.py``) runs each canonical stack
+in ``data/canonical_stacks.json`` through local search and
+``generate_server_recommendations``. It stores the answers keyed by a stack
+fingerprint, together with the catalog version they were built against.
+
+With ``STACK_TABLE_ENABLED`` a request whose detected technologies have a
+fingerprint in the table, and whose prompt names nothing beyond the stack, is
+answered from the table without search or LLM calls. A table built for
+another catalog version is ignored, so reloading the catalog or deploying new
+catalog data invalidates it until it is rebuilt.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.deadline import Deadline
+from mcpsquared_discovery.core.executor import get_cpu_executor
+from mcpsquared_discovery.models.schemas import MCPServer
+from mcpsquared_discovery.offline.local_index import PROMPT_STOPWORDS, extract_terms
+from mcpsquared_discovery.services.fallback import default_recommendation
+from mcpsquared_discovery.services.file_cache import TECHNOLOGY_KEYWORDS
+from mcpsquared_discovery.services.index_bundle import catalog_version
+from mcpsquared_discovery.services.llm import generate_server_recommendations
+from mcpsquared_discovery.services.search import search_mcp_servers
+from mcpsquared_discovery.services.traffic import context_from_inputs
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMAT = 1
+
+# Technologies implied by another one, e.g. every Next.js app uses React
+_IMPLIED_TECHNOLOGIES = {"next.js": frozenset({"node", "react"})}
+
+# Technologies that do not change which servers fit a stack
+_NEUTRAL_TECHNOLOGIES = frozenset({"typescript"})
+
+# Prompt words that name a technology or ask for recommendations in general
+_STACK_PROMPT_WORDS = frozenset(
+    word
+    for technology, markers in TECHNOLOGY_KEYWORDS.items()
+    for text in (technology, *markers)
+    for word in extract_terms(text)
+) | frozenset("recommend suggest find best good useful stack current".split())
+
+# Table lookups, reported in /metrics/llm
+_lookup_counts = {"hits": 0, "misses": 0}
+
+
+@dataclass(frozen=True)
+class StackTable:
+    """Precomputed recommendations loaded from one build of the table."""
+
+    # Recommended servers by stack fingerprint
+    stacks: Dict[str, List[MCPServer]] = field(default_factory=dict)
+    # Hash of the table file, None when no table is loaded
+    version: Optional[str] = None
+
+
+def stack_fingerprint(technologies: Iterable[str]) -> str:
+    """
+    Normalize detected technologies into a stack key.
+
+    Neutral technologies and those implied by another detected one are
+    dropped, so a Next.js app with React and TypeScript matches "Next.js".
+
+    Args:
+        technologies: Technology names from ``TECHNOLOGY_KEYWORDS``
+
+    Returns:
+        Sorted technologies joined with "+"
+    """
+    found = set(technologies) - _NEUTRAL_TECHNOLOGIES
+    for technology in list(found):
+        found -= _IMPLIED_TECHNOLOGIES.get(technology, frozenset())
+    return "+".join(sorted(found))
+
+
+def prompt_names_only_stack(prompt: str) -> bool:
+    """
+    Check whether a prompt asks for nothing beyond the detected stack.
+
+    Args:
+        prompt: User prompt
+
+    Returns:
+        True if every distinctive word of the prompt names a technology or
+        asks for recommendations in general
+    """
+    return not (extract_terms(prompt) - PROMPT_STOPWORDS - _STACK_PROMPT_WORDS)
+
+
+@lru_cache(maxsize=1)
+def load_stack_table() -> StackTable:
+    """
+    Load the precomputed table if it matches the current catalog.
+
+    Returns:
+        The table, empty if it is missing, unreadable or built for another
+        catalog version
+    """
+    path = settings.STACK_TABLE_PATH
+    try:
+        text = path.read_text(encoding="utf-8")
+        data = json.loads(text)
+    except (OSError, ValueError) as e:
+        logger.warning("Stack table %s not loaded: %s", path, e)
+        return StackTable()
+    if data.get("format") != TABLE_FORMAT:
+        logger.warning("Stack table %s has unsupported format", path)
+        return StackTable()
+
+    version = catalog_version()
+    if data.get("catalog_version") != version:
+        logger.warning(
+            "Ignoring stack table built for catalog %s, current catalog is %s",
+            data.get("catalog_version"),
+            version,
+        )
+        return StackTable()
+
+    stacks = {
+        fingerprint: [MCPServer.model_validate(server) for server in entry["servers"]]
+        for fingerprint, entry in data["stacks"].items()
+    }
+    logger.info("Loaded %d precomputed stacks from %s", len(stacks), path)
+    return StackTable(stacks, hashlib.sha256(text.encode("utf-8")).hexdigest()[:16])
+
+
+def stack_table_version() -> Optional[str]:
+    """
+    Version of the table that answers requests.
+
+    Returns:
+        Hash of the loaded table, or None when the table is disabled or empty
+    """
+    if not settings.STACK_TABLE_ENABLED:
+        return None
+    return load_stack_table().version
+
+
+def lookup_stack(context: Dict, mode: str) -> Optional[List[MCPServer]]:
+    """
+    Find precomputed recommendations for a request.
+
+    Only requests in "auto" mode without facet filters whose prompt names
+    nothing beyond the stack are looked up.
+
+    Args:
+        context: Project context dictionary after file analysis
+        mode: Discovery mode
+
+    Returns:
+        Shared, precomputed recommendations, or None
+    """
+    if not settings.STACK_TABLE_ENABLED or mode != "auto" or context.get("filters"):
+        return None
+    if not context.get("technologies"):
+        return None
+    if not prompt_names_only_stack(context.get("prompt", "")):
+        return None
+
+    servers = load_stack_table().stacks.get(stack_fingerprint(context["technologies"]))
+    _lookup_counts["hits" if servers is not None else "misses"] += 1
+    return servers
+
+
+def stack_table_stats() -> Dict[str, Any]:
+    """
+    Report the size of the loaded table and lookup counters.
+
+    Returns:
+        Whether the table is enabled, its entries, hits and misses
+    """
+    enabled = settings.STACK_TABLE_ENABLED
+    return {
+        "enabled": enabled,
+        "entries": len(load_stack_table().stacks) if enabled else 0,
+        **_lookup_counts,
+    }
+
+
+async def build_stack_table(
+    stacks: Sequence[Dict[str, Any]], timeout: float
+) -> Dict[str, Any]:
+    """
+    Generate recommendations for canonical stacks with the LLM.
+
+    Each stack is searched and selected like a request whose prompt only
+    names its technologies. Stacks the LLM cannot answer are left out.
+
+    Args:
+        stacks: Stacks with a "name", "technologies" and an optional "prompt"
+        timeout: Deadline in seconds for each stack
+
+    Returns:
+        Table to be stored as JSON at ``STACK_TABLE_PATH``
+
+    Raises:
+        ValueError: If a stack names an unknown technology
+    """
+    version = await get_cpu_executor().run(
+        "index build", catalog_version, stateful=True
+    )
+    default_title = default_recommendation().title
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    for stack in stacks:
+        technologies = sorted(stack["technologies"])
+        unknown = set(technologies) - set(TECHNOLOGY_KEYWORDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown technologies in stack {stack['name']}: {sorted(unknown)}"
+            )
+        context = context_from_inputs(
+            {
+                "prompt": stack.get("prompt") or f"I use {' and '.join(technologies)}",
+                "technologies": technologies,
+                "filters": {},
+            }
+        )
+        try:
+            results = await search_mcp_servers(context)
+            servers = await generate_server_recommendations(
+                context, results, Deadline(timeout)
+            )
+        except Exception as e:
+            logger.warning("Skipping stack %s: %s", stack["name"], e)
+            continue
+        if all(server.title == default_title for server in servers):
+            logger.warning("Skipping stack %s: no recommendations", stack["name"])
+            continue
+
+        entries[stack_fingerprint(technologies)] = {
+            "name": stack["name"],
+            "technologies": technologies,
+            "servers": [server.model_dump(mode="json") for server in servers],
+        }
+
+    return {
+        "format": TABLE_FORMAT,
+        "catalog_version": version,
+        "model": settings.LLM_MODEL,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "stacks": entries,
+    }
@@ -0,0 +1,295 @@
+"""
+Service for capturing discovery traffic and reading it back for cache warming.
+
+Each discovery request is reduced to scrubbed, normalized inputs: the prompt
+lowercased with whitespace collapsed and URLs, emails, long numbers and
+token-like strings replaced by placeholders, the technologies detected in the
+project (a fixed vocabulary), a hash of the project files, the facet filters
+and the mode. File contents and dependency names never leave the request, but
+the scrubbed prompt is kept as typed, so names a user writes into the prompt
+are captured. The same inputs key the result cache, so only requests with the
+same prompt and the same files share cached answers.
+
+Captured records are written as JSON lines to a size-rotated file by a
+background thread, like application logs, so capture never blocks a request.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcpsquared_discovery.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_URL = re.compile(r"\b(?:https?://|www\.)\S+", re.IGNORECASE)
+_EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+# Long identifiers containing digits: API keys, hashes, account ids
+_TOKEN = re.compile(r"\b(?=[\w-]*\d)[\w-]{20,}\b")
+_NUMBER = re.compile(r"\b\d{4,}\b")
+
+
+def scrub_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt and strip values that could identify a user.
+
+    Args:
+        prompt: User prompt
+
+    Returns:
+        Lowercased prompt with collapsed whitespace and placeholders for URLs,
+        emails, token-like strings and long numbers
+    """
+    text = _URL.sub("<url>", prompt)
+    text = _EMAIL.sub("<email>", text)
+    text = _TOKEN.sub("<token>", text)
+    text = _NUMBER.sub("<number>", text)
+    return " ".join(text.lower().split())
+
+
+def files_digest(files: Dict[str, str]) -> Optional[str]:
+    """
+    Hash project files by name and contents.
+
+    Dependencies are parsed from the files, so the hash covers them as well.
+
+    Args:
+        files: File contents by filename
+
+    Returns:
+        Short hex hash, or None when no files were sent
+    """
+    if not files:
+        return None
+    hashes = {
+        name: hashlib.sha256(content.encode("utf-8")).hexdigest()
+        for name, content in files.items()
+    }
+    canonical = json.dumps(hashes, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_inputs(context: Dict, mode: str) -> Dict[str, Any]:
+    """
+    Reduce a project context to the scrubbed inputs used for capture and caching.
+
+    Args:
+        context: Project context dictionary
+        mode: Discovery mode
+
+    Returns:
+        Normalized inputs
+    """
+    return {
+        "prompt": scrub_prompt(context.get("prompt", "")),
+        "technologies": sorted(context.get("technologies", [])),
+        "files": files_digest(context.get("files", {})),
+        "filters": {
+            facet: sorted(values)
+            for facet, values in sorted(context.get("filters", {}).items())
+        },
+        "mode": mode,
+    }
+
+
+def inputs_key(inputs: Dict[str, Any]) -> str:
+    """
+    Hash normalized inputs.
+
+    Args:
+        inputs: Normalized inputs
+
+    Returns:
+        Hex sha256 of the canonical JSON of the inputs
+    """
+    canonical = json.dumps(inputs, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def context_from_inputs(inputs: Dict[str, Any]) -> Dict:
+    """
+    Rebuild a project context from captured inputs, for replaying them.
+
+    Only inputs captured without files can be replayed faithfully, since file
+    contents are never captured.
+
+    Args:
+        inputs: Normalized inputs
+
+    Returns:
+        Project context dictionary without file contents
+    """
+    return {
+        "prompt": inputs["prompt"],
+        "files": {},
+        "file_artifacts": {},
+        "dependencies": [],
+        "technologies": list(inputs["technologies"]),
+        "file_token_count": 0,
+        "search_queries": [],
+        "filters": {facet: list(values) for facet, values in inputs["filters"].items()},
+    }
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """Render a record whose message is a dictionary as one JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, separators=(",", ":"), default=str)
+
+
+class TrafficRecorder:
+    """Write captured discovery requests, or other entries, to rotating JSON lines."""
+
+    def __init__(self, path: Path, max_bytes: int, backups: int, max_queue: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._listener: Optional[QueueListener] = None
+        self.recorded = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether records are being written."""
+        return self._listener is not None
+
+    def start(self) -> None:
+        """Open the capture file and start the writer thread."""
+        if self._listener is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            self.path,
+            maxBytes=self.max_bytes,
+            backupCount=self.backups,
+            encoding="utf-8",
+        )
+        handler.setFormatter(_JsonLineFormatter())
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+        logger.info("Recording to %s", self.path)
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def record(
+        self,
+        inputs: Dict[str, Any],
+        duration: float,
+        outcome: str,
+        source: Optional[str] = None,
+        servers: int = 0,
+    ) -> None:
+        """
+        Queue one captured request, dropping it if the writer falls behind.
+
+        Args:
+            inputs: Normalized inputs of the request
+            duration: Seconds the request took
+            outcome: "ok" or the name of the error that ended the request
+            source: Pipeline path that produced the answer
+            servers: Number of recommended servers
+        """
+        if self._listener is None:
+            return
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "key": inputs_key(inputs),
+            "inputs": inputs,
+            "duration_ms": round(duration * 1000, 1),
+            "outcome": outcome,
+            "source": source,
+            "servers": servers,
+        }
+        self.write(entry)
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """
+        Queue one JSON-serializable entry, dropping it if the writer falls behind.
+
+        Args:
+            entry: Entry to write as one line
+        """
+        if self._listener is None:
+            return
+        try:
+            self._queue.put_nowait(logging.makeLogRecord({"msg": entry}))
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report capture counters.
+
+        Returns:
+            Whether capture runs and how many records were queued or dropped
+        """
+        return {
+            "running": self.running,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+        }
+
+
+def read_frequent_inputs(path: Path, backups: int, limit: int) -> List[Dict]:
+    """
+    Find the most frequent successfully answered inputs in captured traffic.
+
+    Args:
+        path: Capture file; rotated files next to it are read as well
+        backups: Number of rotated files to read
+        limit: Number of inputs to return
+
+    Returns:
+        Normalized inputs, most frequent first
+    """
+    counts: Counter = Counter()
+    inputs_by_key: Dict[str, Dict] = {}
+    files = [path] + [path.with_name(f"{path.name}.{n}") for n in range(1, backups + 1)]
+    for file in files:
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as lines:
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("outcome") != "ok" or "inputs" not in entry:
+                    continue
+                key = entry.get("key") or inputs_key(entry["inputs"])
+                counts[key] += 1
+                inputs_by_key.setdefault(key, entry["inputs"])
+    return [inputs_by_key[key] for key, _ in counts.most_common(limit)]
+
+
+@lru_cache(maxsize=1)
+def get_traffic_recorder() -> TrafficRecorder:
+    """
+    Get the process-wide traffic recorder, created on first use.
+
+    Returns:
+        Shared traffic recorder
+    """
+    return TrafficRecorder(
+        settings.TRAFFIC_CAPTURE_PATH,
+        settings.TRAFFIC_CAPTURE_MAX_BYTES,
+        settings.TRAFFIC_CAPTURE_BACKUPS,
+        settings.TRAFFIC_CAPTURE_MAX_QUEUE,
+    )
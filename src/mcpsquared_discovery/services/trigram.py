@@ -0,0 +1,69 @@
+"""
+Character-trigram index for typo-tolerant matching of catalog keywords.
+
+Keywords are padded like PostgreSQL's pg_trgm (two leading spaces, one
+trailing) and split into trigrams. Postings are stored in ``array`` objects of
+unsigned ints rather than Python lists, so the index costs a few bytes per
+entry. Similarity is the number of shared trigrams divided by the size of the
+union, which scores "postgress" against "postgresql" at about 0.6.
+
+The index itself lives in ``offline.local_index`` so the exported bundle is
+searched with the same code; this module builds it over the loaded catalog.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+from mcpsquared_discovery.offline.local_index import TrigramIndex
+from mcpsquared_discovery.services.catalog import (
+    CatalogRecord,
+    extract_terms,
+    load_catalog,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def title_keywords(records: Iterable[CatalogRecord]) -> Dict[str, List[int]]:
+    """
+    Collect the distinctive words of catalog titles.
+
+    Titles are names like "PostgreSQL" or "Puppeteer", which is what users
+    misspell. Multi-word titles are also indexed with the words joined, so
+    "sequentialthinking" matches "Sequential Thinking". Description keywords
+    are left out: they tie a misspelled name to every server that mentions it,
+    which ranks the named server below them.
+
+    Args:
+        records: Catalog records
+
+    Returns:
+        Keyword to the catalog indices whose title contains it
+    """
+    keywords: Dict[str, List[int]] = {}
+    for record in records:
+        words = extract_terms(record.title) | extract_terms(
+            re.sub(r"[^a-z0-9]", "", record.title.lower())
+        )
+        for word in words:
+            keywords.setdefault(word, []).append(record.index)
+    return keywords
+
+
+@lru_cache(maxsize=1)
+def load_trigram_index() -> TrigramIndex:
+    """
+    Build the trigram index over catalog titles once per process.
+
+    Returns:
+        Trigram index
+    """
+    index = TrigramIndex(title_keywords(load_catalog()))
+    logger.info(
+        "Trigram index built with %d keywords and %d trigrams",
+        len(index.keywords),
+        index.trigram_count,
+    )
+    return index
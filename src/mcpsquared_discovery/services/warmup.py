@@ -0,0 +1,109 @@
+"""
+Service for warming the result cache from captured traffic.
+
+The most frequent inputs in the capture file are replayed through the
+discovery pipeline one at a time, so a new instance or a freshly reloaded
+catalog answers popular stacks from cache on the first request. Inputs
+captured with project files are skipped, since their contents were never
+captured and a replay without them would cache another answer under their key.
+Replays do not count as traffic and queue for the LLM under their own client
+id.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.deadline import Deadline
+from mcpsquared_discovery.core.executor import get_cpu_executor
+from mcpsquared_discovery.core.request_context import client_id_var
+from mcpsquared_discovery.services.discovery import run_pipeline
+from mcpsquared_discovery.services.result_cache import get_result_cache
+from mcpsquared_discovery.services.traffic import (
+    context_from_inputs,
+    inputs_key,
+    read_frequent_inputs,
+)
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CLIENT_ID = "warmup"
+
+_warmup_task: Optional[asyncio.Task] = None
+
+
+async def warm_result_cache(limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Replay the most frequent captured inputs into the result cache.
+
+    Args:
+        limit: Number of inputs to replay, defaults to WARMUP_TOP_CONTEXTS
+
+    Returns:
+        Counts of inputs replayed, already cached, skipped and failed
+    """
+    counts = {"replayed": 0, "cached": 0, "skipped": 0, "failed": 0}
+    if not settings.RESULT_CACHE_ENABLED:
+        return counts
+    client_id_var.set(WARMUP_CLIENT_ID)
+
+    frequent = await get_cpu_executor().run(
+        "warmup",
+        read_frequent_inputs,
+        settings.TRAFFIC_CAPTURE_PATH,
+        settings.TRAFFIC_CAPTURE_BACKUPS,
+        limit or settings.WARMUP_TOP_CONTEXTS,
+    )
+    for inputs in frequent:
+        key = inputs_key(inputs)
+        if inputs.get("mode") == "local":
+            # Local answers are cheap and never cached
+            continue
+        # Captures from before file hashes were recorded may have had files
+        if inputs.get("files", "unknown") is not None:
+            counts["skipped"] += 1
+            continue
+        if key in get_result_cache():
+            counts["cached"] += 1
+            continue
+        try:
+            result = await run_pipeline(
+                context_from_inputs(inputs),
+                Deadline(settings.WARMUP_TIMEOUT_SECONDS),
+                inputs["mode"],
+            )
+        except Exception as e:
+            logger.warning("Warmup replay failed: %s", e)
+            counts["failed"] += 1
+            continue
+        if result.source == "llm":
+            get_result_cache().put(key, result.servers)
+            counts["replayed"] += 1
+        else:
+            counts["failed"] += 1
+
+    logger.info("Result cache warmed from captured traffic: %s", counts)
+    return counts
+
+
+def schedule_warmup() -> bool:
+    """
+    Warm the result cache in the background, replacing a running warmup.
+
+    Returns:
+        True if a warmup was started
+    """
+    global _warmup_task
+
+    if not settings.RESULT_CACHE_ENABLED:
+        return False
+    cancel_warmup()
+    _warmup_task = asyncio.create_task(warm_result_cache())
+    return True
+
+
+def cancel_warmup() -> None:
+    """Stop a running warmup."""
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
@@ -0,0 +1,60 @@
+"""
+Build the precomputed recommendation table for canonical technology stacks.
+
+Runs every stack in the stacks file through local search and LLM selection
+and writes the answers, keyed by stack fingerprint and tagged with the
+catalog version, to ``STACK_TABLE_PATH``. Run it whenever the catalog data
+changes, for example as a step of the image build:
+
+    python -m mcpsquared_discovery.tools.build_stack_table
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.executor import get_cpu_executor
+from mcpsquared_discovery.services.catalog import DATA_DIR
+from mcpsquared_discovery.services.stack_table import build_stack_table
+
+DEFAULT_STACKS = DATA_DIR / "canonical_stacks.json"
+
+
+def main() -> int:
+    """Build the table from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--stacks", type=Path, default=DEFAULT_STACKS, help="Canonical stacks file"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=settings.STACK_TABLE_PATH, help="Table file"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Seconds allowed per stack"
+    )
+    args = parser.parse_args()
+
+    stacks = json.loads(args.stacks.read_text(encoding="utf-8"))["stacks"]
+    try:
+        table = asyncio.run(build_stack_table(stacks, args.timeout))
+    finally:
+        get_cpu_executor().shutdown()
+
+    for fingerprint, entry in table["stacks"].items():
+        titles = ", ".join(server["title"] for server in entry["servers"])
+        print(f"{entry['name']} [{fingerprint}]: {titles}")
+    missing = len(stacks) - len(table["stacks"])
+    if missing:
+        print(f"FAIL: {missing} of {len(stacks)} stacks got no recommendations")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(table, indent=1), encoding="utf-8")
+    print(f"Wrote {len(table['stacks'])} stacks for catalog {table['catalog_version']}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
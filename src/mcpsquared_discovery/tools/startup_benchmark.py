@@ -0,0 +1,115 @@
+"""
+Startup benchmark reporting import time per module.
+
+Imports the application in a fresh interpreter with ``-X importtime`` and
+reports the total import time and the slowest modules. Exits non-zero when the
+import exceeds a time budget or loads modules that must stay lazy, so it can
+be run in CI to catch cold-start regressions:
+
+    python -m mcpsquared_discovery.tools.startup_benchmark --budget-ms 1500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+DEFAULT_TARGET = "mcpsquared_discovery.main"
+
+# Heavy LLM tooling that should only load on first use or in the lifespan hook
+LAZY_MODULES = ("langchain", "langchain_core", "langchain_community", "litellm")
+
+
+def measure_imports(target: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    Import a module in a subprocess and collect per-module import times.
+
+    Args:
+        target: Dotted module name to import
+
+    Returns:
+        Wall time in seconds and a mapping of module name to
+        (self, cumulative) import time in microseconds
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    wall_time = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr}")
+
+    timings: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall_time, timings
+
+
+def report(
+    target: str, wall_time: float, timings: Dict[str, Tuple[int, int]], top: int
+) -> List[str]:
+    """
+    Print the import report.
+
+    Args:
+        target: Module that was imported
+        wall_time: Subprocess wall time in seconds
+        timings: Per-module import times
+        top: Number of slowest modules to list
+
+    Returns:
+        Top-level packages from LAZY_MODULES that were imported eagerly
+    """
+    total_ms = timings.get(target, (0, 0))[1] / 1000
+    print(f"Import of {target}: {total_ms:.1f} ms ({wall_time * 1000:.0f} ms wall)")
+
+    print(f"\nSlowest {top} modules by cumulative time:")
+    ranked = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in ranked[:top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {self_us / 1000:8.1f} ms self  {name}")
+
+    print("\nApplication modules:")
+    own = [item for item in ranked if item[0].startswith("mcpsquared_discovery")]
+    for name, (self_us, cumulative_us) in own:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {self_us / 1000:8.1f} ms self  {name}")
+
+    return [name for name in LAZY_MODULES if name in timings]
+
+
+def main() -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument(
+        "--budget-ms", type=float, help="Fail if the import takes longer than this"
+    )
+    args = parser.parse_args()
+
+    wall_time, timings = measure_imports(args.target)
+    eager = report(args.target, wall_time, timings, args.top)
+
+    failed = False
+    if eager:
+        print(f"\nFAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    total_ms = timings.get(args.target, (0, 0))[1] / 1000
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nFAIL: {total_ms:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
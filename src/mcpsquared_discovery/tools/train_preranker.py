@@ -0,0 +1,149 @@
+"""
+Train the candidate pre-ranker from logged LLM selections.
+
+Reads the selection log written with ``SELECTION_LOG_ENABLED`` (and its
+rotated files), fits a logistic regression model, reports log loss, accuracy,
+precision and recall on a held-out share of the requests, and writes the model
+as JSON for ``PRERANKER_MODEL_PATH``:
+
+    python -m mcpsquared_discovery.tools.train_preranker --output preranker.json
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.offline.preranker import (
+    Example,
+    LogisticModel,
+    examples_from_event,
+)
+
+
+def read_selection_events(path: Path, backups: int) -> Iterator[Dict]:
+    """
+    Read logged selections, skipping malformed lines.
+
+    Args:
+        path: Selection log; rotated files next to it are read as well
+        backups: Number of rotated files to read
+
+    Yields:
+        Selection events
+    """
+    files = [path] + [path.with_name(f"{path.name}.{n}") for n in range(1, backups + 1)]
+    for file in files:
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as lines:
+            for line in lines:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "context" in event and event.get("candidates"):
+                    yield event
+
+
+def split_examples(
+    events: List[Dict], holdout: float, seed: int
+) -> Tuple[List[Example], List[Example]]:
+    """
+    Split events into training and validation examples.
+
+    Whole requests are held out, so validation measures how the model ranks
+    candidate sets it has not seen.
+
+    Args:
+        events: Selection events
+        holdout: Share of events used for validation
+        seed: Seed for the split
+
+    Returns:
+        Training and validation examples
+    """
+    shuffled = list(events)
+    random.Random(seed).shuffle(shuffled)
+    cut = int(len(shuffled) * holdout)
+    validation = [ex for event in shuffled[:cut] for ex in examples_from_event(event)]
+    training = [ex for event in shuffled[cut:] for ex in examples_from_event(event)]
+    return training, validation
+
+
+def print_metrics(name: str, metrics: Dict[str, float]) -> None:
+    """Print evaluation metrics on one line."""
+    print(
+        f"{name:>10}: {int(metrics['examples'])} examples, "
+        f"log loss {metrics['log_loss']:.4f}, accuracy {metrics['accuracy']:.3f}, "
+        f"precision {metrics['precision']:.3f}, recall {metrics['recall']:.3f}"
+    )
+
+
+def main() -> int:
+    """Train the pre-ranker from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--log",
+        type=Path,
+        default=settings.SELECTION_LOG_PATH,
+        help="Selection log to train from",
+    )
+    parser.add_argument(
+        "--backups",
+        type=int,
+        default=settings.TRAFFIC_CAPTURE_BACKUPS,
+        help="Rotated log files to read",
+    )
+    parser.add_argument("--output", type=Path, required=True, help="Model file")
+    parser.add_argument("--epochs", type=int, default=10, help="Passes over the data")
+    parser.add_argument(
+        "--learning-rate", type=float, default=0.1, help="Initial step size"
+    )
+    parser.add_argument("--l2", type=float, default=1e-4, help="L2 regularization")
+    parser.add_argument(
+        "--holdout", type=float, default=0.2, help="Share of requests for validation"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for split and SGD")
+    parser.add_argument(
+        "--min-events", type=int, default=50, help="Fail with fewer logged requests"
+    )
+    args = parser.parse_args()
+
+    events = list(read_selection_events(args.log, args.backups))
+    if len(events) < args.min_events:
+        print(f"FAIL: {len(events)} logged requests, need {args.min_events}")
+        return 1
+
+    training, validation = split_examples(events, args.holdout, args.seed)
+    model = LogisticModel()
+    model.fit(training, args.epochs, args.learning_rate, args.l2, args.seed)
+
+    print(f"Trained on {len(events)} logged requests")
+    metrics = {"training": model.evaluate(training)}
+    if validation:
+        metrics["validation"] = model.evaluate(validation)
+    for name, values in metrics.items():
+        print_metrics(name, values)
+
+    model.metadata = {
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "events": len(events),
+        "epochs": args.epochs,
+        "learning_rate": args.learning_rate,
+        "l2": args.l2,
+        "metrics": metrics,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    data = model.to_dict()
+    args.output.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    print(f"Wrote {len(data['weights'])} weights to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
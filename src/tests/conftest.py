@@ -0,0 +1,19 @@
+"""
+Shared test setup.
+
+Settings require API keys; placeholders let modules load without a ``.env``.
+"""
+
+import os
+
+for key in (
+    "OPENROUTER_API_KEY",
+    "SMITHERY_API_KEY",
+    "ANDISEARCH_API_KEY",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "LANGCHAIN_API_KEY",
+):
+    os.environ.setdefault(key, "test")
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("LLM_PRELOAD_ON_STARTUP", "false")
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from mcpsquared_discovery.core.request_context import client_id_var
+from mcpsquared_discovery.services.batching import MicroBatcher
+
+
+def run_batch(run, items, window_seconds=0.01, max_batch=8):
+    batches = []
+
+    async def recorded(batch):
+        batches.append(list(batch))
+        return await run(batch)
+
+    async def main():
+        batcher = MicroBatcher("test", recorded, window_seconds, max_batch)
+        client_id_var.set("caller")
+        answers = await asyncio.gather(
+            *(batcher.submit(item) for item in items), return_exceptions=True
+        )
+        return answers, batcher.stats()
+
+    answers, stats = asyncio.run(main())
+    return answers, stats, batches
+
+
+def test_each_caller_gets_its_own_answer():
+    async def double(batch):
+        return [item * 2 for item in batch]
+
+    answers, stats, batches = run_batch(double, [1, 2, 3])
+    assert answers == [2, 4, 6]
+    assert batches == [[1, 2, 3]]
+    assert stats["batches"] == 1 and stats["items"] == 3
+
+
+def test_full_batches_flush_without_waiting():
+    async def identity(batch):
+        return list(batch)
+
+    answers, _, batches = run_batch(identity, [1, 2, 3, 4], 60, max_batch=2)
+    assert answers == [1, 2, 3, 4]
+    assert batches == [[1, 2], [3, 4]]
+
+
+def test_unanswered_and_mismatched_batches_give_none():
+    async def partial(batch):
+        return [None if item == 2 else item for item in batch]
+
+    answers, stats, _ = run_batch(partial, [1, 2, 3])
+    assert answers == [1, None, 3]
+    assert stats["unanswered_items"] == 1
+
+    async def short(batch):
+        return batch[:1]
+
+    answers, _, _ = run_batch(short, [1, 2])
+    assert answers == [None, None]
+
+
+def test_batch_errors_reach_every_caller():
+    async def fail(batch):
+        raise RuntimeError("upstream down")
+
+    answers, _, _ = run_batch(fail, [1, 2])
+    assert all(isinstance(answer, RuntimeError) for answer in answers)
+
+
+@pytest.mark.parametrize("max_batch", [1, 8])
+def test_batch_runs_under_its_own_client_id(max_batch):
+    async def client_ids(batch):
+        return [client_id_var.get() for _ in batch]
+
+    answers, _, _ = run_batch(client_ids, [1, 2], max_batch=max_batch)
+    assert answers == ["batch:test", "batch:test"]
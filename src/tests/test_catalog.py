@@ -0,0 +1,113 @@
+import dataclasses
+
+import pytest
+
+from mcpsquared_discovery.services.catalog import (
+    CATEGORY_COMMUNITY,
+    CATEGORY_CURATED,
+    CATEGORY_OFFICIAL,
+    CATEGORY_REFERENCE,
+    MISSING_CLI_COMMAND,
+    REFERENCE_BASE_URL,
+    RESOURCES_MD,
+    SERVERS_JSON,
+    build_catalog,
+    load_catalog,
+    make_record,
+    parse_mcp_resources,
+)
+
+RESOURCES = """
+## Reference Servers
+- **[Fetch](src/fetch)** - Web content fetching
+
+## Official Integrations
+- <img src="logo.png"> **[Stripe](https://github.com/stripe/agent-toolkit)** - Payments
+- **[Neon](https://neon.tech/mcp)** - Serverless Postgres
+
+## Frameworks
+- **[FastMCP](https://github.com/jlowin/fastmcp)** - Build servers in Python
+
+## Community Servers
+- **[Slack](https://github.com/a/slack-mcp)** (by alice) - Slack workspaces
+- **[Slack](https://github.com/b/slack-mcp)** (by bob) - Slack messages
+"""
+
+
+def test_only_server_sections_are_parsed():
+    records = parse_mcp_resources(RESOURCES)
+    assert [(r["title"], r["category"]) for r in records] == [
+        ("Fetch", CATEGORY_REFERENCE),
+        ("Stripe", CATEGORY_OFFICIAL),
+        ("Neon", CATEGORY_OFFICIAL),
+        ("Slack (by alice)", CATEGORY_COMMUNITY),
+        ("Slack (by bob)", CATEGORY_COMMUNITY),
+    ]
+    fetch, stripe, neon = records[:3]
+    assert fetch["github_url"] == REFERENCE_BASE_URL + "src/fetch"
+    assert stripe["description"] == "Payments"
+    assert neon["github_url"] == "" and neon["project_url"] == "https://neon.tech/mcp"
+
+
+def curated(title, github_url):
+    return {"title": title, "github_url": github_url, "cli_command": "npx x"}
+
+
+def test_curated_records_absorb_their_markdown_entries():
+    servers = [
+        curated("Stripe MCP Server", "https://github.com/Stripe/agent-toolkit.git"),
+        curated("Neon", ""),
+        curated("Sentry", "https://github.com/getsentry/sentry-mcp"),
+    ]
+    catalog = build_catalog(servers, parse_mcp_resources(RESOURCES))
+
+    titles = [record["title"] for record in catalog]
+    assert titles == [
+        "Stripe MCP Server",
+        "Neon",
+        "Sentry",
+        "Fetch",
+        "Slack (by alice)",
+        "Slack (by bob)",
+    ]
+    stripe, neon, sentry = catalog[:3]
+    # Matched by GitHub URL and by normalized title
+    assert stripe["category"] == neon["category"] == CATEGORY_OFFICIAL
+    assert stripe["provenance"] == [SERVERS_JSON, RESOURCES_MD]
+    assert stripe["cli_command"] == "npx x"
+    assert sentry["category"] == CATEGORY_CURATED
+    assert sentry["provenance"] == [SERVERS_JSON]
+
+
+def test_markdown_duplicates_are_dropped_by_url():
+    entries = parse_mcp_resources(RESOURCES)
+    repeated = parse_mcp_resources(RESOURCES.replace("(by alice)", "(by carol)"))
+    catalog = build_catalog([], entries + repeated)
+    # Markdown entries without a GitHub URL are only matched to curated records
+    assert [record["title"] for record in catalog] == [
+        record["title"] for record in entries
+    ] + ["Neon"]
+    assert all(record["provenance"] == [RESOURCES_MD] for record in catalog)
+
+
+def test_records_are_frozen_and_slotted():
+    record = load_catalog()[0]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        record.title = "changed"
+    assert not hasattr(record, "__dict__")
+    assert all(record.index == i for i, record in enumerate(load_catalog()))
+
+
+def test_make_record_fills_defaults():
+    record = make_record(7, {"title": "Fetch", "github_url": "https://github.com/a/b"})
+    assert record.index == 7
+    assert record.category == CATEGORY_CURATED
+    assert record.sources[0].source_url == "https://github.com/a/b"
+    server = record.to_server()
+    assert server.cli_command == MISSING_CLI_COMMAND
+    assert server.title == "Fetch"
+
+
+def test_make_record_rejects_entries_without_a_title():
+    with pytest.raises(KeyError):
+        make_record(0, {"github_url": "https://github.com/a/b"})
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from mcpsquared_discovery.services import circuit_breaker
+from mcpsquared_discovery.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=100.0)
+    monkeypatch.setattr(
+        circuit_breaker, "time", SimpleNamespace(monotonic=lambda: now.value)
+    )
+    return now
+
+
+def tripped_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, slow_call_seconds=5)
+    for _ in range(3):
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, slow_call_seconds=5)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, slow_call_seconds=5)
+    breaker.record_success(5.0)
+    breaker.record_success(7.5)
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = tripped_breaker()
+    clock.value += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_successful_probe_closes(clock):
+    breaker = tripped_breaker()
+    clock.value += 30
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats() == {"state": CLOSED, "consecutive_failures": 0}
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = tripped_breaker()
+    clock.value += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.value += 29
+    assert not breaker.allow_request()
+
+
+def test_lost_probe_is_replaced(clock):
+    breaker = tripped_breaker()
+    clock.value += 30
+    assert breaker.allow_request()
+    clock.value += 30
+    assert breaker.allow_request()
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.core.deadline import Deadline, DeadlineExceeded
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, settings.REQUEST_TIMEOUT_SECONDS),
+        ("", settings.REQUEST_TIMEOUT_SECONDS),
+        ("2.5", 2.5),
+        ("-3", 0.0),
+        ("1e9", settings.REQUEST_TIMEOUT_MAX_SECONDS),
+        ("soon", settings.REQUEST_TIMEOUT_SECONDS),
+        ("nan", settings.REQUEST_TIMEOUT_SECONDS),
+        ("inf", settings.REQUEST_TIMEOUT_SECONDS),
+        ("-inf", settings.REQUEST_TIMEOUT_SECONDS),
+    ],
+)
+def test_from_header(value, expected):
+    assert Deadline.from_header(value).timeout == expected
+
+
+def test_timeout_for_caps_the_stage():
+    deadline = Deadline(10)
+    assert deadline.timeout_for(1.0) == 1.0
+    assert 9 < deadline.timeout_for() <= 10
+
+
+def test_run_raises_when_the_stage_is_too_slow():
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(DeadlineExceeded) as error:
+        asyncio.run(Deadline(0.01).run(slow(), "selection"))
+    assert error.value.stage == "selection"
+
+
+def test_expired_deadline_does_not_start_the_stage():
+    deadline = Deadline(0)
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        deadline.check("search")
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(deadline.run(asyncio.sleep(0), "search"))
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from mcpsquared_discovery.core.config import Settings, get_settings
+from mcpsquared_discovery.core.deadline import Deadline, DeadlineExceeded
+from mcpsquared_discovery.services import discovery, llm
+from mcpsquared_discovery.services.catalog import load_catalog
+from mcpsquared_discovery.services.circuit_breaker import CircuitBreaker
+
+
+def run_with_query_generation(monkeypatch, query_error, selection_delay):
+    async def generate_search_queries(prompt, context, deadline):
+        await asyncio.sleep(0.02)
+        raise query_error
+
+    async def generate_server_recommendations(context, results, deadline):
+        await asyncio.sleep(selection_delay)
+        return ["speculative"]
+
+    monkeypatch.setattr(get_settings(), "LLM_SPECULATIVE_SELECTION", True)
+    monkeypatch.setattr(discovery, "generate_search_queries", generate_search_queries)
+    monkeypatch.setattr(
+        discovery, "generate_server_recommendations", generate_server_recommendations
+    )
+    return asyncio.run(
+        discovery.recommend_with_query_generation(
+            {"prompt": "postgres"}, [], Deadline(5)
+        )
+    )
+
+
+def test_finished_speculation_survives_a_query_timeout(monkeypatch):
+    result = run_with_query_generation(monkeypatch, DeadlineExceeded("queries"), 0)
+    assert result == ["speculative"]
+
+
+def test_unfinished_speculation_does_not_hide_a_query_timeout(monkeypatch):
+    with pytest.raises(DeadlineExceeded):
+        run_with_query_generation(monkeypatch, DeadlineExceeded("queries"), 1)
+
+
+def run_degraded(monkeypatch, mode="auto", selection_error=None):
+    async def search_mcp_servers(context):
+        return list(load_catalog()[:3])
+
+    async def generate_server_recommendations(context, results, deadline):
+        if selection_error is None:
+            raise AssertionError("the LLM should not be called")
+        raise selection_error
+
+    monkeypatch.setattr(discovery, "search_mcp_servers", search_mcp_servers)
+    monkeypatch.setattr(
+        discovery, "generate_server_recommendations", generate_server_recommendations
+    )
+    monkeypatch.setattr(get_settings(), "LLM_QUERY_GENERATION", False)
+    result = asyncio.run(discovery.run_pipeline({"prompt": "db"}, Deadline(5), mode))
+    assert [server.title for server in result.servers] == [
+        record.title for record in load_catalog()[:3]
+    ]
+    return result.source
+
+
+def test_local_mode_skips_the_llm(monkeypatch):
+    assert run_degraded(monkeypatch, mode="local") == "local"
+
+
+def test_open_breaker_skips_the_llm(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60, slow_call_seconds=5)
+    breaker.record_failure()
+    monkeypatch.setattr(llm, "get_llm_breaker", lambda: breaker)
+    assert run_degraded(monkeypatch) == "local"
+
+
+def test_busy_limiter_skips_the_llm(monkeypatch):
+    monkeypatch.setattr(get_settings(), "LLM_MAX_IN_FLIGHT", 0)
+    assert run_degraded(monkeypatch) == "local"
+
+
+def test_llm_errors_return_local_results(monkeypatch):
+    monkeypatch.setattr(discovery, "llm_available", lambda: True)
+    assert run_degraded(monkeypatch, selection_error=RuntimeError("429")) == "local"
+
+
+def test_in_flight_limit_must_be_reachable():
+    with pytest.raises(ValueError):
+        Settings(LLM_MAX_CONCURRENT=4, LLM_QUEUE_MAX_SIZE=8, LLM_MAX_IN_FLIGHT=13)
+
+
+def test_answer_version_is_computed_once(monkeypatch):
+    discovery.answer_version.cache_clear()
+    version = discovery.answer_version()
+    monkeypatch.setattr(get_settings(), "LLM_MODEL", "another/model")
+    assert discovery.answer_version() == version
+    discovery.answer_version.cache_clear()
+    assert discovery.answer_version() != version
+    discovery.answer_version.cache_clear()
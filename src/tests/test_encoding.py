@@ -0,0 +1,90 @@
+import pytest
+
+from mcpsquared_discovery.api import encoding
+from mcpsquared_discovery.core.config import get_settings
+from mcpsquared_discovery.services import llm
+from mcpsquared_discovery.services.index_bundle import (
+    build_bundle,
+    catalog_version,
+    reload_catalog,
+)
+
+
+def test_parse_qvalues():
+    assert encoding.parse_qvalues("GZIP;q=0.8, br, , x;Q=0.2, y;q=soon") == {
+        "gzip": 0.8,
+        "br": 1.0,
+        "x": 0.2,
+        "y": 0.0,
+    }
+
+
+@pytest.mark.parametrize(
+    "header, with_brotli, expected",
+    [
+        ("gzip, br", True, "br"),
+        ("gzip, br;q=0.5", True, "gzip"),
+        ("*;q=0.3", True, "br"),
+        ("br;q=0, *", True, "gzip"),
+        ("gzip;q=0", True, None),
+        ("identity", True, None),
+        ("", True, None),
+        ("br", False, None),
+        ("br, gzip;q=0.1", False, "gzip"),
+    ],
+)
+def test_negotiate_encoding(monkeypatch, header, with_brotli, expected):
+    monkeypatch.setattr(encoding, "brotli", object() if with_brotli else None)
+    assert encoding.negotiate_encoding(header) == expected
+
+
+def test_compression_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(get_settings(), "RESPONSE_COMPRESSION", False)
+    assert encoding.negotiate_encoding("gzip") is None
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, encoding.JSON_MEDIA_TYPE),
+        ("application/msgpack", encoding.MSGPACK_MEDIA_TYPE),
+        ("application/json, application/msgpack;q=0.5", encoding.JSON_MEDIA_TYPE),
+        ("*/*, application/x-msgpack", encoding.MSGPACK_MEDIA_TYPE),
+        ("application/msgpack;q=0", encoding.JSON_MEDIA_TYPE),
+    ],
+)
+def test_negotiate_media_type(monkeypatch, header, expected):
+    monkeypatch.setattr(encoding, "msgpack", object())
+    assert encoding.negotiate_media_type(header) == expected
+
+
+def test_msgpack_needs_the_package(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", None)
+    media_type = encoding.negotiate_media_type("application/msgpack")
+    assert media_type == encoding.JSON_MEDIA_TYPE
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"old", "abc"', True),
+        ("*", True),
+        ('"old"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert encoding.etag_matches(header, '"abc"') is expected
+
+
+def test_catalog_version_matches_the_bundle():
+    assert build_bundle()["version"] == catalog_version()
+
+
+def test_reload_drops_the_rendered_system_prompts():
+    llm.render_static_prefix("{mcp_resources}")
+    reload_catalog()
+    assert llm.load_mcp_resources.cache_info().currsize == 0
+    assert llm.render_static_prefix.cache_info().currsize == 0
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mcpsquared_discovery.api import routes
+from mcpsquared_discovery.core.executor import (
+    KIND_PROCESS,
+    KIND_THREAD,
+    CPUExecutor,
+    ExecutorSaturated,
+)
+
+
+def fail():
+    raise RuntimeError("boom")
+
+
+async def wait_for_release(executor):
+    for _ in range(100):
+        if executor.stats()["pending"] == 0:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_saturated_pool_rejects_new_tasks():
+    async def scenario():
+        executor = CPUExecutor(KIND_THREAD, max_workers=1, max_queue=1)
+        release = threading.Event()
+        running = [asyncio.create_task(executor.run("parse", release.wait))]
+        running.append(asyncio.create_task(executor.run("parse", release.wait)))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturated) as error:
+            await executor.run("search", os.getpid)
+        release.set()
+        await asyncio.gather(*running)
+        executor.shutdown()
+        return executor.stats(), error.value
+
+    stats, error = asyncio.run(scenario())
+    assert error.pending == 2 and error.task == "search"
+    assert stats["tasks"]["search"]["rejected"] == 1
+    assert stats["tasks"]["parse"]["completed"] == 2
+    assert stats["pending"] == 0
+
+
+def test_failed_task_frees_its_slot():
+    async def scenario():
+        executor = CPUExecutor(KIND_THREAD, max_workers=1, max_queue=0)
+        with pytest.raises(RuntimeError):
+            await executor.run("parse", fail)
+        await wait_for_release(executor)
+        pid = await executor.run("parse", os.getpid)
+        executor.shutdown()
+        return executor.stats(), pid
+
+    stats, pid = asyncio.run(scenario())
+    assert pid == os.getpid()
+    assert stats["tasks"]["parse"]["failed"] == 1
+    assert stats["tasks"]["parse"]["completed"] == 1
+
+
+def test_cancelled_task_frees_its_slot_when_the_worker_finishes():
+    async def scenario():
+        executor = CPUExecutor(KIND_THREAD, max_workers=1, max_queue=0)
+        release = threading.Event()
+        task = asyncio.create_task(executor.run("parse", release.wait))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker still runs the task, so its slot is still taken
+        assert executor.stats()["pending"] == 1
+        release.set()
+        await wait_for_release(executor)
+        executor.shutdown()
+        return executor.stats()
+
+    assert asyncio.run(scenario())["pending"] == 0
+
+
+def test_stateful_tasks_run_on_threads_of_a_process_pool():
+    async def scenario():
+        executor = CPUExecutor(KIND_PROCESS, max_workers=1, max_queue=0)
+        pid = await executor.run("index build", os.getpid, stateful=True)
+        executor.shutdown()
+        return pid
+
+    assert asyncio.run(scenario()) == os.getpid()
+
+
+def test_saturated_discovery_returns_503(monkeypatch):
+    async def run_discovery(context, deadline, mode):
+        raise ExecutorSaturated("search", 8)
+
+    monkeypatch.setattr(routes, "run_discovery", run_discovery)
+    app = FastAPI()
+    app.include_router(routes.router)
+    response = TestClient(app).post("/discover-json", json={"prompt": "postgres"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
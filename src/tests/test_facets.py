@@ -0,0 +1,63 @@
+import pytest
+
+from mcpsquared_discovery.offline.local_index import FacetBitsets, iter_bits
+from mcpsquared_discovery.services.catalog import INSTALL_UNKNOWN, load_catalog
+from mcpsquared_discovery.services.facets import load_facet_index
+
+
+def test_unknown_install_method_is_not_advertised():
+    index = load_facet_index()
+    assert INSTALL_UNKNOWN not in index.counts()["install_method"]
+    assert index.matching({"install_method": [INSTALL_UNKNOWN]}) == 0
+
+
+def test_install_method_filter_matches_records():
+    index = load_facet_index()
+    mask = index.matching({"install_method": ["npx"]})
+    npx = [record.index for record in load_catalog() if record.install_method == "npx"]
+    assert npx and mask == sum(1 << i for i in npx)
+
+
+BITSETS = FacetBitsets(
+    {
+        "category": {"official": 0b0011, "community": 0b1100},
+        "language": {"python": 0b0101, "typescript": 0b1010},
+    },
+    size=4,
+)
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        (None, None),
+        ({"category": [], "language": []}, None),
+        ({"category": ["official"]}, 0b0011),
+        ({"category": ["official", "community"]}, 0b1111),
+        ({"category": ["official"], "language": ["Python"]}, 0b0001),
+        ({"category": ["community"], "language": ["python", "typescript"]}, 0b1100),
+        ({"category": ["unlisted"]}, 0),
+        ({"license": ["mit"]}, 0),
+    ],
+)
+def test_matching_combines_filters(filters, expected):
+    assert BITSETS.matching(filters) == expected
+
+
+def test_counts_within_a_mask():
+    counts = BITSETS.counts(BITSETS.matching({"language": ["python"]}))
+    assert counts == {
+        "category": {"community": 1, "official": 1},
+        "language": {"python": 2, "typescript": 0},
+    }
+
+
+def test_combined_filters_match_catalog_records():
+    index = load_facet_index()
+    mask = index.matching({"install_method": ["npx", "uvx"], "language": ["python"]})
+    expected = [
+        record.index
+        for record in load_catalog()
+        if record.install_method in ("npx", "uvx") and "python" in record.languages
+    ]
+    assert expected and list(iter_bits(mask)) == expected
@@ -0,0 +1,86 @@
+import pytest
+
+from mcpsquared_discovery.services.file_cache import (
+    FileArtifactCache,
+    UnknownFileReferenceError,
+    build_file_artifacts,
+    compute_content_hash,
+    get_file_cache,
+    get_file_artifacts,
+    parse_dependencies,
+)
+
+REQUIREMENTS = "fastapi==0.115\npsycopg2>=2.9\n# comment\n"
+
+
+def test_parse_dependencies_by_filename():
+    assert parse_dependencies("requirements.txt", REQUIREMENTS) == [
+        "fastapi",
+        "psycopg2",
+    ]
+    assert parse_dependencies("notes.txt", REQUIREMENTS) == []
+    assert parse_dependencies("package.json", '{"dependencies": {"pg": "8"}}') == [
+        "pg"
+    ]
+    toml = '[project]\ndependencies = ["boto3>=1"]\n'
+    assert parse_dependencies("package_manager.json", toml) == ["boto3"]
+
+
+def test_same_contents_under_another_name_are_parsed_again():
+    notes = get_file_artifacts("notes.txt", REQUIREMENTS)
+    requirements = get_file_artifacts("requirements.txt", REQUIREMENTS)
+    assert notes.dependencies == []
+    assert requirements.dependencies == ["fastapi", "psycopg2"]
+
+
+def test_reference_resolves_under_a_new_name():
+    content = "flask\n"
+    reference = compute_content_hash(content)
+    get_file_artifacts("notes-flask.txt", content)
+    artifacts = get_file_artifacts("requirements.txt", reference)
+    assert artifacts.dependencies == ["flask"]
+
+
+def test_unknown_reference_raises():
+    reference = compute_content_hash("never uploaded")
+    with pytest.raises(UnknownFileReferenceError) as error:
+        get_file_artifacts("a.txt", reference)
+    assert error.value.missing == {"a.txt": reference}
+    assert get_file_cache().find_content(reference) is None
+
+
+def test_cache_is_bounded_by_size():
+    cache = FileArtifactCache(max_bytes=100)
+    for i in range(5):
+        content = f"{i}" * 30
+        cache.put(f"text:{i}", build_file_artifacts("a.txt", content, str(i)))
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert cache.get("text:4") is not None
+    assert cache.get("text:0") is None
+
+
+def test_snapshot_is_a_copy():
+    cache = FileArtifactCache(max_bytes=1000)
+    cache.put("text:a", build_file_artifacts("a.txt", "a", "a"))
+    snapshot = cache.snapshot()
+    cache.put("text:b", build_file_artifacts("b.txt", "b", "b"))
+    assert [artifacts.content for artifacts in snapshot] == ["a"]
+
+
+def test_size_counts_encoded_bytes():
+    cache = FileArtifactCache(max_bytes=1000)
+    cache.put("text:a", build_file_artifacts("a.txt", "é" * 10, "a"))
+    assert cache.stats()["bytes"] == 40
+
+
+def test_evicted_contents_are_no_longer_found():
+    cache = FileArtifactCache(max_bytes=100)
+    first = build_file_artifacts("a.txt", "a" * 30, compute_content_hash("a" * 30))
+    cache.put("text:a", first)
+    cache.put("requirements:a", first)
+    assert cache.find_content(first.content_hash) == first.content
+    for i in range(3):
+        content = f"{i}" * 30
+        cache.put(f"text:{i}", build_file_artifacts("b.txt", content, str(i)))
+    assert cache.find_content(first.content_hash) is None
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from mcpsquared_discovery.core.config import get_settings
+from mcpsquared_discovery.services import llm
+from mcpsquared_discovery.services.llm_routing import RouteRecorder
+from mcpsquared_discovery.services.rate_limiter import LLMAdmissionController
+
+STAGE = "result selection"
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = RouteRecorder()
+    monkeypatch.setattr(recorder, "hedge_delay", lambda stage, model: 0.02)
+    monkeypatch.setattr(llm, "route_recorder", recorder)
+    monkeypatch.setattr(get_settings(), "LLM_HEDGE_MODEL", "hedge")
+    return recorder
+
+
+def fake_calls(monkeypatch, answers):
+    """Answer each model after a delay; record in-flight counts seen by the hedge."""
+    seen = {"cancelled": [], "in_flight": []}
+
+    async def call_model(messages, stage, model):
+        if model == "hedge":
+            seen["in_flight"].append(llm.llm_in_flight())
+        delay, answer = answers[model]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            seen["cancelled"].append(model)
+            raise
+        return answer
+
+    monkeypatch.setattr(llm, "call_model", call_model)
+    return seen
+
+
+def hedged(model="primary"):
+    async def main():
+        result = await llm.hedged_call([], STAGE, model)
+        # Let cancelled calls run their handlers
+        await asyncio.sleep(0)
+        return result
+
+    return asyncio.run(main())
+
+
+def test_fast_primary_is_not_hedged(monkeypatch, recorder):
+    fake_calls(monkeypatch, {"primary": (0, "first"), "hedge": (0, "second")})
+    assert hedged() == "first"
+    assert recorder.stats() == {}
+
+
+def test_fast_hedge_wins_and_primary_is_cancelled(monkeypatch, recorder):
+    seen = fake_calls(monkeypatch, {"primary": (5, "slow"), "hedge": (0, "fast")})
+    assert hedged() == "fast"
+    counters = recorder.stats()[STAGE]["primary"]
+    assert counters["hedges"] == 1 and counters["hedge_wins"] == 1
+    assert seen["cancelled"] == ["primary"]
+    assert seen["in_flight"] == [1]
+    assert llm.llm_in_flight() == 0
+
+
+def test_empty_hedge_answer_does_not_win(monkeypatch, recorder):
+    fake_calls(monkeypatch, {"primary": (0.05, "late"), "hedge": (0, " ")})
+    assert hedged() == "late"
+    assert recorder.stats()[STAGE]["primary"]["hedge_wins"] == 0
+
+
+def test_no_hedge_without_capacity(monkeypatch, recorder):
+    full = LLMAdmissionController(0, 1.0, 1000, 0, 1.0)
+    monkeypatch.setattr(llm, "get_llm_limiter", lambda: full)
+    seen = fake_calls(monkeypatch, {"primary": (0.05, "late"), "hedge": (0, "x")})
+    assert hedged() == "late"
+    assert recorder.stats()[STAGE]["primary"]["hedges_skipped"] == 1
+    assert seen["in_flight"] == []
+
+
+def test_routes_are_kept_per_stage(monkeypatch):
+    monkeypatch.setattr(get_settings(), "LLM_HEDGE_MIN_SAMPLES", 2)
+    recorder = RouteRecorder()
+    for seconds in (1.0, 2.0):
+        recorder.record_call("query generation", "model", seconds)
+    recorder.record_call(STAGE, "model", 9.0)
+    assert recorder.percentile("query generation", "model", 0.95) == 2.0
+    assert recorder.percentile(STAGE, "model", 0.95) is None
+
+
+def test_slow_cancelled_calls_keep_their_latency(monkeypatch):
+    monkeypatch.setattr(get_settings(), "LLM_HEDGE_MIN_SAMPLES", 2)
+    recorder = RouteRecorder()
+    for seconds in (1.0, 2.0):
+        recorder.record_call(STAGE, "model", seconds)
+    recorder.record_cancelled(STAGE, "model", 0.5)
+    recorder.record_cancelled(STAGE, "model", 6.0)
+    counters = recorder.stats()[STAGE]["model"]
+    assert counters["cancelled"] == 2
+    assert recorder.percentile(STAGE, "model", 0.95) == 6.0
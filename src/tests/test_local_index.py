@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+
+from mcpsquared_discovery.offline.local_index import (
+    apply_delta,
+    compute_delta,
+    decode_bundle,
+    diversify,
+    encode_bundle,
+    top_k,
+)
+from mcpsquared_discovery.services.catalog import load_catalog
+from mcpsquared_discovery.services.index_bundle import build_bundle
+
+
+def server(title, description="", url=None):
+    return {
+        "title": title,
+        "description": description,
+        "github_url": f"https://github.com/org/{title.lower()}" if url is None else url,
+    }
+
+
+def bundle(version, servers):
+    return {
+        "format": 1,
+        "type": "bundle",
+        "version": version,
+        "servers": servers,
+        "facets": {"category": {"official": format(len(servers), "x")}},
+        "trigram_keywords": {},
+        "technologies": {"keywords": {}, "dependency_only": []},
+        "search": {"k": 10, "min_score": 0.0},
+    }
+
+
+OLD = bundle("v1", [server("Slack"), server("Redis"), server("Notes", url="")])
+
+
+@pytest.mark.parametrize(
+    "servers",
+    [
+        # Unchanged
+        OLD["servers"],
+        # Changed, removed and added records
+        [server("Slack", "updated"), server("Postgres"), server("Notes", url="")],
+        # Reordered
+        list(reversed(OLD["servers"])),
+        # Emptied
+        [],
+    ],
+)
+def test_delta_round_trips(servers):
+    new = bundle("v2", servers)
+    delta = decode_bundle(encode_bundle(compute_delta(OLD, new)))
+    assert apply_delta(OLD, delta) == new
+
+
+def test_delta_sends_only_changed_records():
+    new = bundle("v2", [server("Slack", "updated"), *OLD["servers"][1:]])
+    delta = compute_delta(OLD, new)
+    assert list(delta["changed"]) == ["https://github.com/org/slack"]
+    assert len(delta["order"]) == 3
+
+
+def test_records_with_the_same_key_are_rejected():
+    duplicate = server("Slack", "fork", url="https://github.com/org/Slack/")
+    with pytest.raises(ValueError, match="https://github.com/org/slack"):
+        compute_delta(OLD, bundle("v2", [*OLD["servers"], duplicate]))
+
+
+def test_catalog_records_have_unique_keys():
+    assert len(build_bundle()["servers"]) == len(load_catalog())
+
+
+def test_delta_from_another_version_is_rejected():
+    delta = compute_delta(bundle("v0", []), bundle("v2", []))
+    with pytest.raises(ValueError):
+        apply_delta(OLD, delta)
+
+
+def test_encoding_is_deterministic():
+    assert encode_bundle(OLD) == encode_bundle(dict(reversed(OLD.items())))
+
+
+def candidate(name, score, terms):
+    return score, SimpleNamespace(name=name, terms=frozenset(terms.split()))
+
+
+CANDIDATES = [
+    candidate("postgres", 1.0, "postgres database sql"),
+    candidate("postgres fork", 0.95, "postgres database sql"),
+    candidate("slack", 0.9, "slack chat"),
+]
+
+
+def test_mmr_pushes_near_duplicates_down():
+    picked = diversify(CANDIDATES, 3, mmr_lambda=0.5)
+    assert [record.name for record in picked] == ["postgres", "slack", "postgres fork"]
+
+
+def test_mmr_without_diversity_keeps_the_score_order():
+    picked = diversify(CANDIDATES, 2, mmr_lambda=1.0)
+    assert [record.name for record in picked] == ["postgres", "postgres fork"]
+
+
+def test_top_k_breaks_ties_by_catalog_order():
+    scored = [(0.5, 3), (0.9, 7), (0.5, 1), (0.2, 0)]
+    assert top_k(scored, 3) == [(0.9, 7), (0.5, 1), (0.5, 3)]
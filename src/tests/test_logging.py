@@ -0,0 +1,38 @@
+import logging
+import queue
+
+import pytest
+from pydantic import ValidationError
+
+from mcpsquared_discovery.core.config import Settings
+from mcpsquared_discovery.core.logging import NonBlockingQueueHandler
+
+
+def queued(msg, *args):
+    handler = NonBlockingQueueHandler(queue.Queue())
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+    return handler.prepare(record)
+
+
+def test_immutable_arguments_are_formatted_later():
+    record = queued("%s took %.1fs", "selection", 1.5)
+    assert record.args == ("selection", 1.5)
+    assert record.getMessage() == "selection took 1.5s"
+
+
+def test_mutable_arguments_are_formatted_when_queued():
+    servers = ["Slack"]
+    record = queued("Selected %s", servers)
+    servers.append("Redis")
+    assert record.args is None
+    assert record.getMessage() == "Selected ['Slack']"
+
+
+@pytest.mark.parametrize("level, expected", [("", ""), ("warning", "WARNING")])
+def test_log_level_is_normalized(level, expected):
+    assert Settings(LOG_LEVEL=level).LOG_LEVEL == expected
+
+
+def test_unknown_log_level_is_rejected():
+    with pytest.raises(ValidationError):
+        Settings(LOG_LEVEL="verbose")
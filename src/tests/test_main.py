@@ -0,0 +1,12 @@
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from mcpsquared_discovery.core.config import get_settings
+from mcpsquared_discovery.main import profiling_middleware
+
+
+def test_profiling_middleware_is_only_installed_when_enabled(monkeypatch):
+    inner = object()
+    monkeypatch.setattr(get_settings(), "PROFILING_ENABLED", False)
+    assert profiling_middleware(inner) is inner
+    monkeypatch.setattr(get_settings(), "PROFILING_ENABLED", True)
+    assert isinstance(profiling_middleware(inner), BaseHTTPMiddleware)
@@ -0,0 +1,83 @@
+from mcpsquared_discovery.services.output_parsing import (
+    parse_keyed_object,
+    parse_server_list,
+)
+
+SERVER = (
+    '{"title": "PostgreSQL", "description": "Database access",'
+    ' "github_url": "https://github.com/org/postgres", "cli_command": "npx pg",'
+    ' "content": "Details"}'
+)
+
+
+def titles(parsed):
+    return [server.title for server in parsed.servers]
+
+
+def test_fenced_array_with_preamble():
+    text = f"Here are my picks:\n```json\n[{SERVER}]\n```\nHope this helps!"
+    parsed = parse_server_list(text)
+    assert titles(parsed) == ["PostgreSQL"]
+    assert parsed.malformed == []
+
+
+def test_trailing_commas_are_repaired():
+    text = f'[{SERVER[:-1]}, }},\n{{"title": "Slack", "cli_command": "npx slack",}}]'
+    parsed = parse_server_list(text)
+    assert titles(parsed) == ["PostgreSQL", "Slack"]
+
+
+def test_truncated_array_keeps_complete_elements():
+    text = f'[{SERVER}, {{"title": "Sla'
+    parsed = parse_server_list(text)
+    assert titles(parsed) == ["PostgreSQL"]
+    assert parsed.malformed == ['{"title": "Sla']
+
+
+def test_missing_fields_get_defaults():
+    parsed = parse_server_list('[{"title": "Slack"}]')
+    server = parsed.servers[0]
+    assert server.cli_command.startswith("#")
+    assert server.description and server.content
+
+
+def test_invalid_elements_go_to_repair_on_both_paths():
+    invalid = '{"title": "Broken", "github_url": ["not", "a", "string"]}'
+    valid_json = parse_server_list(f"[{SERVER}, {invalid}]")
+    with_trailing_comma = parse_server_list(f"[{SERVER}, {invalid},]")
+    for parsed in (valid_json, with_trailing_comma):
+        assert titles(parsed) == ["PostgreSQL"]
+        assert parsed.malformed == [invalid]
+
+
+def test_string_sources_are_coerced():
+    text = (
+        '[{"title": "Slack", "cli_command": "npx slack",'
+        ' "sources": ["https://github.com/org/slack", {"source_name": "mcp.so"}]}]'
+    )
+    sources = parse_server_list(text).servers[0].sources
+    assert [source.source_name for source in sources] == ["github.com", "mcp.so"]
+    assert sources[0].source_url == "https://github.com/org/slack"
+    assert sources[1].source_title == "Slack"
+
+
+def test_single_object_and_garbage():
+    assert titles(parse_server_list(SERVER)) == ["PostgreSQL"]
+    parsed = parse_server_list("I could not find anything.")
+    assert parsed.servers == []
+    assert parsed.malformed == ["I could not find anything."]
+
+
+def test_keyed_object_skips_braces_outside_the_answer():
+    text = (
+        'Answers use the form {"r0": [...]}:\n'
+        '{"r0": [{"title": "Slack"}], "r1": []}\n'
+        "Let me know if you need {more}."
+    )
+    assert parse_keyed_object(text) == {"r0": [{"title": "Slack"}], "r1": []}
+
+
+def test_keyed_object_repairs_and_rejects():
+    assert parse_keyed_object('```json\n{"r0": [],}\n```') == {"r0": []}
+    assert parse_keyed_object('{"r0": [') is None
+    assert parse_keyed_object("[1, 2]") is None
@@ -0,0 +1,69 @@
+import pytest
+
+from mcpsquared_discovery.core.config import get_settings
+from mcpsquared_discovery.offline.preranker import LogisticModel, examples_from_event
+from mcpsquared_discovery.services import preranker
+from mcpsquared_discovery.services.catalog import load_catalog
+
+EXAMPLES = [
+    ({"bias": 1.0, "technology=postgres|server=pg": 1.0}, 1),
+    ({"bias": 1.0, "technology=postgres|server=slack": 1.0}, 0),
+    ({"bias": 1.0, "technology=slack|server=slack": 1.0}, 1),
+    ({"bias": 1.0, "technology=slack|server=pg": 1.0}, 0),
+]
+
+
+def test_fit_separates_the_examples():
+    model = LogisticModel()
+    model.fit(EXAMPLES, epochs=200, learning_rate=0.5)
+    metrics = model.evaluate(EXAMPLES)
+    assert metrics["accuracy"] == 1.0
+    assert metrics["log_loss"] < 0.3
+
+
+def test_serialized_model_predicts_the_same():
+    model = LogisticModel(metadata={"events": 4})
+    model.fit(EXAMPLES, epochs=20)
+    loaded = LogisticModel.from_dict(model.to_dict())
+    assert loaded.metadata == {"events": 4}
+    for features, _ in EXAMPLES:
+        assert loaded.probability(features) == pytest.approx(
+            model.probability(features), abs=1e-4
+        )
+
+
+def test_unsupported_model_format():
+    with pytest.raises(ValueError):
+        LogisticModel.from_dict({"format": 0, "weights": {}})
+
+
+class FakeRecorder:
+    running = True
+
+    def __init__(self):
+        self.entries = []
+
+    def write(self, entry):
+        self.entries.append(entry)
+
+
+def test_selection_log_keeps_the_search_order(monkeypatch):
+    results = list(load_catalog()[:5])
+    favourite = preranker.candidate_descriptions(results)[4]["key"]
+    model = LogisticModel({"bias": -1.0, f"server={favourite}": 5.0})
+    recorder = FakeRecorder()
+    monkeypatch.setattr(preranker, "load_preranker", lambda: model)
+    monkeypatch.setattr(preranker, "get_selection_recorder", lambda: recorder)
+    monkeypatch.setattr(get_settings(), "PRERANK_DROP_PROBABILITY", 0.5)
+
+    context = {"prompt": "database", "technologies": [], "dependencies": []}
+    shown = preranker.prerank(context, results)
+    assert shown == [results[4]]
+    preranker.record_selection(context, shown, [results[4].to_server()])
+
+    event = recorder.entries[0]
+    assert [candidate["rank"] for candidate in event["candidates"]] == list(range(5))
+    assert event["shown"] == event["selected"] == [favourite]
+    examples = examples_from_event(event)
+    assert len(examples) == 1 and examples[0][1] == 1
+    assert examples[0][0]["rank"] == 1 / 5
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mcpsquared_discovery.api import routes
+from mcpsquared_discovery.services import rate_limiter
+from mcpsquared_discovery.services.rate_limiter import (
+    AdmissionRejected,
+    LLMAdmissionController,
+    TokenBucket,
+)
+
+
+def controller(max_queue=10, max_wait_seconds=5.0):
+    return LLMAdmissionController(
+        max_concurrent=1,
+        requests_per_second=1000,
+        tokens_per_minute=10_000_000,
+        max_queue=max_queue,
+        max_wait_seconds=max_wait_seconds,
+    )
+
+
+async def hold(limiter, client_id, release):
+    async with limiter.admit(client_id, 1):
+        await release.wait()
+
+
+def test_queued_clients_are_served_round_robin():
+    async def scenario():
+        limiter = controller()
+        release = asyncio.Event()
+        order = []
+
+        async def record(name):
+            async with limiter.admit(name[0], 1):
+                order.append(name)
+
+        holder = asyncio.create_task(hold(limiter, "holder", release))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(record(name))
+            for name in ("a1", "a2", "a3", "b1", "c1")
+        ]
+        await asyncio.sleep(0)
+        assert limiter.stats()["queue_depth"] == 5
+        release.set()
+        await asyncio.gather(holder, *queued)
+        return order
+
+    assert asyncio.run(scenario()) == ["a1", "b1", "c1", "a2", "a3"]
+
+
+def test_full_queue_rejects_with_a_retry_delay():
+    async def scenario():
+        limiter = controller(max_queue=1)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(limiter, "a", release))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(hold(limiter, "b", release))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as error:
+            async with limiter.admit("c", 1):
+                pass
+        release.set()
+        await asyncio.gather(running, queued)
+        return limiter, error.value
+
+    limiter, error = asyncio.run(scenario())
+    assert "queue full" in str(error)
+    assert error.retry_after >= 1.0
+    assert limiter.stats()["rejected"] == 1
+    assert limiter.stats()["admitted"] == 2
+
+
+def test_queued_call_times_out():
+    async def scenario():
+        limiter = controller(max_wait_seconds=0.02)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(limiter, "a", release))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected, match="timed out"):
+            async with limiter.admit("b", 1):
+                pass
+        release.set()
+        await running
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["queue_depth"] == 0
+    assert stats["active"] == 0
+
+
+def test_token_bucket_refills_up_to_capacity(monkeypatch):
+    now = SimpleNamespace(value=0.0)
+    monkeypatch.setattr(
+        rate_limiter, "time", SimpleNamespace(monotonic=lambda: now.value)
+    )
+    bucket = TokenBucket(capacity=10, refill_per_second=100)
+    bucket.take(10)
+    assert bucket.wait_time(5) == pytest.approx(0.05)
+    now.value += 0.02
+    assert bucket.wait_time(5) == pytest.approx(0.03)
+    now.value += 10
+    assert bucket.wait_time(10) == 0.0
+    assert bucket.tokens == 10
+
+
+def test_rejected_discovery_returns_429(monkeypatch):
+    async def run_discovery(context, deadline, mode):
+        raise AdmissionRejected(2.5, "queue full")
+
+    monkeypatch.setattr(routes, "run_discovery", run_discovery)
+    app = FastAPI()
+    app.include_router(routes.router)
+    response = TestClient(app).post("/discover-json", json={"prompt": "postgres"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
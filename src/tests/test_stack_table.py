@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from mcpsquared_discovery.services.file_cache import build_file_artifacts
+from mcpsquared_discovery.services.stack_table import (
+    prompt_names_only_stack,
+    stack_fingerprint,
+)
+from mcpsquared_discovery.tools.build_stack_table import DEFAULT_STACKS
+
+
+@pytest.mark.parametrize(
+    "technologies, expected",
+    [
+        (["postgres", "python"], "postgres+python"),
+        (["python", "postgres", "python"], "postgres+python"),
+        (["next.js", "react", "node", "typescript"], "next.js"),
+        (["react", "typescript"], "react"),
+        (["typescript"], ""),
+        ([], ""),
+    ],
+)
+def test_stack_fingerprint(technologies, expected):
+    assert stack_fingerprint(technologies) == expected
+
+
+def test_canonical_stacks_can_be_matched():
+    stacks = json.loads(DEFAULT_STACKS.read_text(encoding="utf-8"))["stacks"]
+    fingerprints = [stack_fingerprint(stack["technologies"]) for stack in stacks]
+    assert fingerprints == ["+".join(sorted(s["technologies"])) for s in stacks]
+    assert len(set(fingerprints)) == len(stacks)
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("package.json", '{"dependencies": {"@slack/bolt": "3", "express": "4"}}'),
+        ("package.json", '{"dependencies": {"@slack/web-api": "7", "node": "20"}}'),
+    ],
+)
+def test_slack_apps_match_node_and_slack(filename, content):
+    artifacts = build_file_artifacts(filename, content, "test")
+    assert stack_fingerprint(artifacts.technologies) == "node+slack"
+
+
+@pytest.mark.parametrize("dependency", ["slack-bolt", "slack_bolt", "slack_sdk"])
+def test_python_slack_dependencies(dependency):
+    artifacts = build_file_artifacts("requirements.txt", f"{dependency}\n", "test")
+    assert artifacts.technologies == ["slack"]
+
+
+@pytest.mark.parametrize(
+    "prompt, expected",
+    [
+        ("", True),
+        ("Recommend servers for my Postgres stack", True),
+        ("I need something to send invoices", False),
+    ],
+)
+def test_prompt_names_only_stack(prompt, expected):
+    assert prompt_names_only_stack(prompt) is expected
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from mcpsquared_discovery.core.config import get_settings
+from mcpsquared_discovery.services import warmup
+from mcpsquared_discovery.services.discovery import DiscoveryResult
+from mcpsquared_discovery.services.traffic import (
+    inputs_key,
+    normalize_inputs,
+    scrub_prompt,
+)
+
+
+@pytest.mark.parametrize(
+    "prompt, expected",
+    [
+        ("  Postgres\n and   SLACK ", "postgres and slack"),
+        ("see https://github.com/acme/app now", "see <url> now"),
+        ("mail me@acme.io please", "mail <email> please"),
+        ("key sk-live-1234567890abcdefghij", "key <token>"),
+        ("account 123456 on port 80", "account <number> on port 80"),
+        ("internal-billing-service", "internal-billing-service"),
+    ],
+)
+def test_scrub_prompt(prompt, expected):
+    assert scrub_prompt(prompt) == expected
+
+
+def context(files=None):
+    return {"prompt": "Postgres", "technologies": ["postgres"], "files": files or {}}
+
+
+def test_files_are_part_of_the_key():
+    without_files = normalize_inputs(context(), "auto")
+    flask = normalize_inputs(context({"requirements.txt": "flask\n"}), "auto")
+    django = normalize_inputs(context({"requirements.txt": "django\n"}), "auto")
+    assert without_files["files"] is None
+    assert len({inputs_key(without_files), inputs_key(flask), inputs_key(django)}) == 3
+    assert "flask" not in json.dumps(flask)
+
+
+def test_warmup_only_replays_inputs_without_files(monkeypatch, tmp_path):
+    before_file_hashes = normalize_inputs(context(), "auto")
+    del before_file_hashes["files"]
+    captured = [
+        normalize_inputs(context(), "auto"),
+        normalize_inputs(context({"requirements.txt": "flask\n"}), "auto"),
+        before_file_hashes,
+    ]
+    path = tmp_path / "traffic.jsonl"
+    path.write_text(
+        "".join(
+            json.dumps({"inputs": inputs, "outcome": "ok"}) + "\n"
+            for inputs in captured
+        )
+    )
+    replayed = []
+
+    async def run_pipeline(context, deadline, mode):
+        replayed.append(context)
+        return DiscoveryResult(servers=[], source="llm")
+
+    monkeypatch.setattr(get_settings(), "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(get_settings(), "TRAFFIC_CAPTURE_PATH", path)
+    monkeypatch.setattr(warmup, "run_pipeline", run_pipeline)
+    counts = asyncio.run(warmup.warm_result_cache())
+    assert counts == {"replayed": 1, "cached": 0, "skipped": 2, "failed": 0}
+    assert replayed[0]["files"] == {}
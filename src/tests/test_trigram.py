@@ -0,0 +1,42 @@
+import pytest
+
+from mcpsquared_discovery.core.config import settings
+from mcpsquared_discovery.offline.local_index import TrigramIndex, fuzzy_matches
+from mcpsquared_discovery.services.catalog import load_catalog
+from mcpsquared_discovery.services.trigram import load_trigram_index
+
+
+def fuzzy_titles(word, threshold=None):
+    threshold = settings.SEARCH_TRIGRAM_THRESHOLD if threshold is None else threshold
+    matches = fuzzy_matches([word], load_trigram_index(), threshold)
+    return {load_catalog()[index].title for index in matches}
+
+
+@pytest.mark.parametrize(
+    "word, title",
+    [
+        ("postgress", "PostgreSQL"),
+        ("Pupeteer", "Puppeteer"),
+        ("kubernets", "Kubernetes"),
+        ("sequentialthinking", "Sequential Thinking"),
+    ],
+)
+def test_misspelled_names_find_their_server(word, title):
+    assert title in fuzzy_titles(word)
+
+
+def test_nothing_below_the_threshold():
+    assert fuzzy_titles("xqzvw") == set()
+    assert fuzzy_titles("postgress", threshold=0.7) == set()
+
+
+def test_similarity_is_trigram_jaccard():
+    index = TrigramIndex({"postgresql": [3], "postman": [5]})
+    assert index.lookup("postgress", 0.0)[0] == (pytest.approx(8 / 13), "postgresql")
+    assert index.match_records("postgress", 0.5) == {3: pytest.approx(8 / 13)}
+    assert index.match_records("postgress", 0.62) == {}
+
+
+def test_short_words_are_not_matched():
+    index = TrigramIndex({"aws": [0]})
+    assert fuzzy_matches(["awz"], index, 0.0) == {}